@@ -1,4 +1,4 @@
-""" example processing """
+"""example processing"""
 
 from datetime import datetime, timezone
 
@@ -8,7 +8,7 @@ from aind_data_schema.core.processing import (
     PipelineProcess,
     Processing,
     ProcessName,
-    ResourceTimestamped,
+    ResourceSeries,
     ResourceUsage,
 )
 from aind_data_schema_models.units import MemoryUnit
@@ -19,25 +19,13 @@ from aind_data_schema_models.system_architecture import OperatingSystem, CPUArch
 t = datetime(2022, 11, 22, 8, 43, 00, tzinfo=timezone.utc)
 
 
-cpu_usage_list = [
-    ResourceTimestamped(timestamp=datetime(2024, 9, 13, tzinfo=timezone.utc), usage=75.5),
-    ResourceTimestamped(timestamp=datetime(2024, 9, 13, tzinfo=timezone.utc), usage=80.0),
-]
+cpu_usage = ResourceSeries(start_time=datetime(2024, 9, 13, tzinfo=timezone.utc), period=1.0, values=[75.5, 80.0])
 
-gpu_usage_list = [
-    ResourceTimestamped(timestamp=datetime(2024, 9, 13, tzinfo=timezone.utc), usage=60.0),
-    ResourceTimestamped(timestamp=datetime(2024, 9, 13, tzinfo=timezone.utc), usage=65.5),
-]
+gpu_usage = ResourceSeries(start_time=datetime(2024, 9, 13, tzinfo=timezone.utc), period=1.0, values=[60.0, 65.5])
 
-ram_usage_list = [
-    ResourceTimestamped(timestamp=datetime(2024, 9, 13, tzinfo=timezone.utc), usage=70.0),
-    ResourceTimestamped(timestamp=datetime(2024, 9, 13, tzinfo=timezone.utc), usage=72.5),
-]
+ram_usage = ResourceSeries(start_time=datetime(2024, 9, 13, tzinfo=timezone.utc), period=1.0, values=[70.0, 72.5])
 
-file_io_usage_list = [
-    ResourceTimestamped(timestamp=datetime(2024, 9, 13, tzinfo=timezone.utc), usage=5.5),
-    ResourceTimestamped(timestamp=datetime(2024, 9, 13, tzinfo=timezone.utc), usage=6.0),
-]
+file_io_usage = ResourceSeries(start_time=datetime(2024, 9, 13, tzinfo=timezone.utc), period=1.0, values=[5.5, 6.0])
 
 p = Processing(
     processing_pipeline=PipelineProcess(
@@ -65,9 +53,9 @@ p = Processing(
                     system_memory_unit=MemoryUnit.GB,
                     ram=16.0,
                     ram_unit=MemoryUnit.GB,
-                    cpu_usage=cpu_usage_list,
-                    gpu_usage=gpu_usage_list,
-                    ram_usage=ram_usage_list,
+                    cpu_usage=cpu_usage,
+                    gpu_usage=gpu_usage,
+                    ram_usage=ram_usage,
                 ),
             ),
             DataProcess(
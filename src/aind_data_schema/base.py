@@ -1,8 +1,14 @@
 """ generic base class with supporting validators and fields for basic AIND schema """
 
+import hashlib
+import inspect
+import json
 import re
+from enum import Enum
+from functools import lru_cache
+from itertools import product
 from pathlib import Path
-from typing import Any, Generic, Optional, TypeVar
+from typing import Any, Dict, Generic, List, Optional, Tuple, TypeVar, Union, get_args, get_origin
 
 from pydantic import (
     AwareDatetime,
@@ -11,13 +17,17 @@ from pydantic import (
     Field,
     NaiveDatetime,
     PrivateAttr,
+    TypeAdapter,
     ValidationError,
     ValidatorFunctionWrapHandler,
     create_model,
 )
+from pydantic.fields import FieldInfo
 from pydantic.functional_validators import WrapValidator
 from typing_extensions import Annotated
 
+from aind_data_schema.utils.json_scan import extract_paths
+
 
 def _coerce_naive_datetime(v: Any, handler: ValidatorFunctionWrapHandler) -> AwareDatetime:
     """Validator to wrap around AwareDatetime to set a default timezone as user's locale"""
@@ -28,6 +38,19 @@ def _coerce_naive_datetime(v: Any, handler: ValidatorFunctionWrapHandler) -> Awa
         return create_model("TempNaiveDatetimeModel", dt=(NaiveDatetime, ...)).model_validate({"dt": v}).dt.astimezone()
 
 
+def canonical_json(document: Any) -> str:
+    """Serialize a json document with sorted keys and no whitespace, so equal content gives equal text"""
+    return json.dumps(document, sort_keys=True, separators=(",", ":"))
+
+
+def document_fingerprint(document: Any) -> str:
+    """sha256 of the canonical json of a document, as 'sha256:<hex digest>'"""
+    return "sha256:" + hashlib.sha256(canonical_json(document).encode()).hexdigest()
+
+
+_MISSING = object()
+_NO_PARENT = object()
+
 AwareDatetimeWithDefault = Annotated[AwareDatetime, WrapValidator(_coerce_naive_datetime)]
 
 
@@ -49,6 +72,41 @@ class AindModel(BaseModel, Generic[AindGenericType]):
     model_config = ConfigDict(extra="forbid", use_enum_values=True)
 
 
+def _model_of(field: FieldInfo) -> Optional[type]:
+    """Return the model class held by a field, looking inside Optional but not inside lists"""
+    candidates = [field.annotation]
+    if get_origin(field.annotation) is Union:
+        candidates += get_args(field.annotation)
+    models = [c for c in candidates if inspect.isclass(c) and issubclass(c, BaseModel)]
+    return models[0] if len(models) == 1 else None
+
+
+def _holds_list(field: FieldInfo) -> bool:
+    """Check whether a field holds a list, looking inside Optional"""
+    candidates = [field.annotation]
+    if get_origin(field.annotation) is Union:
+        candidates += get_args(field.annotation)
+    return any(get_origin(candidate) is list for candidate in candidates)
+
+
+def _lookup(found: Dict[str, Any], keys: Tuple[Tuple[str, ...], ...]) -> Any:
+    """Follow a key path through decoded json, where each step may be stored under several keys"""
+    raw = found
+    for depth, options in enumerate(keys):
+        if raw is None:
+            return _NO_PARENT
+        raw = next((raw[key] for key in options if key in raw), _MISSING)
+        if raw is _MISSING:
+            return _MISSING if depth == len(keys) - 1 else _NO_PARENT
+    return raw
+
+
+@lru_cache(maxsize=None)
+def field_adapter(field: FieldInfo) -> TypeAdapter:
+    """TypeAdapter that validates a single field's value with the field's constraints"""
+    return TypeAdapter(Annotated[field.annotation, field])
+
+
 class AindCoreModel(AindModel):
     """Generic base class to hold common fields/validators/etc for all basic AIND schema"""
 
@@ -111,3 +169,70 @@ class AindCoreModel(AindModel):
 
         with open(filename, "w") as f:
             f.write(self.model_dump_json(indent=3))
+
+    def fingerprint(self) -> str:
+        """
+        Content hash of this model, independent of field order and formatting
+        Returns
+        -------
+        str
+            'sha256:<hex digest>' of the canonical json, with aliases, of the model
+        """
+        return document_fingerprint(json.loads(self.model_dump_json(by_alias=True)))
+
+    @classmethod
+    def _resolve_field_path(cls, field_path: str) -> Tuple[Tuple[Tuple[str, ...], ...], FieldInfo, type]:
+        """Map a dotted field name to the json keys it may be stored under, its FieldInfo and its model"""
+        model_class = cls
+        keys = []
+        names = field_path.split(".")
+        for depth, name in enumerate(names):
+            if model_class is None or name not in model_class.model_fields:
+                raise ValueError(f"{cls.__name__} has no field '{field_path}'")
+            owner = model_class
+            field = model_class.model_fields[name]
+            # files may be written by field name or, e.g. in the document database, by alias
+            keys.append((name,) if not field.alias else (name, field.alias))
+            model_class = _model_of(field)
+            if depth < len(names) - 1 and _holds_list(field):
+                raise ValueError(f"{cls.__name__} field '{field_path}' is inside a list, which cannot be read by path")
+        return tuple(keys), field, owner
+
+    @classmethod
+    def load_fields(cls, path: Union[str, Path], fields: List[str]) -> Dict[str, Any]:
+        """
+        Read and validate only some fields of a large json file
+        Parameters
+        ----------
+        path : Union[str, Path]
+            Location of a json file written for this model
+        fields : List[str]
+            Field names to read. Fields of nested core models can be
+            requested with dotted names, e.g. "session.rig_id".
+
+        Returns
+        -------
+        Dict[str, Any]
+            Validated value for each requested field. Missing optional fields
+            get their default, and nested fields of a missing model are None.
+        """
+        resolved = {field_path: cls._resolve_field_path(field_path) for field_path in fields}
+        with open(path, "r") as f:
+            text = f.read()
+        found = extract_paths(text, [key_path for keys, _, _ in resolved.values() for key_path in product(*keys)])
+
+        values = {}
+        for field_path, (keys, field, owner) in resolved.items():
+            raw = _lookup(found, keys)
+            if raw is _NO_PARENT:
+                values[field_path] = None
+            elif raw is _MISSING and field.is_required():
+                raise ValueError(f"Required field '{field_path}' not found in {path}")
+            elif raw is _MISSING:
+                values[field_path] = field.get_default(call_default_factory=True)
+            else:
+                value = field_adapter(field).validate_python(raw)
+                if owner.model_config.get("use_enum_values") and isinstance(value, Enum):
+                    value = value.value
+                values[field_path] = value
+        return values
@@ -0,0 +1,160 @@
+"""Content-addressed store for core files that are shared across assets"""
+
+import inspect
+import json
+import zlib
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, Iterable, Optional, Tuple, Type, Union, get_args
+
+from pydantic import ValidationError
+
+from aind_data_schema.base import AindCoreModel, canonical_json, document_fingerprint
+from aind_data_schema.core.metadata import Metadata
+from aind_data_schema.utils.atomic import write_atomic
+
+# Core files that are usually identical across many assets: all assets of a
+# subject share subject and procedures, and all sessions on a rig share the rig.
+SHARED_FILES = ("subject", "procedures", "rig", "instrument")
+
+# Key of the object that stands in for a core file in a dehydrated document
+REF_KEY = "$ref"
+
+
+def is_ref(value: Any) -> bool:
+    """Check whether a value is a reference to a stored core file"""
+    return isinstance(value, dict) and len(value) == 1 and REF_KEY in value
+
+
+class ContentStore:
+    """Core files stored once each, keyed by the fingerprint of their content.
+
+    Metadata documents are dehydrated by replacing shared core files with
+    {"$ref": "sha256:..."} references, and rehydrated through an LRU cache of
+    validated models, so records that share a core file share one instance of
+    it in memory. Rehydrated core files must therefore be treated as read-only.
+    """
+
+    def __init__(self, root: Optional[Union[str, Path]] = None, cache_size: int = 1024):
+        """
+        Parameters
+        ----------
+        root : Optional[Union[str, Path]]
+          Directory to keep compressed core files in. Defaults to keeping them in memory.
+        cache_size : int
+          Number of validated core files kept in memory
+        """
+        self.root = None if root is None else Path(root)
+        self.cache_size = cache_size
+        self._blobs: Dict[str, bytes] = {}
+        self._models: "OrderedDict[Tuple[str, type], AindCoreModel]" = OrderedDict()
+        self._validity: Dict[str, bool] = {}
+
+    def _path(self, key: str) -> Path:
+        """File a core file is stored in"""
+        digest = key.split(":", 1)[1]
+        return self.root / digest[:2] / f"{digest}.json.z"
+
+    def __contains__(self, key: str) -> bool:
+        """Check whether content with this fingerprint is stored"""
+        return key in self._blobs if self.root is None else self._path(key).exists()
+
+    def __len__(self) -> int:
+        """Number of distinct core files stored"""
+        return len(self._blobs) if self.root is None else sum(1 for _ in self.root.glob("*/*.json.z"))
+
+    def put(self, document: Union[AindCoreModel, dict]) -> str:
+        """Store a core file, if it is not stored already, and return its fingerprint"""
+        if isinstance(document, AindCoreModel):
+            document = json.loads(document.model_dump_json(by_alias=True))
+        text = canonical_json(document)
+        key = document_fingerprint(document)
+        if key in self:
+            return key
+        blob = zlib.compress(text.encode())
+        if self.root is None:
+            self._blobs[key] = blob
+        else:
+            path = self._path(key)
+            path.parent.mkdir(parents=True, exist_ok=True)
+            write_atomic(path, blob)
+        return key
+
+    def get_document(self, key: str) -> dict:
+        """Raw json of a stored core file"""
+        if key not in self:
+            raise KeyError(f"No content stored for {key}")
+        blob = self._blobs[key] if self.root is None else self._path(key).read_bytes()
+        return json.loads(zlib.decompress(blob))
+
+    def get(self, key: str, model_class: Type[AindCoreModel]) -> AindCoreModel:
+        """Validated core file, served from the cache when possible"""
+        cache_key = (key, model_class)
+        if cache_key in self._models:
+            self._models.move_to_end(cache_key)
+            return self._models[cache_key]
+        document = self.get_document(key)
+        try:
+            model = model_class.model_validate(document)
+        # like Metadata, keep invalid core files, constructed without validation
+        except ValidationError:
+            model = model_class.model_construct(**document)
+        self._models[cache_key] = model
+        if len(self._models) > self.cache_size:
+            self._models.popitem(last=False)
+        return model
+
+    def dehydrate(self, metadata: Union[Metadata, dict], fields: Iterable[str] = SHARED_FILES) -> dict:
+        """
+        Store the shared core files of a record and replace them with references
+        Parameters
+        ----------
+        metadata : Union[Metadata, dict]
+          Record, or its json document
+        fields : Iterable[str]
+          Core files to store by reference
+
+        Returns
+        -------
+        dict
+          The json document of the record with {"$ref": fingerprint} in place of each stored core file
+        """
+        if isinstance(metadata, Metadata):
+            metadata = json.loads(metadata.model_dump_json(by_alias=True))
+        document = dict(metadata)
+        for field in fields:
+            if document.get(field) is not None and not is_ref(document[field]):
+                document[field] = {REF_KEY: self.put(document[field])}
+        return document
+
+    def rehydrate(self, document: dict) -> Metadata:
+        """
+        Build a Metadata record from a dehydrated document
+        Parameters
+        ----------
+        document : dict
+          Json document in which core files may be references
+
+        Returns
+        -------
+        Metadata
+          Validated record. Referenced core files come from the cache, and whether each of them
+          is valid is only worked out the first time its content is rehydrated.
+        """
+        values = dict(document)
+        keys = {}
+        for field, value in document.items():
+            if is_ref(value):
+                keys[field] = value[REF_KEY]
+                values[field] = self.get(value[REF_KEY], _model_class(field))
+        validity = {field: self._validity[key] for field, key in keys.items() if key in self._validity}
+        metadata = Metadata.model_validate(values, context={"core_file_validity": validity})
+        for field, key in keys.items():
+            if field in metadata._core_file_validity:
+                self._validity[key] = metadata._core_file_validity[field]
+        return metadata
+
+
+def _model_class(field_name: str) -> Type[AindCoreModel]:
+    """Core model class of a Metadata field"""
+    return [f for f in get_args(Metadata.model_fields[field_name].annotation) if inspect.isclass(f)][0]
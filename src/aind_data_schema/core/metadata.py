@@ -3,14 +3,15 @@
 import inspect
 from datetime import datetime
 from enum import Enum
-from typing import Dict, List, Literal, Optional, get_args
+from functools import lru_cache
+from typing import Any, Dict, FrozenSet, Iterable, List, Literal, Optional, Tuple, Union, get_args
 from uuid import UUID, uuid4
 
 from aind_data_schema_models.modalities import ExpectedFiles, FileRequirement
 from aind_data_schema_models.platforms import Platform
 from pydantic import Field, PrivateAttr, ValidationError, ValidationInfo, field_validator, model_validator
 
-from aind_data_schema.base import AindCoreModel
+from aind_data_schema.base import AindCoreModel, field_adapter
 from aind_data_schema.core.acquisition import Acquisition
 from aind_data_schema.core.data_description import DataDescription
 from aind_data_schema.core.instrument import Instrument
@@ -34,6 +35,57 @@ CORE_FILES = [
     "quality_control",
 ]
 
+# Fields read by each cross-file model validator. Metadata.update only reruns
+# the validators that depend on a field that changed, so every model validator
+# except validate_metadata, whose work update does itself, must be listed here.
+VALIDATOR_DEPENDENCIES: Dict[str, Tuple[str, ...]] = {
+    "validate_expected_files_by_modality": tuple(CORE_FILES),
+    "validate_smartspim_metadata": ("data_description", "procedures"),
+    "validate_ecephys_metadata": ("data_description", "procedures"),
+    "validate_rig_session_compatibility": ("rig", "session"),
+}
+
+
+@lru_cache(maxsize=None)
+def _expected_files(abbreviations: FrozenSet[str]) -> Dict[str, Tuple[str, FileRequirement]]:
+    """Merged requirement for each core file, and the modality it comes from, for a set of modalities"""
+    requirement_dict = {}
+    # sorted so that the modality named in error messages does not depend on set order
+    for abbreviation in sorted(a.replace("-", "_").upper() for a in abbreviations):
+        for file in CORE_FILES:
+            #  For each field, check if this is a required/excluded file
+            file_requirement = getattr(getattr(ExpectedFiles, abbreviation), file)
+
+            if file not in requirement_dict:
+                requirement_dict[file] = (abbreviation, file_requirement)
+            else:
+                (prev_modality, prev_requirement) = requirement_dict[file]
+
+                if (file_requirement == FileRequirement.REQUIRED) or (
+                    file_requirement == FileRequirement.OPTIONAL and prev_requirement == FileRequirement.EXCLUDED
+                ):
+                    # override, required wins over all else, and optional wins over excluded
+                    requirement_dict[file] = (abbreviation, file_requirement)
+    return requirement_dict
+
+
+def expected_files_for(modalities: Iterable[Union[str, Any]]) -> Dict[str, FileRequirement]:
+    """
+    Requirement for each core file of an asset with the given modalities
+    Parameters
+    ----------
+    modalities : Iterable[Union[str, Any]]
+      Modalities, e.g. Modality.ECEPHYS, or their abbreviations, e.g. "behavior-videos"
+
+    Returns
+    -------
+    Dict[str, FileRequirement]
+      Whether each core file is required, optional or excluded. When modalities
+      disagree, required wins over optional, which wins over excluded.
+    """
+    abbreviations = frozenset(m if isinstance(m, str) else m.abbreviation for m in modalities)
+    return {file: requirement for file, (_, requirement) in _expected_files(abbreviations).items()}
+
 
 class MetadataStatus(str, Enum):
     """Status of Metadata"""
@@ -58,6 +110,8 @@ class Metadata(AindCoreModel):
     # The models base on this schema will be saved to metadata.nd.json as
     # default
     _FILE_EXTENSION = PrivateAttr(default=".nd.json")
+    # Whether each attached core file passes validation on its own, filled in by validate_metadata
+    _core_file_validity: Dict[str, bool] = PrivateAttr(default_factory=dict)
 
     _DESCRIBED_BY_URL = AindCoreModel._DESCRIBED_BY_BASE_URL.default + "aind_data_schema/core/metadata.py"
     describedBy: str = Field(default=_DESCRIBED_BY_URL, json_schema_extra={"const": _DESCRIBED_BY_URL})
@@ -130,15 +184,18 @@ class Metadata(AindCoreModel):
     )
     def validate_core_fields(cls, value, info: ValidationInfo):
         """Don't automatically raise errors if the core models are invalid"""
+        return cls._core_model(info.field_name, value)
 
+    @classmethod
+    def _core_model(cls, field_name: str, value: Any) -> Any:
+        """Build a core file from a json object, constructing it without validation if it is invalid"""
         # extract field from Optional[<class>] annotation
-        field_name = info.field_name
         field_class = [f for f in get_args(cls.model_fields[field_name].annotation) if inspect.isclass(f)][0]
 
         # If the input is a json object, we will try to create the field
         if isinstance(value, dict):
             try:
-                core_model = field_class.model_validate_json(value)
+                core_model = field_class.model_validate(value)
             # If a validation error is raised,
             # we will construct the field without validation.
             except ValidationError:
@@ -148,83 +205,49 @@ class Metadata(AindCoreModel):
         return core_model
 
     @model_validator(mode="after")
-    def validate_metadata(self):
+    def validate_metadata(self, info: ValidationInfo):
         """Validator for metadata"""
 
-        all_model_fields = dict()
-        for field_name in self.model_fields:
-            # The fields we're interested in are optional. We need to extract out the
-            # class using the get_args method
-            annotation_args = get_args(self.model_fields[field_name].annotation)
-            optional_classes = (
-                None
-                if not annotation_args
-                else (
-                    [
-                        f
-                        for f in get_args(self.model_fields[field_name].annotation)
-                        if inspect.isclass(f) and issubclass(f, AindCoreModel)
-                    ]
-                )
-            )
-            if (
-                optional_classes
-                and inspect.isclass(optional_classes[0])
-                and issubclass(optional_classes[0], AindCoreModel)
-            ):
-                all_model_fields[field_name] = optional_classes[0]
+        self._core_file_validity.clear()
+        # callers that already know whether some core files are valid, e.g. because the
+        # same content was checked before, can pass {field name: bool} in the validation context
+        self._core_file_validity.update((info.context or {}).get("core_file_validity", {}))
+        self._set_metadata_status()
+        # return values
+        return self
 
+    def _is_core_file_valid(self, field_name: str) -> bool:
+        """Check whether an attached core file is valid, remembering the answer until the file changes"""
+        if field_name not in self._core_file_validity:
+            model_class = [f for f in get_args(type(self).model_fields[field_name].annotation) if inspect.isclass(f)][0]
+            try:
+                model_class(**getattr(self, field_name).model_dump())
+                self._core_file_validity[field_name] = True
+            except ValidationError:
+                self._core_file_validity[field_name] = False
+        return self._core_file_validity[field_name]
+
+    def _set_metadata_status(self):
+        """Set metadata_status from the validity of the attached core files"""
         # For each model field, check that is present and check if the model
         # is valid. If it isn't valid, still add it, but mark MetadataStatus
         # as INVALID
         metadata_status = MetadataStatus.VALID
-        for field_name, model_class in all_model_fields.items():
-            if getattr(self, field_name) is not None:
-                model = getattr(self, field_name)
-                model_contents = model.model_dump()
-                try:
-                    model_class(**model_contents)
-                except ValidationError:
-                    metadata_status = MetadataStatus.INVALID
+        for field_name in CORE_FILES:
+            if getattr(self, field_name) is not None and not self._is_core_file_valid(field_name):
+                metadata_status = MetadataStatus.INVALID
         # For certain required fields, like subject, if they are not present,
         # mark the metadata record as missing
         if self.subject is None:
             metadata_status = MetadataStatus.MISSING
         self.metadata_status = metadata_status
-        # return values
-        return self
 
     @model_validator(mode="after")
     def validate_expected_files_by_modality(self):
         """Validator checks that all required/excluded files match the metadata model"""
         if self.data_description:
-            modalities = self.data_description.modality
-
-            requirement_dict = {}
-
-            for modality in modalities:
-                abbreviation = modality.abbreviation.replace("-", "_").upper()
-
-                for file in CORE_FILES:
-                    #  For each field, check if this is a required/excluded file
-                    file_requirement = getattr(getattr(ExpectedFiles, abbreviation), file)
-
-                    if file not in requirement_dict:
-                        requirement_dict[file] = (abbreviation, file_requirement)
-                    else:
-                        (prev_modality, prev_requirement) = requirement_dict[file]
-
-                        if (file_requirement == FileRequirement.REQUIRED) or (
-                            file_requirement == FileRequirement.OPTIONAL
-                            and prev_requirement == FileRequirement.EXCLUDED
-                        ):
-                            # override, required wins over all else, and optional wins over excluded
-                            requirement_dict[file] = (abbreviation, file_requirement)
-
-            for file in CORE_FILES:
-                # Unpack modality
-                (requirement_modality, file_requirement) = requirement_dict[file]
-
+            requirements = _expected_files(frozenset(m.abbreviation for m in self.data_description.modality))
+            for file, (requirement_modality, file_requirement) in requirements.items():
                 # Check required case
                 if file_requirement == FileRequirement.REQUIRED and not getattr(self, file):
                     raise ValueError(f"{requirement_modality} metadata missing required file: {file}")
@@ -278,3 +301,49 @@ class Metadata(AindCoreModel):
             check = RigSessionCompatibility(self.rig, self.session)
             check.run_compatibility_check()
         return self
+
+    def update(self, **fields: Any) -> "Metadata":
+        """
+        Change fields in place, revalidating only what depends on them
+        Parameters
+        ----------
+        fields : Any
+          New values by field name. Core files can be given as models or as json objects.
+          last_modified is set to the current time unless it is given.
+
+        Returns
+        -------
+        Metadata
+          This record. Only the changed core files are checked for validity, and only the
+          model validators listed in VALIDATOR_DEPENDENCIES for the changed fields are rerun.
+          If a validator fails, the changes are undone and its error is raised.
+
+        Notes
+        -----
+        Changes made inside a core file, e.g. ``metadata.subject.sex = ...``, are not
+        seen by the record. Pass the changed file again, e.g. ``update(subject=metadata.subject)``,
+        to recheck its validity and the validators that depend on it.
+        """
+        unknown = set(fields) - set(type(self).model_fields)
+        if unknown:
+            raise ValueError(f"Metadata has no fields {sorted(unknown)}")
+        fields.setdefault("last_modified", datetime.utcnow())
+        previous = {name: getattr(self, name) for name in [*fields, "metadata_status"]}
+        previous_validity = dict(self._core_file_validity)
+        try:
+            for name, value in fields.items():
+                if name in CORE_FILES:
+                    self.__dict__[name] = self._core_model(name, value)
+                    self._core_file_validity.pop(name, None)
+                else:
+                    self.__dict__[name] = field_adapter(type(self).model_fields[name]).validate_python(value)
+            self._set_metadata_status()
+            for validator, dependencies in VALIDATOR_DEPENDENCIES.items():
+                if set(dependencies) & set(fields):
+                    getattr(self, validator)()
+        except (ValidationError, ValueError):
+            self.__dict__.update(previous)
+            self._core_file_validity = previous_validity
+            raise
+        self.__pydantic_fields_set__.update(fields)
+        return self
@@ -1,11 +1,22 @@
-""" schema for processing """
+"""schema for processing"""
 
+from array import array
+from datetime import datetime, timedelta, timezone
 from enum import Enum
-from typing import List, Literal, Optional
+from typing import Any, List, Literal, Optional, Sequence
 
 from aind_data_schema_models.process_names import ProcessName
 from aind_data_schema_models.units import MemoryUnit, UnitlessUnit
-from pydantic import Field, ValidationInfo, field_validator, model_validator
+from pydantic import (
+    Field,
+    PlainSerializer,
+    PlainValidator,
+    ValidationInfo,
+    WithJsonSchema,
+    field_validator,
+    model_validator,
+)
+from typing_extensions import Annotated
 
 from aind_data_schema.base import AindCoreModel, AindGeneric, AindGenericType, AindModel, AwareDatetimeWithDefault
 from aind_data_schema.components.tile import Tile
@@ -25,6 +36,178 @@ class ResourceTimestamped(AindModel):
     usage: float = Field(..., title="Usage")
 
 
+EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+
+def _typed_array(typecode: str):
+    """Validator of a stdlib array of one type, from any sequence of numbers"""
+
+    def validate(value: Any) -> array:
+        """Convert a sequence to an array"""
+        if isinstance(value, array) and value.typecode == typecode:
+            return value
+        try:
+            return array(typecode, value)
+        except (TypeError, OverflowError) as e:
+            raise ValueError(f"Expected a sequence of numbers, not {value!r}") from e
+
+    return validate
+
+
+# float32 values, written as json numbers rounded to float32 precision
+Float32Array = Annotated[
+    array,
+    PlainValidator(_typed_array("f")),
+    PlainSerializer(lambda values: [float(f"{value:.7g}") for value in values], return_type=List[float]),
+    WithJsonSchema({"type": "array", "items": {"type": "number"}}),
+]
+
+# int64 values, e.g. nanoseconds
+Int64Array = Annotated[
+    array,
+    PlainValidator(_typed_array("q")),
+    PlainSerializer(lambda values: values.tolist(), return_type=List[int]),
+    WithJsonSchema({"type": "array", "items": {"type": "integer"}}),
+]
+
+
+def _epoch_ns(timestamp: datetime) -> int:
+    """Nanoseconds since the epoch"""
+    return (timestamp - EPOCH) // timedelta(microseconds=1) * 1000
+
+
+# How samples are combined when a series is downsampled
+_AGGREGATES = {"mean": lambda values: sum(values) / len(values), "min": min, "max": max}
+
+
+class ResourceSeries(AindModel):
+    """Resource usage sampled over time, stored as arrays.
+
+    Regularly sampled series are written as a start time, a period and the
+    values, instead of a timestamped object per sample. The list of
+    ResourceTimestamped used by earlier versions is read as well.
+    """
+
+    start_time: AwareDatetimeWithDefault = Field(..., title="Time of the first sample")
+    period: Optional[float] = Field(
+        default=None,
+        title="Sampling period (s)",
+        description="Time between samples of a regularly sampled series. Irregular series have offsets instead.",
+    )
+    offsets: Optional[Int64Array] = Field(
+        default=None, title="Sample offsets (ns)", description="Time of each sample after the start time"
+    )
+    values: Float32Array = Field(..., title="Usage")
+
+    @model_validator(mode="before")
+    @classmethod
+    def from_timestamped_list(cls, data: Any) -> Any:
+        """Read the list of ResourceTimestamped of earlier versions"""
+        if not isinstance(data, list):
+            return data
+        # an empty legacy list reads as an empty series
+        samples = [ResourceTimestamped.model_validate(sample) for sample in data]
+        series = cls.from_samples([sample.timestamp for sample in samples], [sample.usage for sample in samples])
+        return dict(series)
+
+    @model_validator(mode="after")
+    def check_timing(cls, values):
+        """Ensure that the time of every sample is known"""
+        if values.period is not None and values.offsets is not None:
+            raise ValueError("Either period or offsets can be set, not both.")
+        if values.period is not None and values.period <= 0:
+            raise ValueError("Period must be positive.")
+        if values.offsets is not None and len(values.offsets) != len(values.values):
+            raise ValueError("There must be one offset per value.")
+        if values.period is None and values.offsets is None and len(values.values) > 1:
+            raise ValueError("Period or offsets are required for more than one value.")
+        return values
+
+    @classmethod
+    def from_samples(cls, timestamps: Sequence[datetime], values: Sequence[float]) -> "ResourceSeries":
+        """
+        Build a series from the time and value of each sample
+        Parameters
+        ----------
+        timestamps : Sequence[datetime]
+          Timezone aware sample times
+        values : Sequence[float]
+          Usage at each time
+
+        Returns
+        -------
+        ResourceSeries
+          Series sorted by time, with a period if the samples are evenly spaced to the nanosecond,
+          and offsets otherwise
+        """
+        if len(timestamps) != len(values):
+            raise ValueError("There must be one timestamp per value.")
+        samples = sorted(zip(timestamps, values), key=lambda sample: sample[0])
+        start = samples[0][0] if samples else EPOCH
+        offsets = array("q", [_epoch_ns(timestamp) - _epoch_ns(start) for timestamp, _ in samples])
+        values = array("f", [value for _, value in samples])
+        steps = {offsets[i + 1] - offsets[i] for i in range(len(offsets) - 1)}
+        # samples that share a timestamp, e.g. all of them in some legacy lists, keep their offsets
+        if len(steps) == 1 and 0 not in steps:
+            return cls(start_time=start, period=steps.pop() / 1e9, values=values)
+        return cls(start_time=start, offsets=None if len(offsets) < 2 else offsets, values=values)
+
+    def __len__(self) -> int:
+        """Number of samples"""
+        return len(self.values)
+
+    def offsets_ns(self) -> array:
+        """Time of each sample after the start time, in nanoseconds"""
+        if self.offsets is not None:
+            return self.offsets
+        period_ns = (self.period or 0) * 1e9
+        return array("q", [round(i * period_ns) for i in range(len(self.values))])
+
+    def timestamps(self) -> List[datetime]:
+        """Time of each sample"""
+        return [self.start_time + timedelta(microseconds=offset // 1000) for offset in self.offsets_ns()]
+
+    def to_list(self) -> List["ResourceTimestamped"]:
+        """Samples as the ResourceTimestamped of earlier versions"""
+        return [
+            ResourceTimestamped(timestamp=timestamp, usage=value)
+            for timestamp, value in zip(self.timestamps(), self.values)
+        ]
+
+    def downsample(self, resolution: float, how: str = "mean") -> "ResourceSeries":
+        """
+        Combine the samples in each interval of a given length
+        Parameters
+        ----------
+        resolution : float
+          Length of the intervals in seconds, starting at the start time
+        how : str
+          "mean", "min" or "max" of the samples in each interval
+
+        Returns
+        -------
+        ResourceSeries
+          One sample per interval that has samples, at the start of the interval
+        """
+        if how not in _AGGREGATES:
+            raise ValueError(f"how must be one of {list(_AGGREGATES)}, not '{how}'")
+        if resolution <= 0:
+            raise ValueError("resolution must be positive")
+        resolution_ns = round(resolution * 1e9)
+        bins = {}
+        for offset, value in zip(self.offsets_ns(), self.values):
+            bins.setdefault(offset // resolution_ns, []).append(value)
+        indices = sorted(bins)
+        if not indices:
+            return self.model_copy()
+        start = self.start_time + timedelta(microseconds=indices[0] * resolution_ns // 1000)
+        values = array("f", [_AGGREGATES[how](bins[index]) for index in indices])
+        if len(indices) > 1 and indices[-1] - indices[0] == len(indices) - 1:
+            return ResourceSeries(start_time=start, period=resolution, values=values)
+        offsets = array("q", [(index - indices[0]) * resolution_ns for index in indices])
+        return ResourceSeries(start_time=start, offsets=offsets if len(offsets) > 1 else None, values=values)
+
+
 class ResourceUsage(AindModel):
     """Description of resources used by a process"""
 
@@ -38,9 +221,9 @@ class ResourceUsage(AindModel):
     ram: Optional[float] = Field(default=None, title="System RAM")
     ram_unit: Optional[MemoryUnit] = Field(default=None, title="Ram unit")
 
-    cpu_usage: Optional[List[ResourceTimestamped]] = Field(default=None, title="CPU usage")
-    gpu_usage: Optional[List[ResourceTimestamped]] = Field(default=None, title="GPU usage")
-    ram_usage: Optional[List[ResourceTimestamped]] = Field(default=None, title="RAM usage")
+    cpu_usage: Optional[ResourceSeries] = Field(default=None, title="CPU usage")
+    gpu_usage: Optional[ResourceSeries] = Field(default=None, title="GPU usage")
+    ram_usage: Optional[ResourceSeries] = Field(default=None, title="RAM usage")
     usage_unit: str = Field(default=UnitlessUnit.PERCENT, title="Usage unit")
 
     @model_validator(mode="after")
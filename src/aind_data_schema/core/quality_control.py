@@ -1,7 +1,7 @@
-""" Schemas for Quality Metrics """
+"""Schemas for Quality Metrics"""
 
 from enum import Enum
-from typing import Any, List, Literal, Optional
+from typing import Any, Dict, List, Literal, Optional
 
 from aind_data_schema_models.modalities import Modality
 from pydantic import BaseModel, Field, field_validator, model_validator
@@ -29,6 +29,29 @@ class Stage(str, Enum):
     MULTI_ASSET = "Multi-asset"
 
 
+def _merge_fields(merged: dict, model: BaseModel, skip: str):
+    """Copy the fields a model was given into a merged dict, except skip and fields that are None
+
+    Defaults are not copied, so a document that never set a field does not undo another that did.
+    """
+    for name in model.model_fields_set:
+        value = getattr(model, name)
+        if name != skip and value is not None:
+            merged[name] = value
+
+
+def _merge_statuses(statuses: List["QCStatus"]) -> List["QCStatus"]:
+    """Sort statuses by timestamp, dropping repeats of the same status"""
+    seen = set()
+    merged = []
+    for status in sorted(statuses, key=lambda status: status.timestamp):
+        key = (status.evaluator, status.status, status.timestamp)
+        if key not in seen:
+            seen.add(key)
+            merged.append(status.model_copy())
+    return merged
+
+
 class QCStatus(BaseModel):
     """Description of a QC status, set by an evaluator"""
 
@@ -88,6 +111,13 @@ class QCEvaluation(AindModel):
         ),
     )
 
+    def status_counts(self) -> Dict[Status, int]:
+        """Number of metrics whose latest status is each of Pass, Fail and Pending, counted in one pass"""
+        counts = {status: 0 for status in Status}
+        for metric in self.metrics:
+            counts[Status(metric.status.status)] += 1
+        return counts
+
     @property
     def status(self) -> Status:
         """Loop through all metrics and return the evaluation's status
@@ -101,14 +131,15 @@ class QCEvaluation(AindModel):
         Status
             Current status of the evaluation
         """
-        latest_metric_statuses = [metric.status.status for metric in self.metrics]
+        pending = False
+        for metric in self.metrics:
+            status = metric.status.status
+            # stop at the first failing metric, since nothing after it changes the result
+            if status == Status.FAIL and not self.allow_failed_metrics:
+                return Status.FAIL
+            pending = pending or status == Status.PENDING
 
-        if (not self.allow_failed_metrics) and any(status == Status.FAIL for status in latest_metric_statuses):
-            return Status.FAIL
-        elif any(status == Status.PENDING for status in latest_metric_statuses):
-            return Status.PENDING
-
-        return Status.PASS
+        return Status.PENDING if pending else Status.PASS
 
     @property
     def failed_metrics(self) -> Optional[List[QCMetric]]:
@@ -124,12 +155,7 @@ class QCEvaluation(AindModel):
         if not self.allow_failed_metrics:
             return None
         else:
-            failing_metrics = []
-            for metric in self.metrics:
-                if metric.status.status == Status.FAIL:
-                    failing_metrics.append(metric)
-
-            return failing_metrics
+            return [metric for metric in self.metrics if metric.status.status == Status.FAIL]
 
     @model_validator(mode="after")
     def validate_multi_asset(cls, v):
@@ -173,11 +199,93 @@ class QualityControl(AindCoreModel):
         If no fails, then any PENDING -> PENDING
         All PASS -> PASS
         """
-        eval_statuses = [evaluation.status for evaluation in self.evaluations]
+        pending = False
+        for evaluation in self.evaluations:
+            status = evaluation.status
+            if status == Status.FAIL:
+                return Status.FAIL
+            pending = pending or status == Status.PENDING
+
+        return Status.PENDING if pending else Status.PASS
+
+    def index(self, rebuild: bool = False):
+        """Indexes over the metrics of this document, as a QCIndex
+
+        The index is reused by query until the evaluations list is replaced, e.g. by
+        assignment or model_copy(update=...). It is a snapshot, so it does not see
+        statuses, metrics or evaluations changed in place; call index(rebuild=True)
+        after such edits to refresh it.
+        """
+        # qc_query imports this module, so it can only be imported once both are loaded
+        from aind_data_schema.utils.qc_query import QCIndex
+
+        # kept in __dict__ outside the model fields and private attributes, like a
+        # cached_property, so it is not serialized or compared by ==
+        cached = self.__dict__.get("_query_index")
+        if rebuild or cached is None or cached[0] is not self.evaluations:
+            cached = self.__dict__["_query_index"] = (self.evaluations, QCIndex(self))
+        return cached[1]
+
+    def query(self, **filters) -> list:
+        """Find metrics by their latest status and their evaluation
+
+        Takes the filters of QCIndex.query, e.g. status=Status.FAIL, modality=Modality.ECEPHYS,
+        stage=Stage.PROCESSING, evaluator, evaluation, and start and end timestamps, and
+        returns a QCMatch for each metric that matches all of them.
+        """
+        return self.index().query(**filters)
+
+    @classmethod
+    def merge(cls, *documents: "QualityControl") -> "QualityControl":
+        """Combine partial QC documents, e.g. from per-probe processing jobs
+
+        Evaluations with the same modality, stage and name are combined, and so are
+        their metrics with the same name. Status histories are merged in timestamp
+        order without repeated statuses. Other fields come from the last document
+        that sets them to a value other than None, and fields left at their default
+        do not count as set. The distinct notes of the documents are joined with
+        newlines. The result is validated once, and documents are only scanned once,
+        so merging hundreds of documents is fast.
 
-        if any(status == Status.FAIL for status in eval_statuses):
-            return Status.FAIL
-        elif any(status == Status.PENDING for status in eval_statuses):
-            return Status.PENDING
+        Parameters
+        ----------
+        documents : QualityControl
+            Documents to merge, which are left unchanged
 
-        return Status.PASS
+        Returns
+        -------
+        QualityControl
+            The combined document
+        """
+        evaluations: Dict[tuple, dict] = {}
+        notes: List[str] = []
+        for document in documents:
+            if document.notes is not None and document.notes not in notes:
+                notes.append(document.notes)
+            for evaluation in document.evaluations:
+                key = (evaluation.modality.abbreviation, evaluation.stage, evaluation.name)
+                merged = evaluations.setdefault(key, {"metrics": {}})
+                _merge_fields(merged, evaluation, skip="metrics")
+                for metric in evaluation.metrics:
+                    merged_metric = merged["metrics"].setdefault(metric.name, {"status_history": []})
+                    _merge_fields(merged_metric, metric, skip="status_history")
+                    merged_metric["status_history"].extend(metric.status_history)
+        for evaluation in evaluations.values():
+            for metric in evaluation["metrics"].values():
+                metric["status_history"] = _merge_statuses(metric["status_history"])
+            evaluation["metrics"] = list(evaluation["metrics"].values())
+        return cls.model_validate(
+            {"evaluations": list(evaluations.values()), "notes": "\n".join(notes) if notes else None}
+        )
+
+    def evaluation_status_counts(self) -> Dict[str, Dict[Status, int]]:
+        """Number of metrics whose latest status is each of Pass, Fail and Pending, by evaluation name
+
+        Counts of evaluations that share a name are added together.
+        """
+        counts = {}
+        for evaluation in self.evaluations:
+            totals = counts.setdefault(evaluation.name, {status: 0 for status in Status})
+            for status, count in evaluation.status_counts().items():
+                totals[status] += count
+        return counts
@@ -0,0 +1,290 @@
+"""Local, embedded SQLite store for core files and Metadata records"""
+
+import json
+import sqlite3
+import zlib
+from datetime import datetime, timezone
+from itertools import islice
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple, Type, Union
+
+from aind_data_schema.base import AindCoreModel
+from aind_data_schema.core.metadata import Metadata
+from aind_data_schema.utils.interning import StringInterner, maybe_intern
+from aind_data_schema.utils.metadata_index import normalize_value, record_keys
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS records (
+    kind TEXT NOT NULL,
+    id TEXT NOT NULL,
+    name TEXT,
+    subject_id TEXT,
+    platform TEXT,
+    creation_time TEXT,
+    metadata_status TEXT,
+    schema_version TEXT,
+    data BLOB NOT NULL,
+    PRIMARY KEY (kind, id)
+);
+CREATE TABLE IF NOT EXISTS record_modalities (
+    kind TEXT NOT NULL,
+    id TEXT NOT NULL,
+    modality TEXT NOT NULL,
+    PRIMARY KEY (kind, id, modality)
+);
+CREATE INDEX IF NOT EXISTS records_name ON records (kind, name);
+CREATE INDEX IF NOT EXISTS records_subject_id ON records (kind, subject_id);
+CREATE INDEX IF NOT EXISTS records_platform ON records (kind, platform);
+CREATE INDEX IF NOT EXISTS records_creation_time ON records (kind, creation_time);
+CREATE INDEX IF NOT EXISTS records_metadata_status ON records (kind, metadata_status);
+CREATE INDEX IF NOT EXISTS records_schema_version ON records (kind, schema_version);
+CREATE INDEX IF NOT EXISTS record_modalities_modality ON record_modalities (kind, modality);
+"""
+
+# Indexed columns that can be matched by equality in queries
+INDEXED_COLUMNS = ("name", "subject_id", "platform", "metadata_status", "schema_version")
+
+Document = Union[AindCoreModel, dict]
+
+
+def _utc_text(value: Optional[datetime]) -> Optional[str]:
+    """Store times as UTC ISO text so that text order is time order"""
+    if value is None:
+        return None
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value.isoformat()
+
+
+def _kind(model: Type[AindCoreModel]) -> str:
+    """Name a core model class is stored under, e.g. 'session' or 'metadata'"""
+    return model.default_filename().split(".")[0]
+
+
+class MetadataStore:
+    """Embedded store for Metadata records and core files, backed by SQLite.
+
+    Each record is kept as a compressed json blob next to indexed scalar
+    columns (name, subject_id, platform, modality, creation_time,
+    metadata_status, schema_version). Upserts are batched into transactions,
+    and queries return an iterator that decompresses and validates each
+    record only when it is reached.
+    """
+
+    def __init__(self, path: Union[str, Path] = ":memory:", compression_level: int = 6):
+        """
+        Parameters
+        ----------
+        path : Union[str, Path]
+          SQLite database file, created if it does not exist. Defaults to an in-memory database.
+        compression_level : int
+          zlib compression level for the json blobs
+        """
+        self.path = path
+        self.compression_level = compression_level
+        self._connection = sqlite3.connect(str(path))
+        self._connection.executescript(_SCHEMA)
+
+    def close(self):
+        """Close the database connection"""
+        self._connection.close()
+
+    def __enter__(self) -> "MetadataStore":
+        """Use the store as a context manager"""
+        return self
+
+    def __exit__(self, *args):
+        """Close the store on exit"""
+        self.close()
+
+    def _row(self, kind: str, record_id: str, document: Document) -> Tuple[tuple, List[tuple]]:
+        """Build the records row and modality rows for one document"""
+        if isinstance(document, AindCoreModel):
+            data = document.model_dump_json(by_alias=True).encode()
+        else:
+            data = json.dumps(document).encode()
+        keys = record_keys(document if kind == "metadata" else {"_id": record_id, kind: document})
+        if kind != "metadata":
+            keys["schema_version"] = (
+                document.get("schema_version") if isinstance(document, dict) else document.schema_version
+            )
+        row = (
+            kind,
+            record_id,
+            keys["name"],
+            keys["subject_id"],
+            keys["platform"],
+            _utc_text(keys["creation_time"]),
+            keys["metadata_status"],
+            keys["schema_version"],
+            zlib.compress(data, self.compression_level),
+        )
+        return row, [(kind, record_id, modality) for modality in keys["modality"]]
+
+    def _upsert_rows(self, rows: Iterable[Tuple[tuple, List[tuple]]], batch_size: int) -> int:
+        """Write rows in batches, one transaction per batch"""
+        count = 0
+        rows = iter(rows)
+        while True:
+            batch = list(islice(rows, batch_size))
+            if not batch:
+                return count
+            with self._connection:
+                self._connection.executemany(
+                    "DELETE FROM record_modalities WHERE kind = ? AND id = ?", [row[:2] for row, _ in batch]
+                )
+                self._connection.executemany(
+                    "INSERT OR REPLACE INTO records VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)", [row for row, _ in batch]
+                )
+                self._connection.executemany(
+                    "INSERT INTO record_modalities VALUES (?, ?, ?)",
+                    [modality for _, modalities in batch for modality in modalities],
+                )
+            count += len(batch)
+
+    def upsert(self, records: Iterable[Union[Metadata, dict]], batch_size: int = 1000) -> int:
+        """Insert or replace Metadata records, or raw Metadata documents, keyed by their id"""
+
+        def rows():
+            """Build rows lazily so large iterables are never held in memory"""
+            for record in records:
+                record_id = record.get("_id", record.get("id")) if isinstance(record, dict) else record.id
+                yield self._row("metadata", str(record_id), record)
+
+        return self._upsert_rows(rows(), batch_size)
+
+    def upsert_core_files(
+        self, items: Iterable[Tuple[str, Document]], model: Type[AindCoreModel], batch_size: int = 1000
+    ) -> int:
+        """Insert or replace core files of one type, given as (record id, model or raw document) pairs"""
+        kind = _kind(model)
+        return self._upsert_rows((self._row(kind, str(i), document) for i, document in items), batch_size)
+
+    def _where(
+        self,
+        kind: str,
+        modality: Optional[str],
+        created_after: Optional[datetime],
+        created_before: Optional[datetime],
+        criteria: Dict[str, Any],
+    ) -> Tuple[str, list]:
+        """Build the WHERE clause for a query"""
+        unknown = set(criteria) - set(INDEXED_COLUMNS)
+        if unknown:
+            raise ValueError(f"Cannot query on {sorted(unknown)}. Indexed columns are {list(INDEXED_COLUMNS)}")
+        clauses = ["records.kind = ?"]
+        parameters: list = [kind]
+        for column, value in criteria.items():
+            if value is not None:
+                clauses.append(f"records.{column} = ?")
+                parameters.append(normalize_value(value))
+        if modality is not None:
+            clauses.append(
+                "EXISTS (SELECT 1 FROM record_modalities m WHERE m.kind = records.kind AND m.id = records.id"
+                " AND m.modality = ?)"
+            )
+            parameters.append(normalize_value(modality))
+        if created_after is not None:
+            clauses.append("records.creation_time >= ?")
+            parameters.append(_utc_text(created_after))
+        if created_before is not None:
+            clauses.append("records.creation_time < ?")
+            parameters.append(_utc_text(created_before))
+        return " AND ".join(clauses), parameters
+
+    def _select(
+        self,
+        column: str,
+        model: Type[AindCoreModel],
+        modality: Optional[Any],
+        created_after: Optional[datetime],
+        created_before: Optional[datetime],
+        criteria: Dict[str, Any],
+    ) -> sqlite3.Cursor:
+        """Run a query for one column of the matching records, ordered by creation time"""
+        where, parameters = self._where(_kind(model), modality, created_after, created_before, criteria)
+        return self._connection.execute(
+            f"SELECT {column} FROM records WHERE {where} ORDER BY creation_time, id", parameters
+        )
+
+    def query(
+        self,
+        model: Type[AindCoreModel] = Metadata,
+        modality: Optional[Any] = None,
+        created_after: Optional[datetime] = None,
+        created_before: Optional[datetime] = None,
+        validate: bool = True,
+        interner: Optional[StringInterner] = None,
+        **criteria: Any,
+    ) -> Iterator[Union[AindCoreModel, dict]]:
+        """
+        Lazily iterate over stored records that match every criterion
+        Parameters
+        ----------
+        model : Type[AindCoreModel]
+          Type of record to query, Metadata by default
+        modality : Optional[Any]
+          Only records that include this modality
+        created_after : Optional[datetime]
+          Only records whose creation_time is at or after this time
+        created_before : Optional[datetime]
+          Only records whose creation_time is before this time
+        validate : bool
+          Yield validated models if True, otherwise raw documents
+        interner : Optional[StringInterner]
+          Interner applied to each validated model
+        criteria : Any
+          Equality matches on any of INDEXED_COLUMNS
+
+        Returns
+        -------
+        Iterator[Union[AindCoreModel, dict]]
+          Records ordered by creation time
+        """
+        for (data,) in self._select("data", model, modality, created_after, created_before, criteria):
+            text = zlib.decompress(data)
+            if validate:
+                yield maybe_intern(model.model_validate_json(text), interner)
+            else:
+                yield json.loads(text)
+
+    def ids(
+        self,
+        model: Type[AindCoreModel] = Metadata,
+        modality: Optional[Any] = None,
+        created_after: Optional[datetime] = None,
+        created_before: Optional[datetime] = None,
+        **criteria: Any,
+    ) -> List[str]:
+        """Ids of the records matching the same criteria as query, without reading their documents"""
+        return [row[0] for row in self._select("id", model, modality, created_after, created_before, criteria)]
+
+    def count(
+        self,
+        model: Type[AindCoreModel] = Metadata,
+        modality: Optional[Any] = None,
+        created_after: Optional[datetime] = None,
+        created_before: Optional[datetime] = None,
+        **criteria: Any,
+    ) -> int:
+        """Number of records matching the same criteria as query, counted by sqlite"""
+        where, parameters = self._where(_kind(model), modality, created_after, created_before, criteria)
+        return self._connection.execute(f"SELECT COUNT(*) FROM records WHERE {where}", parameters).fetchone()[0]
+
+    def get(self, record_id: Any, model: Type[AindCoreModel] = Metadata, validate: bool = True) -> Any:
+        """Fetch one record by id, or None if it is not stored"""
+        row = self._connection.execute(
+            "SELECT data FROM records WHERE kind = ? AND id = ?", (_kind(model), str(record_id))
+        ).fetchone()
+        if row is None:
+            return None
+        text = zlib.decompress(row[0])
+        return model.model_validate_json(text) if validate else json.loads(text)
+
+    def delete(self, record_id: Any, model: Type[AindCoreModel] = Metadata):
+        """Remove one record"""
+        with self._connection:
+            for table in ("records", "record_modalities"):
+                self._connection.execute(
+                    f"DELETE FROM {table} WHERE kind = ? AND id = ?", (_kind(model), str(record_id))
+                )
@@ -0,0 +1,54 @@
+"""Locking and atomic replacement for files that several processes update"""
+
+import os
+import stat
+import tempfile
+from contextlib import contextmanager
+from pathlib import Path
+from typing import IO, Iterator, Union
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover
+    # advisory locks are not available on Windows
+    fcntl = None
+
+
+@contextmanager
+def locked(f: IO, exclusive: bool = True) -> Iterator[IO]:
+    """
+    Hold an advisory lock on an open file
+    Parameters
+    ----------
+    f : IO
+      Open file. Every process that updates it must lock it the same way.
+    exclusive : bool
+      Exclusive lock for rewriting the file, or shared lock for appending to it,
+      so that appends can run concurrently but not while the file is rewritten
+    """
+    if fcntl is None:  # pragma: no cover
+        yield f
+        return
+    fcntl.flock(f.fileno(), fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+    try:
+        yield f
+    finally:
+        fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+
+
+def write_atomic(path: Union[str, Path], data: Union[str, bytes]):
+    """Replace a file with new content, so that readers see either the old or the new file, never a partial one"""
+    path = Path(path)
+    text = isinstance(data, str)
+    with tempfile.NamedTemporaryFile(
+        "w" if text else "wb",
+        encoding="utf-8" if text else None,
+        dir=path.parent,
+        prefix=f".{path.name}.",
+        delete=False,
+    ) as f:
+        f.write(data)
+    if path.exists():
+        # keep the permissions of the file, rather than those of a private temporary file
+        os.chmod(f.name, stat.S_IMODE(os.stat(path).st_mode))
+    os.replace(f.name, path)
@@ -0,0 +1,404 @@
+"""Flatten Metadata records into columnar tables for Arrow and Parquet.
+
+Column names are derived from the schema, not from the records, so every
+export of the same model has the same columns: nested models are inlined
+as dotted names such as ``session.session_start_time``, registry models
+such as modalities and platforms become their abbreviation, and lists of
+models (``session.data_streams``, ``procedures.subject_procedures``,
+``quality_control.evaluations``, ...) become child tables that are joined
+back to the main table on ``asset_id``.
+
+Flattening only needs the standard library. Building Arrow tables and
+writing Parquet requires pyarrow, which is installed with the ``arrow``
+extra.
+"""
+
+import inspect
+import json
+from datetime import date, datetime, time, timezone
+from decimal import Decimal
+from enum import Enum
+from functools import lru_cache
+from itertools import islice
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional, Sequence, Tuple, Type, Union
+from uuid import UUID, uuid4
+
+from pydantic import AwareDatetime, BaseModel, NaiveDatetime, TypeAdapter
+from typing_extensions import Annotated, Literal, get_args, get_origin
+
+from aind_data_schema.core.metadata import Metadata
+
+_NONE_TYPE = type(None)
+# accepts any number of fractional second digits, unlike datetime.fromisoformat before python 3.11
+_DATETIME = TypeAdapter(datetime)
+_LIST_TYPES = (list, set, frozenset, tuple)
+
+# Name of the main table, and of the columns that join child tables to it
+MAIN_TABLE = "metadata"
+ASSET_ID = "asset_id"
+POSITION = "position"
+
+
+class Column(NamedTuple):
+    """A column of a flattened table"""
+
+    name: str
+    keys: Tuple[Tuple[str, ...], ...]
+    kind: str
+    repeated: bool = False
+
+
+class TablePlan(NamedTuple):
+    """Columns of one flattened table, and where its rows come from in a document"""
+
+    name: str
+    keys: Tuple[Tuple[str, ...], ...]
+    columns: Tuple[Column, ...]
+
+
+def _strip(annotation: Any) -> Tuple[Any, ...]:
+    """Unwrap Annotated and Optional, returning the remaining union members"""
+    while get_origin(annotation) is Annotated:
+        annotation = get_args(annotation)[0]
+    if get_origin(annotation) is Union:
+        members = []
+        for arg in get_args(annotation):
+            members.extend(m for m in _strip(arg) if m is not _NONE_TYPE)
+        return tuple(members)
+    return (annotation,)
+
+
+def _is_model(annotation: Any) -> bool:
+    """Check whether an annotation is a pydantic model class"""
+    return inspect.isclass(annotation) and issubclass(annotation, BaseModel)
+
+
+def _is_reference(annotation: Any) -> bool:
+    """Registry models (modalities, platforms, organizations, ...) have a constant name"""
+    if not _is_model(annotation) or "name" not in annotation.model_fields:
+        return False
+    return annotation.__module__.startswith("aind_data_schema_models.") and annotation.model_fields["name"].default
+
+
+def _leaf_kind(annotation: Any) -> str:
+    """Column kind of a single non-model type"""
+    if get_origin(annotation) is Literal:
+        return "string" if all(isinstance(arg, str) for arg in get_args(annotation)) else "json"
+    if not inspect.isclass(annotation):
+        return "json"
+    if issubclass(annotation, (Enum, str, UUID, time, Path)):
+        return "string"
+    if issubclass(annotation, bool):
+        return "bool"
+    if issubclass(annotation, int):
+        return "int"
+    if issubclass(annotation, (float, Decimal)):
+        return "float"
+    if issubclass(annotation, (datetime, AwareDatetime, NaiveDatetime)):
+        return "timestamp"
+    if issubclass(annotation, date):
+        return "date"
+    return "json"
+
+
+def _kind(members: Tuple[Any, ...]) -> str:
+    """Column kind of a union of non-model types, falling back to json when members disagree"""
+    if all(_is_reference(member) for member in members):
+        return "string"
+    kinds = {"json" if _is_model(member) else _leaf_kind(member) for member in members}
+    return kinds.pop() if len(kinds) == 1 else "json"
+
+
+def _json_keys(name: str, field: Any) -> Tuple[str, ...]:
+    """Keys a field may be stored under, by name or, e.g. in the document database, by alias"""
+    return (name,) if not field.alias else (name, field.alias)
+
+
+def _merge(columns: List[Column]) -> List[Column]:
+    """Merge the columns of union members, demoting columns whose kinds disagree to json"""
+    merged: Dict[str, Column] = {}
+    for column in columns:
+        existing = merged.get(column.name)
+        if existing is None:
+            merged[column.name] = column
+        elif existing != column:
+            merged[column.name] = existing._replace(kind="json", repeated=False)
+    return list(merged.values())
+
+
+def _walk(
+    models: Tuple[Type[BaseModel], ...],
+    prefix: str,
+    keys: Tuple[Tuple[str, ...], ...],
+    tables: Optional[List[TablePlan]],
+    ancestors: Tuple[Type[BaseModel], ...],
+) -> List[Column]:
+    """Collect the columns of a (union of) models, adding child tables for lists of models"""
+    columns: List[Column] = []
+    for model in models:
+        for name, field in model.model_fields.items():
+            column_keys = keys + (_json_keys(name, field),)
+            columns.extend(_field_columns(prefix + name, field.annotation, column_keys, tables, ancestors + (model,)))
+    return _merge(columns)
+
+
+def _field_columns(
+    name: str,
+    annotation: Any,
+    keys: Tuple[Tuple[str, ...], ...],
+    tables: Optional[List[TablePlan]],
+    ancestors: Tuple[Type[BaseModel], ...],
+) -> List[Column]:
+    """Columns for one field. Child tables are only made outside of other child tables (tables is not None)."""
+    members = _strip(annotation)
+    if len(members) == 1 and get_origin(members[0]) in _LIST_TYPES:
+        items = _strip((get_args(members[0]) or (Any,))[0])
+        if any(_is_model(item) and not _is_reference(item) for item in items):
+            if tables is not None and all(_is_model(item) for item in items):
+                tables.append(TablePlan(name, keys, tuple(_walk(items, "", (), None, ()))))
+                return []
+            return [Column(name, keys, "json")]
+        kind = _kind(items)
+        return [Column(name, keys, kind, repeated=kind != "json")]
+    inline = len(members) == 1 and _is_model(members[0]) and not _is_reference(members[0])
+    if inline and members[0] not in ancestors:
+        return _walk(members, name + ".", keys, tables, ancestors)
+    return [Column(name, keys, _kind(members))]
+
+
+@lru_cache(maxsize=None)
+def table_plans(model_class: Type[BaseModel] = Metadata) -> Tuple[TablePlan, ...]:
+    """
+    Derive the flattened tables of a model from its schema
+    Parameters
+    ----------
+    model_class : Type[BaseModel]
+      Model of the records that will be flattened, Metadata by default
+
+    Returns
+    -------
+    Tuple[TablePlan, ...]
+      The main table first, then one child table per list of models
+    """
+    children: List[TablePlan] = []
+    columns = _walk((model_class,), "", (), children, ())
+    main = TablePlan(MAIN_TABLE, (), tuple(columns))
+    key = Column(ASSET_ID, (), "string")
+    position = Column(POSITION, (), "int")
+    return (main,) + tuple(child._replace(columns=(key, position) + child.columns) for child in children)
+
+
+def _lookup(document: Any, keys: Tuple[Tuple[str, ...], ...]) -> Any:
+    """Follow a key path through a json document, returning None if anything along the way is missing"""
+    value = document
+    for options in keys:
+        if not isinstance(value, dict):
+            return None
+        value = next((value[key] for key in options if key in value), None)
+    return value
+
+
+def column_timestamp(value: Any) -> datetime:
+    """Parse a timestamp column value as a UTC datetime, taking naive times to be in UTC"""
+    if not isinstance(value, datetime):
+        value = _DATETIME.validate_python(value)
+    if value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc)
+
+
+def column_string(value: Any) -> str:
+    """String column value. Registry models are stored as their abbreviation, or their name if they have none"""
+    if isinstance(value, dict):
+        return value.get("abbreviation") or value.get("name")
+    return value.value if isinstance(value, Enum) else str(value)
+
+
+_CONVERTERS = {
+    "string": column_string,
+    "int": int,
+    "float": float,
+    "bool": bool,
+    "timestamp": column_timestamp,
+    "date": lambda value: value if isinstance(value, date) else date.fromisoformat(value),
+    "json": lambda value: json.dumps(value, sort_keys=True, default=str),
+}
+
+
+def _convert(column: Column, value: Any) -> Any:
+    """Convert a json value to the column's kind"""
+    if value is None:
+        return None
+    converter = _CONVERTERS[column.kind]
+    try:
+        if column.repeated:
+            return [None if item is None else converter(item) for item in value]
+        return converter(value)
+    except (TypeError, ValueError, AttributeError) as e:
+        raise ValueError(f"Cannot convert {value!r} in column '{column.name}' to {column.kind}") from e
+
+
+def _document(record: Union[BaseModel, dict]) -> dict:
+    """Json document of a record"""
+    if isinstance(record, BaseModel):
+        return json.loads(record.model_dump_json(by_alias=True))
+    return record
+
+
+def flatten(record: Union[BaseModel, dict], model_class: Type[BaseModel] = Metadata) -> Dict[str, List[Dict[str, Any]]]:
+    """
+    Flatten one record into rows of the main table and of each child table
+    Parameters
+    ----------
+    record : Union[BaseModel, dict]
+      A model, or its raw json document
+    model_class : Type[BaseModel]
+      Model the record belongs to, Metadata by default
+
+    Returns
+    -------
+    Dict[str, List[Dict[str, Any]]]
+      Rows by table name. The main table always has a single row.
+    """
+    document = _document(record)
+    main, *children = table_plans(model_class)
+    row = {column.name: _convert(column, _lookup(document, column.keys)) for column in main.columns}
+    asset_id = row.get("id")
+    rows = {main.name: [row]}
+    for child in children:
+        items = _lookup(document, child.keys) or []
+        rows[child.name] = [
+            dict(
+                {ASSET_ID: asset_id, POSITION: position},
+                **{column.name: _convert(column, _lookup(item, column.keys)) for column in child.columns[2:]},
+            )
+            for position, item in enumerate(items)
+        ]
+    return rows
+
+
+def flatten_records(
+    records: Iterable[Union[BaseModel, dict]], model_class: Type[BaseModel] = Metadata
+) -> Dict[str, Dict[str, list]]:
+    """Flatten many records into column lists, keyed by table name and then column name"""
+    plans = table_plans(model_class)
+    tables = {plan.name: {column.name: [] for column in plan.columns} for plan in plans}
+    for record in records:
+        for name, rows in flatten(record, model_class).items():
+            columns = tables[name]
+            for row in rows:
+                for column_name, value in row.items():
+                    columns[column_name].append(value)
+    return tables
+
+
+def _arrow_type(column: Column):
+    """Arrow type of a column"""
+    import pyarrow as pa
+
+    types = {
+        "string": pa.string(),
+        "int": pa.int64(),
+        "float": pa.float64(),
+        "bool": pa.bool_(),
+        "timestamp": pa.timestamp("us", tz="UTC"),
+        "date": pa.date32(),
+        "json": pa.string(),
+    }
+    return pa.list_(types[column.kind]) if column.repeated else types[column.kind]
+
+
+@lru_cache(maxsize=None)
+def arrow_schemas(model_class: Type[BaseModel] = Metadata) -> Dict[str, Any]:
+    """Arrow schema of each flattened table, by table name. Requires pyarrow."""
+    import pyarrow as pa
+
+    return {
+        plan.name: pa.schema([pa.field(column.name, _arrow_type(column)) for column in plan.columns])
+        for plan in table_plans(model_class)
+    }
+
+
+def to_arrow_tables(
+    records: Iterable[Union[BaseModel, dict]], model_class: Type[BaseModel] = Metadata
+) -> Dict[str, Any]:
+    """Flatten records into one pyarrow.Table per table name. Requires pyarrow."""
+    import pyarrow as pa
+
+    schemas = arrow_schemas(model_class)
+    return {
+        name: pa.Table.from_pydict(columns, schema=schemas[name])
+        for name, columns in flatten_records(records, model_class).items()
+    }
+
+
+def _with_partitions(table: Any, main: Any, partition_by: Sequence[str]) -> Any:
+    """Add the partition columns of the asset each child row belongs to"""
+    import pyarrow as pa
+
+    positions = {asset_id: i for i, asset_id in enumerate(main.column("id").to_pylist())}
+    indices = pa.array([positions[asset_id] for asset_id in table.column(ASSET_ID).to_pylist()], pa.int64())
+    for name in partition_by:
+        table = table.append_column(main.schema.field(name), main.column(name).take(indices))
+    return table
+
+
+def write_parquet(
+    records: Iterable[Union[BaseModel, dict]],
+    root: Union[str, Path],
+    partition_by: Sequence[str] = ("data_description.platform",),
+    model_class: Type[BaseModel] = Metadata,
+    batch_size: int = 10000,
+) -> Dict[str, int]:
+    """
+    Write records as a partitioned Parquet dataset per table. Requires pyarrow.
+    Parameters
+    ----------
+    records : Iterable[Union[BaseModel, dict]]
+      Models or raw json documents. They are read in batches, so any iterable can be streamed.
+    root : Union[str, Path]
+      Directory that gets one sub-directory per table, e.g. root/metadata and root/session.data_streams.
+      Files are named uniquely per call, so writing into the same root again adds to the datasets there.
+    partition_by : Sequence[str]
+      Main table columns to partition by. Child table rows are partitioned with their asset.
+    model_class : Type[BaseModel]
+      Model the records belong to, Metadata by default
+    batch_size : int
+      Number of records flattened into each set of Parquet files
+
+    Returns
+    -------
+    Dict[str, int]
+      Number of rows written to each table
+    """
+    import pyarrow.parquet as pq
+
+    main_columns = {column.name for column in table_plans(model_class)[0].columns}
+    unknown = set(partition_by) - main_columns
+    if unknown:
+        raise ValueError(f"Cannot partition by {sorted(unknown)}, which are not columns of the main table")
+    records = iter(records)
+    counts = {plan.name: 0 for plan in table_plans(model_class)}
+    # unique per call, so files from an earlier write into the same root are never overwritten
+    run = uuid4().hex
+    batch_number = 0
+    while True:
+        batch = list(islice(records, batch_size))
+        if not batch:
+            return counts
+        tables = to_arrow_tables(batch, model_class)
+        for name, table in tables.items():
+            counts[name] += table.num_rows
+            if not table.num_rows:
+                continue
+            if name != MAIN_TABLE:
+                table = _with_partitions(table, tables[MAIN_TABLE], partition_by)
+            pq.write_to_dataset(
+                table,
+                Path(root) / name,
+                partition_cols=list(partition_by) or None,
+                basename_template=f"part-{run}-{batch_number}-{{i}}.parquet",
+                existing_data_behavior="overwrite_or_ignore",
+            )
+        batch_number += 1
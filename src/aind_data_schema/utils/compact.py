@@ -0,0 +1,185 @@
+"""Memory-compact stand-ins for high-cardinality leaf models"""
+
+import sys
+from decimal import Decimal
+from typing import Any, ClassVar, Dict, Tuple, Type, Union, get_args
+
+from pydantic import BaseModel
+
+from aind_data_schema.components.coordinates import CcfCoords, Coordinates3d, Translation3dTransform
+from aind_data_schema.components.devices import DAQChannel
+from aind_data_schema.core.processing import ResourceTimestamped
+from aind_data_schema.core.quality_control import QCStatus
+
+
+def _is_decimal_annotation(annotation: Any) -> bool:
+    """Check whether an annotation is Decimal, Optional[Decimal] or List[Decimal]"""
+    if annotation is Decimal:
+        return True
+    return any(_is_decimal_annotation(arg) for arg in get_args(annotation))
+
+
+def _pack_decimal(value: Decimal) -> Union[int, float, Decimal]:
+    """Store a Decimal as an int or float when it converts back to the same text"""
+    if value.as_tuple().exponent == 0:
+        return int(value)
+    as_float = float(value)
+    if str(Decimal(repr(as_float))) == str(value):
+        return as_float
+    return value
+
+
+def _unpack_decimal(value: Union[int, float, Decimal]) -> Decimal:
+    """Restore a Decimal stored by _pack_decimal"""
+    if isinstance(value, float):
+        return Decimal(repr(value))
+    return Decimal(value)
+
+
+def _pack(value: Any, is_decimal: bool) -> Any:
+    """Convert a field value to its compact storage form"""
+    if type(value) is str:
+        return sys.intern(value)
+    if isinstance(value, list):
+        return tuple(_pack(item, is_decimal) for item in value)
+    if is_decimal and isinstance(value, Decimal):
+        return _pack_decimal(value)
+    return value
+
+
+def _unpack(value: Any, is_decimal: bool) -> Any:
+    """Convert a compact storage value back to the form exposed by the model"""
+    if isinstance(value, tuple):
+        return [_unpack(item, is_decimal) for item in value]
+    if is_decimal and value is not None:
+        return _unpack_decimal(value)
+    return value
+
+
+class CompactModel:
+    """Base class for slots-backed, read-mostly copies of leaf models.
+
+    Instances expose the same attribute names as the model they stand in for,
+    but hold their values in ``__slots__`` instead of a per-instance dict.
+    Strings are interned, lists are stored as tuples and Decimals that
+    round-trip through an int or float are stored as one.
+    """
+
+    __slots__ = ()
+
+    model_class: ClassVar[Type[BaseModel]]
+    decimal_fields: ClassVar[Tuple[str, ...]] = ()
+
+    def __init__(self, **kwargs):
+        """Build a compact instance from field values, filling in model defaults"""
+        for name, field in self.model_class.model_fields.items():
+            if name in kwargs:
+                value = kwargs.pop(name)
+            elif field.is_required():
+                raise TypeError(f"{type(self).__name__} missing required field: {name}")
+            else:
+                value = field.get_default(call_default_factory=True)
+            object.__setattr__(self, "_" + name, _pack(value, name in self.decimal_fields))
+        if kwargs:
+            raise TypeError(f"{type(self).__name__} got unexpected fields: {sorted(kwargs)}")
+
+    def __setattr__(self, name: str, value: Any):
+        """Pack values assigned to public field names"""
+        if name in self.model_class.model_fields:
+            object.__setattr__(self, "_" + name, _pack(value, name in self.decimal_fields))
+        else:
+            object.__setattr__(self, name, value)
+
+    def __getstate__(self) -> Dict[str, Any]:
+        """Return packed values for pickling"""
+        return {name: object.__getattribute__(self, "_" + name) for name in self.model_class.model_fields}
+
+    def __setstate__(self, state: Dict[str, Any]):
+        """Restore packed values after unpickling"""
+        for name, value in state.items():
+            object.__setattr__(self, "_" + name, value)
+
+    def __eq__(self, other: Any) -> bool:
+        """Compare by field values"""
+        if isinstance(other, CompactModel):
+            return other.model_class is self.model_class and self.__getstate__() == other.__getstate__()
+        if isinstance(other, self.model_class):
+            return self.to_model() == other
+        return NotImplemented
+
+    def __hash__(self) -> int:
+        """Hash the packed field values"""
+        return hash((self.model_class, tuple(self.__getstate__().values())))
+
+    def __repr__(self) -> str:
+        """Mirror the pydantic repr"""
+        fields = ", ".join(f"{name}={getattr(self, name)!r}" for name in self.model_class.model_fields)
+        return f"{type(self).__name__}({fields})"
+
+    @classmethod
+    def from_model(cls, model: BaseModel) -> "CompactModel":
+        """Build a compact copy of a validated model"""
+        compact = cls.__new__(cls)
+        for name in cls.model_class.model_fields:
+            object.__setattr__(compact, "_" + name, _pack(getattr(model, name), name in cls.decimal_fields))
+        return compact
+
+    def to_model(self) -> BaseModel:
+        """Rebuild the full pydantic model without re-running validation"""
+        return self.model_class.model_construct(**{name: getattr(self, name) for name in self.model_class.model_fields})
+
+    def model_dump(self, **kwargs) -> Dict[str, Any]:
+        """Serialize through the pydantic model"""
+        return self.to_model().model_dump(**kwargs)
+
+    def model_dump_json(self, **kwargs) -> str:
+        """Serialize through the pydantic model"""
+        return self.to_model().model_dump_json(**kwargs)
+
+
+def _field_property(name: str, is_decimal: bool) -> property:
+    """Expose a slot under the public field name"""
+    slot = "_" + name
+
+    def getter(self):
+        """Unpack the stored value"""
+        return _unpack(object.__getattribute__(self, slot), is_decimal)
+
+    return property(getter, doc=f"Compact storage for '{name}'")
+
+
+_COMPACT_CLASSES: Dict[Type[BaseModel], Type[CompactModel]] = {}
+
+
+def compact_class(model_class: Type[BaseModel]) -> Type[CompactModel]:
+    """Return the slots-backed CompactModel subclass for a pydantic model class"""
+    if model_class not in _COMPACT_CLASSES:
+        decimal_fields = tuple(
+            name for name, field in model_class.model_fields.items() if _is_decimal_annotation(field.annotation)
+        )
+        namespace = {
+            "__slots__": tuple("_" + name for name in model_class.model_fields),
+            "__doc__": f"Compact, slots-backed copy of {model_class.__name__}",
+            "__module__": __name__,
+            "model_class": model_class,
+            "decimal_fields": decimal_fields,
+        }
+        for name in model_class.model_fields:
+            namespace[name] = _field_property(name, name in decimal_fields)
+        _COMPACT_CLASSES[model_class] = type(f"Compact{model_class.__name__}", (CompactModel,), namespace)
+    return _COMPACT_CLASSES[model_class]
+
+
+CompactCoordinates3d = compact_class(Coordinates3d)
+CompactCcfCoords = compact_class(CcfCoords)
+CompactResourceTimestamped = compact_class(ResourceTimestamped)
+CompactDAQChannel = compact_class(DAQChannel)
+CompactQCStatus = compact_class(QCStatus)
+CompactTranslation3dTransform = compact_class(Translation3dTransform)
+
+
+def compact(model: BaseModel) -> Union[CompactModel, BaseModel]:
+    """Return a compact copy of a model if its class has a compact form, otherwise the model itself"""
+    if type(model) in _COMPACT_CLASSES:
+        return _COMPACT_CLASSES[type(model)].from_model(model)
+    return model
@@ -0,0 +1,216 @@
+"""Archive of rig and instrument versions stored as deltas from one another"""
+
+import copy
+import json
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, NamedTuple, Optional, Type, Union
+
+from aind_data_schema.base import AindCoreModel, document_fingerprint
+from aind_data_schema.core.rig import Rig
+from aind_data_schema.utils.jsonl import iter_jsonl, write_jsonl
+from aind_data_schema.utils.patch import Patch, apply_patch, diff
+
+
+class Delta(NamedTuple):
+    """A version stored as a patch from the version with the base fingerprint"""
+
+    base: str
+    patch: Patch
+    fingerprint: str
+
+
+def make_delta(base: Union[AindCoreModel, dict], target: Union[AindCoreModel, dict]) -> Delta:
+    """
+    Encode a version as a delta from another
+    Parameters
+    ----------
+    base : Union[AindCoreModel, dict]
+      Version to patch from, e.g. the previous version of a rig
+    target : Union[AindCoreModel, dict]
+      Version to encode. Devices are matched by name, so swapping one
+      camera or adding one calibration patches that device only.
+
+    Returns
+    -------
+    Delta
+      Fingerprints of both versions and the patch between them
+    """
+    base, target = _document(base), _document(target)
+    return Delta(document_fingerprint(base), diff(base, target), document_fingerprint(target))
+
+
+def apply_delta(base: Union[AindCoreModel, dict], delta: Delta) -> dict:
+    """Rebuild the json document of a version from its delta and base, checking both fingerprints"""
+    base = _document(base)
+    if document_fingerprint(base) != delta.base:
+        raise ValueError(f"Delta applies to {delta.base}, not {document_fingerprint(base)}")
+    document = apply_patch(base, delta.patch)
+    if document_fingerprint(document) != delta.fingerprint:
+        raise ValueError(f"Delta produced {document_fingerprint(document)} instead of {delta.fingerprint}")
+    return document
+
+
+def _document(version: Union[AindCoreModel, dict]) -> dict:
+    """Json document of a version"""
+    if isinstance(version, AindCoreModel):
+        return json.loads(version.model_dump_json(by_alias=True))
+    return version
+
+
+class DeltaArchive:
+    """Versions of rigs or instruments, keyed by the fingerprint of their content.
+
+    Each version is stored either whole or as a Delta from a base version, so
+    an archive of hundreds of revisions of a rig costs roughly one full copy
+    plus the changes. At most snapshot_interval - 1 patches are applied to
+    rebuild a version, and recently rebuilt versions are cached. Versions stay
+    stored until they are dropped with gc.
+    """
+
+    def __init__(self, model_class: Type[AindCoreModel] = Rig, snapshot_interval: int = 16, cache_size: int = 64):
+        """
+        Parameters
+        ----------
+        model_class : Type[AindCoreModel]
+          Model that versions are validated as, e.g. Rig or Instrument
+        snapshot_interval : int
+          Store a version whole when its chain of deltas would reach this length
+        cache_size : int
+          Number of rebuilt documents, and separately of validated models, kept in memory
+        """
+        self.model_class = model_class
+        self.snapshot_interval = snapshot_interval
+        self.cache_size = cache_size
+        self._documents: Dict[str, dict] = {}
+        self._deltas: Dict[str, Delta] = {}
+        self._depths: Dict[str, int] = {}
+        self._cache: "OrderedDict[str, dict]" = OrderedDict()
+        self._models: "OrderedDict[str, AindCoreModel]" = OrderedDict()
+
+    def __contains__(self, fingerprint: str) -> bool:
+        """Check whether a version is stored"""
+        return fingerprint in self._depths
+
+    def __len__(self) -> int:
+        """Number of stored versions"""
+        return len(self._depths)
+
+    def add(self, version: Union[AindCoreModel, dict], base: Optional[str] = None) -> str:
+        """
+        Store a version, if it is not stored already, and return its fingerprint
+        Parameters
+        ----------
+        version : Union[AindCoreModel, dict]
+          Version to store
+        base : Optional[str]
+          Fingerprint of a stored version to encode it as a delta from, usually the
+          previous version. Without one, or at the end of a long chain, it is stored whole.
+        """
+        document = _document(version)
+        fingerprint = document_fingerprint(document)
+        if fingerprint in self:
+            return fingerprint
+        if base is not None and base not in self:
+            raise KeyError(f"No version {base}")
+        if base is None or self._depths[base] + 1 >= self.snapshot_interval:
+            self._documents[fingerprint] = copy.deepcopy(document)
+            self._depths[fingerprint] = 0
+        else:
+            self._deltas[fingerprint] = Delta(base, diff(self._materialize(base), document), fingerprint)
+            self._depths[fingerprint] = self._depths[base] + 1
+        return fingerprint
+
+    def _materialize(self, fingerprint: str) -> dict:
+        """Json document of a version, shared with the cache, so it must not be changed"""
+        if fingerprint not in self:
+            raise KeyError(f"No version {fingerprint}")
+        chain = []
+        while fingerprint not in self._documents and fingerprint not in self._cache:
+            chain.append(self._deltas[fingerprint])
+            fingerprint = chain[-1].base
+        document = self._documents[fingerprint] if fingerprint in self._documents else self._cache[fingerprint]
+        if not chain:
+            return document
+        # one copy for the whole chain, so only the requested version is cached
+        document = copy.deepcopy(document)
+        for delta in chain[::-1]:
+            document = apply_patch(document, delta.patch, in_place=True)
+        self._remember(self._cache, chain[0].fingerprint, document)
+        return document
+
+    def _remember(self, cache: OrderedDict, fingerprint: str, value):
+        """Add to an LRU cache, evicting the least recently used entry if it is full"""
+        cache[fingerprint] = value
+        cache.move_to_end(fingerprint)
+        if len(cache) > self.cache_size:
+            cache.popitem(last=False)
+
+    def get_document(self, fingerprint: str) -> dict:
+        """Json document of a version"""
+        return copy.deepcopy(self._materialize(fingerprint))
+
+    def get(self, fingerprint: str) -> AindCoreModel:
+        """Validated version, shared by everyone who gets it, so it must be treated as read-only"""
+        if fingerprint not in self._models:
+            self._remember(self._models, fingerprint, self.model_class.model_validate(self._materialize(fingerprint)))
+        self._models.move_to_end(fingerprint)
+        return self._models[fingerprint]
+
+    def delta(self, fingerprint: str) -> Optional[Delta]:
+        """The delta a version is stored as, or None if it is stored whole"""
+        return self._deltas.get(fingerprint)
+
+    def gc(self, keep: Iterable[str]) -> int:
+        """
+        Drop the versions that are not kept, except those that kept versions are deltas from
+        Parameters
+        ----------
+        keep : Iterable[str]
+          Fingerprints of the versions still in use
+
+        Returns
+        -------
+        int
+          Number of versions dropped
+        """
+        needed = set()
+        for fingerprint in keep:
+            while fingerprint not in needed:
+                if fingerprint not in self:
+                    raise KeyError(f"No version {fingerprint}")
+                needed.add(fingerprint)
+                if fingerprint not in self._deltas:
+                    break
+                fingerprint = self._deltas[fingerprint].base
+        dropped = [fingerprint for fingerprint in self._depths if fingerprint not in needed]
+        for fingerprint in dropped:
+            for store in (self._documents, self._deltas, self._depths, self._cache, self._models):
+                store.pop(fingerprint, None)
+        return len(dropped)
+
+    def _entries(self) -> Iterator[dict]:
+        """Stored versions as json, each after its base"""
+        for fingerprint in sorted(self._depths, key=self._depths.get):
+            if fingerprint in self._documents:
+                yield {"fingerprint": fingerprint, "document": self._documents[fingerprint]}
+            else:
+                yield self._deltas[fingerprint]._asdict()
+
+    def write(self, path: Union[str, Path]) -> int:
+        """Write the archive as JSON Lines, compressed according to the file suffix, and return the version count"""
+        return write_jsonl(self._entries(), path)
+
+    @classmethod
+    def read(cls, path: Union[str, Path], **kwargs) -> "DeltaArchive":
+        """Read an archive written by write"""
+        archive = cls(**kwargs)
+        for entry in iter_jsonl(path, model=None):
+            if "document" in entry:
+                archive._documents[entry["fingerprint"]] = entry["document"]
+                archive._depths[entry["fingerprint"]] = 0
+            else:
+                delta = Delta(**entry)
+                archive._deltas[delta.fingerprint] = delta
+                archive._depths[delta.fingerprint] = archive._depths[delta.base] + 1
+        return archive
@@ -0,0 +1,155 @@
+"""String interning for low-cardinality fields of loaded metadata records"""
+
+import sys
+from typing import Any, Dict, FrozenSet, Optional, Type, TypeVar, Union
+
+from pydantic import BaseModel
+
+ModelType = TypeVar("ModelType", bound=BaseModel)
+
+# Modules whose models carry the repeated names we want to share across records.
+# aind_data_schema_models covers organizations, modalities, platforms and species.
+INTERNED_MODULES = (
+    "aind_data_schema.components.devices",
+    "aind_data_schema.core.session",
+    "aind_data_schema.core.procedures",
+    "aind_data_schema_models.",
+)
+
+INTERNED_FIELDS = frozenset(
+    {
+        # components.devices
+        "name",
+        "device_type",
+        "device_name",
+        "computer_name",
+        "channel_name",
+        "assembly_name",
+        "model",
+        "firmware_version",
+        "hardware_version",
+        "version",
+        # core.session
+        "experimenter_full_name",
+        "rig_id",
+        "mouse_platform_name",
+        "session_type",
+        "iacuc_protocol",
+        "daq_names",
+        "camera_names",
+        "stimulus_device_names",
+        "stimulus_name",
+        "patch_cord_name",
+        "fiber_name",
+        # core.procedures
+        "protocol_id",
+        "targeted_structure",
+        "primary_targeted_structure",
+        "procedure_name",
+        "well_type",
+        # aind_data_schema_models
+        "abbreviation",
+        "registry_identifier",
+    }
+)
+
+
+def _is_unit_field(field_name: str) -> bool:
+    """Unit fields are always low-cardinality"""
+    return field_name in ("unit", "units") or field_name.endswith("_unit") or field_name.endswith("_units")
+
+
+class StringInterner:
+    """Share one copy of each repeated string across many loaded records.
+
+    The interner keeps its own pool, so dropping the interner releases every
+    string that is no longer referenced by a record. Apply it to each record as
+    it is loaded, then inspect ``bytes_saved`` to see how much memory was freed.
+    """
+
+    def __init__(self, fields: FrozenSet[str] = INTERNED_FIELDS, modules: tuple = INTERNED_MODULES):
+        """
+        Parameters
+        ----------
+        fields : FrozenSet[str]
+          Field names to intern, in addition to any unit field
+        modules : tuple
+          Module name prefixes of the models whose fields are interned
+        """
+        self.fields = fields
+        self.modules = modules
+        self.strings_seen = 0
+        self.strings_replaced = 0
+        self.bytes_saved = 0
+        self._pool: Dict[str, str] = {}
+        self._fields_by_class: Dict[type, FrozenSet[str]] = {}
+
+    def __len__(self) -> int:
+        """Number of distinct strings in the pool"""
+        return len(self._pool)
+
+    def __repr__(self) -> str:
+        """Summarize the interning statistics"""
+        return (
+            f"StringInterner(unique={len(self)}, seen={self.strings_seen}, "
+            f"replaced={self.strings_replaced}, bytes_saved={self.bytes_saved})"
+        )
+
+    def intern(self, value: str) -> str:
+        """Return the pooled copy of a string, recording the bytes saved if it was a duplicate"""
+        self.strings_seen += 1
+        pooled = self._pool.setdefault(value, value)
+        if pooled is not value:
+            self.strings_replaced += 1
+            self.bytes_saved += sys.getsizeof(value)
+        return pooled
+
+    def _interned_fields(self, model_class: type) -> FrozenSet[str]:
+        """Field names to intern for a model class, cached per class"""
+        if model_class not in self._fields_by_class:
+            if model_class.__module__.startswith(self.modules):
+                names = frozenset(
+                    name for name in model_class.model_fields if name in self.fields or _is_unit_field(name)
+                )
+            else:
+                names = frozenset()
+            self._fields_by_class[model_class] = names
+        return self._fields_by_class[model_class]
+
+    def _intern_value(self, value: Any, intern_strings: bool) -> Any:
+        """Intern strings in a field value and descend into nested models and containers"""
+        if isinstance(value, BaseModel):
+            self.intern_model(value)
+        elif type(value) is str:
+            if intern_strings:
+                return self.intern(value)
+        elif isinstance(value, list):
+            for i, item in enumerate(value):
+                value[i] = self._intern_value(item, intern_strings)
+        elif isinstance(value, dict):
+            for key, item in value.items():
+                value[key] = self._intern_value(item, False)
+        return value
+
+    def intern_model(self, model: ModelType) -> ModelType:
+        """Intern the known low-cardinality string fields of a model tree, in place"""
+        fields = self._interned_fields(type(model))
+        values = model.__dict__
+        for name, value in values.items():
+            values[name] = self._intern_value(value, name in fields)
+        return model
+
+    def model_validate(self, model_class: Type[ModelType], obj: Any) -> ModelType:
+        """Validate a python object and intern the result"""
+        return self.intern_model(model_class.model_validate(obj))
+
+    def model_validate_json(self, model_class: Type[ModelType], json_data: Union[str, bytes]) -> ModelType:
+        """Validate a JSON document and intern the result"""
+        return self.intern_model(model_class.model_validate_json(json_data))
+
+
+def maybe_intern(model: ModelType, interner: Optional[StringInterner]) -> ModelType:
+    """Apply an interner to a freshly loaded model if the loader was given one"""
+    if interner is None:
+        return model
+    return interner.intern_model(model)
@@ -0,0 +1,133 @@
+"""Pull selected fields out of a JSON document without decoding the rest of it"""
+
+import json
+import re
+from typing import Any, Dict, Iterable, Sequence, Tuple
+
+_WHITESPACE = re.compile(r"[ \t\n\r]*")
+_STRING = re.compile(r'"(?:[^"\\]|\\.)*"', re.DOTALL)
+_SCALAR = re.compile(r"[^,\]}\s]+")
+# Consumes everything up to and including the next bracket, swallowing whole
+# strings on the way, so skipping a subtree costs one step per bracket
+_NEXT_BRACKET = re.compile(r'[^"\[\]{}]*(?:"(?:[^"\\]|\\.)*"[^"\[\]{}]*)*[\[\]{}]', re.DOTALL)
+_DECODER = json.JSONDecoder()
+
+
+def _skip_whitespace(text: str, pos: int) -> int:
+    """Return the position of the next non-whitespace character"""
+    return _WHITESPACE.match(text, pos).end()
+
+
+def _expect(text: str, pos: int, char: str) -> int:
+    """Check for a structural character and return the position after it"""
+    pos = _skip_whitespace(text, pos)
+    if not text.startswith(char, pos):
+        raise ValueError(f"Expected '{char}' at position {pos}")
+    return pos + 1
+
+
+def skip_value(text: str, pos: int) -> int:
+    """Return the position just past the JSON value starting at pos, without decoding it"""
+    pos = _skip_whitespace(text, pos)
+    if text.startswith('"', pos):
+        return _STRING.match(text, pos).end()
+    if not text.startswith(("{", "["), pos):
+        match = _SCALAR.match(text, pos)
+        if match is None:
+            raise ValueError(f"Expected a JSON value at position {pos}")
+        return match.end()
+    depth = 0
+    while True:
+        match = _NEXT_BRACKET.match(text, pos)
+        if match is None:
+            raise ValueError(f"Unterminated JSON value starting at position {pos}")
+        pos = match.end()
+        depth += 1 if text[pos - 1] in "{[" else -1
+        if depth == 0:
+            return pos
+
+
+def _group_paths(paths: Iterable[Tuple[str, ...]]) -> Dict[str, Any]:
+    """Turn key paths into a tree where True marks a key that is wanted whole"""
+    tree: Dict[str, Any] = {}
+    for path in paths:
+        head, rest = path[0], path[1:]
+        if not rest or tree.get(head) is True:
+            tree[head] = True
+        else:
+            tree.setdefault(head, [])
+            tree[head].append(rest)
+    return {key: value if value is True else _group_paths(value) for key, value in tree.items()}
+
+
+def _scan_object(text: str, pos: int, wanted: Dict[str, Any], stop_early: bool) -> Tuple[Dict[str, Any], int]:
+    """Decode the wanted keys of the object starting at pos, skipping everything else"""
+    found: Dict[str, Any] = {}
+    pos = _expect(text, pos, "{")
+    pos = _skip_whitespace(text, pos)
+    if text.startswith("}", pos):
+        return found, pos + 1
+    while True:
+        pos = _skip_whitespace(text, pos)
+        key_match = _STRING.match(text, pos)
+        if key_match is None:
+            raise ValueError(f"Expected an object key at position {pos}")
+        key = json.loads(key_match.group())
+        pos = _skip_whitespace(text, _expect(text, key_match.end(), ":"))
+        subtree = wanted.get(key)
+        if subtree is True:
+            found[key], pos = _DECODER.raw_decode(text, pos)
+        elif subtree is not None and text[pos] == "{":
+            found[key], pos = _scan_object(text, pos, subtree, stop_early=False)
+        elif subtree is not None:
+            found[key], pos = _DECODER.raw_decode(text, pos)
+        else:
+            pos = skip_value(text, pos)
+        if stop_early and len(found) == len(wanted):
+            # everything we need has been read, the rest of the document is left untouched
+            return found, pos
+        pos = _skip_whitespace(text, pos)
+        if text.startswith("}", pos):
+            return found, pos + 1
+        pos = _expect(text, pos, ",")
+
+
+def extract_paths(text: str, paths: Iterable[Tuple[str, ...]]) -> Dict[str, Any]:
+    """Decode only the values at the given key paths of a JSON object.
+
+    Returns a nested dict holding the wanted keys that are present. Subtrees
+    that are not on a wanted path are skipped without being decoded, and
+    scanning stops as soon as every wanted top-level key has been read.
+    """
+    found, _ = _scan_object(text, 0, _group_paths(paths), stop_early=True)
+    return found
+
+
+def _find_key(text: str, pos: int, key: str) -> int:
+    """Return the position of the value of a key in the object starting at pos, skipping the other values"""
+    pos = _skip_whitespace(text, _expect(text, pos, "{"))
+    if text.startswith("}", pos):
+        raise KeyError(key)
+    while True:
+        key_match = _STRING.match(text, _skip_whitespace(text, pos))
+        if key_match is None:
+            raise ValueError(f"Expected an object key at position {pos}")
+        pos = _skip_whitespace(text, _expect(text, key_match.end(), ":"))
+        if json.loads(key_match.group()) == key:
+            return pos
+        pos = _skip_whitespace(text, skip_value(text, pos))
+        if text.startswith("}", pos):
+            raise KeyError(key)
+        pos = _expect(text, pos, ",")
+
+
+def value_span(text: str, path: Sequence[str]) -> Tuple[int, int]:
+    """Start and end positions of the value at a key path of a JSON object.
+
+    Nothing is decoded, so the value can be changed in place by splicing the
+    text. Raises KeyError if a key on the path is missing.
+    """
+    pos = 0
+    for key in path:
+        pos = _find_key(text, pos, key)
+    return pos, skip_value(text, pos)
@@ -0,0 +1,138 @@
+"""Stream Metadata and core records to and from JSON Lines files"""
+
+import bz2
+import gzip
+import json
+import logging
+import lzma
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
+from pathlib import Path
+from typing import IO, Any, Iterable, Iterator, List, Optional, Type, Union
+
+from pydantic import BaseModel, ValidationError
+
+from aind_data_schema.core.metadata import Metadata
+from aind_data_schema.utils.interning import StringInterner, maybe_intern
+
+_OPENERS = {None: open, "gzip": gzip.open, "bz2": bz2.open, "xz": lzma.open}
+_SUFFIXES = {".gz": "gzip", ".bz2": "bz2", ".xz": "xz"}
+_BUFFER_SIZE = 1 << 20
+
+
+def _open(path: Union[str, Path], mode: str, compression: Optional[str]) -> IO[str]:
+    """Open a text file, compressed according to compression or, with "infer", to its suffix"""
+    if compression == "infer":
+        compression = _SUFFIXES.get(Path(path).suffix)
+    if compression not in _OPENERS:
+        raise ValueError(f"Unknown compression '{compression}'. Use one of {list(_OPENERS)} or 'infer'")
+    if compression is None:
+        return open(path, mode, encoding="utf-8", buffering=_BUFFER_SIZE)
+    return _OPENERS[compression](path, mode + "t", encoding="utf-8")
+
+
+def iter_jsonl(
+    path: Union[str, Path],
+    model: Optional[Type[BaseModel]] = Metadata,
+    errors: str = "raise",
+    compression: Optional[str] = "infer",
+    interner: Optional[StringInterner] = None,
+) -> Iterator[Any]:
+    """
+    Lazily read records from a JSON Lines file, one line at a time
+    Parameters
+    ----------
+    path : Union[str, Path]
+      File to read, e.g. a document database dump
+    model : Optional[Type[BaseModel]]
+      Model each line is validated as, Metadata by default. With None, lines are yielded as dicts.
+    errors : str
+      "raise" to stop at the first invalid line, or "skip" to log it and carry on
+    compression : Optional[str]
+      "gzip", "bz2", "xz", None, or "infer" to pick from the file suffix
+    interner : Optional[StringInterner]
+      Interner applied to each validated model
+
+    Returns
+    -------
+    Iterator[Any]
+      Validated models, or dicts if model is None
+    """
+    if errors not in ("raise", "skip"):
+        raise ValueError(f"errors must be 'raise' or 'skip', not '{errors}'")
+    with _open(path, "r", compression) as f:
+        for line_number, line in enumerate(f, start=1):
+            if not line.strip():
+                continue
+            try:
+                if model is None:
+                    yield json.loads(line)
+                else:
+                    yield maybe_intern(model.model_validate_json(line), interner)
+            except (ValidationError, ValueError) as e:
+                if errors == "raise":
+                    raise ValueError(f"{path}, line {line_number}: {e}") from e
+                logging.warning(f"Skipping {path}, line {line_number}: {e}")
+
+
+def _encode(records: List[Any], by_alias: bool) -> str:
+    """Encode a chunk of records as JSON Lines"""
+    lines = [
+        record.model_dump_json(by_alias=by_alias) if isinstance(record, BaseModel) else json.dumps(record)
+        for record in records
+    ]
+    return "\n".join(lines) + "\n"
+
+
+def _write_oldest(f: IO[str], pending: deque) -> int:
+    """Write the oldest encoded chunk and return its number of records"""
+    size, future = pending.popleft()
+    f.write(future.result())
+    return size
+
+
+def write_jsonl(
+    records: Iterable[Any],
+    path: Union[str, Path],
+    compression: Optional[str] = "infer",
+    threads: int = 1,
+    chunk_size: int = 1000,
+    by_alias: bool = True,
+) -> int:
+    """
+    Write records to a JSON Lines file
+    Parameters
+    ----------
+    records : Iterable[Any]
+      Models or json-serializable dicts. The iterable is consumed lazily.
+    path : Union[str, Path]
+      File to write
+    compression : Optional[str]
+      "gzip", "bz2", "xz", None, or "infer" to pick from the file suffix
+    threads : int
+      Number of threads encoding chunks of records. Chunks are still written in order,
+      and at most two chunks per thread are held in memory.
+    chunk_size : int
+      Number of records encoded and written together
+    by_alias : bool
+      Dump models by alias, e.g. "_id" as used by the document database
+
+    Returns
+    -------
+    int
+      Number of records written
+    """
+    records = iter(records)
+    chunks = iter(lambda: list(islice(records, chunk_size)), [])
+    count = 0
+    with _open(path, "w", compression) as f, ThreadPoolExecutor(max_workers=threads) as executor:
+        pending: deque = deque()
+        for chunk in chunks:
+            pending.append((len(chunk), executor.submit(_encode, chunk, by_alias)))
+            # back pressure: wait for the oldest chunk before reading more records
+            if len(pending) >= 2 * threads:
+                count += _write_oldest(f, pending)
+        while pending:
+            count += _write_oldest(f, pending)
+    return count
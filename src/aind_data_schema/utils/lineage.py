@@ -0,0 +1,204 @@
+"""Provenance graph of data assets, built from their data descriptions and processing records"""
+
+import re
+from heapq import heapify, heappop, heappush
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple, Union
+
+from aind_data_schema_models.data_name_patterns import DataRegex
+
+from aind_data_schema.core.data_description import DataDescription
+from aind_data_schema.core.metadata import Metadata
+from aind_data_schema.core.processing import Processing
+from aind_data_schema.utils.metadata_index import get_path
+
+_ASSET_NAME = re.compile(DataRegex.DATA.value)
+
+
+def asset_name_from_location(location: Optional[str]) -> Optional[str]:
+    """Name of the data asset a location is in, e.g. the asset of s3://bucket/<name>/ecephys, or None"""
+    for part in reversed(re.split(r"[/\\]", location or "")):
+        if _ASSET_NAME.match(part):
+            return part
+    return None
+
+
+def _inputs(data_description: Any, processing: Any) -> Set[str]:
+    """Names of the assets an asset was made from"""
+    inputs = {get_path(data_description, "input_data_name")}
+    for related in get_path(data_description, "related_data") or []:
+        inputs.add(asset_name_from_location(get_path(related, "related_data_path")))
+    processes = list(get_path(processing, "processing_pipeline", "data_processes") or [])
+    processes += get_path(processing, "analyses") or []
+    for process in processes:
+        inputs.add(asset_name_from_location(get_path(process, "input_location")))
+    inputs.discard(None)
+    return inputs
+
+
+class LineageIndex:
+    """Provenance graph of data assets, for ancestry queries without scanning records.
+
+    An asset is linked to the assets it was made from: the input_data_name of
+    a derived data description, the assets in its related_data paths, and the
+    assets that the input_location of its processing steps are in. Assets that
+    are only referenced as inputs, such as raw assets whose records were not
+    added, are part of the graph too.
+
+    Parents and children are kept as adjacency sets. Ancestors and descendants
+    are computed once per asset and cached until the graph changes, so repeated
+    queries, e.g. for every raw asset of a re-processing campaign, are lookups.
+    """
+
+    def __init__(self):
+        """Create an empty index"""
+        self._parents: Dict[str, Set[str]] = {}
+        self._children: Dict[str, Set[str]] = {}
+        self._pipelines: Dict[str, Tuple[Optional[str], Optional[str]]] = {}
+        self._by_pipeline_version: Dict[str, Set[str]] = {}
+        self._order: Optional[List[str]] = None
+        self._ancestors: Dict[str, Set[str]] = {}
+        self._descendants: Dict[str, Set[str]] = {}
+
+    def __len__(self) -> int:
+        """Number of assets in the graph"""
+        return len(self._parents)
+
+    def __contains__(self, name: str) -> bool:
+        """Check whether an asset is in the graph"""
+        return name in self._parents
+
+    def _node(self, name: str):
+        """Add an asset without links"""
+        self._parents.setdefault(name, set())
+        self._children.setdefault(name, set())
+
+    def add(
+        self,
+        data_description: Union[DataDescription, dict],
+        processing: Optional[Union[Processing, dict]] = None,
+    ) -> str:
+        """
+        Add an asset, replacing the links to its inputs if it was added before.
+        Assets are keyed by name, so a data description without a name is rejected
+        with a ValueError.
+        Parameters
+        ----------
+        data_description : Union[DataDescription, dict]
+          Data description of the asset, or its json document
+        processing : Optional[Union[Processing, dict]]
+          Processing record of the asset, or its json document
+
+        Returns
+        -------
+        str
+          Name of the asset
+        """
+        name = get_path(data_description, "name")
+        if name is None:
+            raise ValueError("An asset needs a data description with a name.")
+        self._node(name)
+        for parent in self._parents[name]:
+            self._children[parent].discard(name)
+        self._parents[name] = set()
+        for parent in _inputs(data_description, processing) - {name}:
+            self._node(parent)
+            self._parents[name].add(parent)
+            self._children[parent].add(name)
+
+        version, _ = self._pipelines.pop(name, (None, None))
+        if version is not None:
+            self._by_pipeline_version[version].discard(name)
+        version = get_path(processing, "processing_pipeline", "pipeline_version")
+        if version is not None:
+            self._pipelines[name] = (version, get_path(processing, "processing_pipeline", "pipeline_url"))
+            self._by_pipeline_version.setdefault(version, set()).add(name)
+
+        self._order = None
+        self._ancestors.clear()
+        self._descendants.clear()
+        return name
+
+    def add_record(self, record: Union[Metadata, dict]) -> str:
+        """Add the asset of a Metadata record, or of its json document"""
+        return self.add(get_path(record, "data_description"), get_path(record, "processing"))
+
+    def add_many(self, records: Iterable[Union[Metadata, dict]]) -> List[str]:
+        """Add the assets of many Metadata records"""
+        return [self.add_record(record) for record in records]
+
+    def parents(self, name: str) -> Set[str]:
+        """Assets an asset was made from"""
+        return set(self._parents[name])
+
+    def children(self, name: str) -> Set[str]:
+        """Assets made from an asset"""
+        return set(self._children[name])
+
+    def topological_order(self) -> List[str]:
+        """Every asset, after all the assets it was made from, and otherwise in name order"""
+        if self._order is None:
+            remaining = {name: len(parents) for name, parents in self._parents.items()}
+            ready = [name for name, count in remaining.items() if count == 0]
+            heapify(ready)
+            order = []
+            while ready:
+                name = heappop(ready)
+                order.append(name)
+                for child in self._children[name]:
+                    remaining[child] -= 1
+                    if remaining[child] == 0:
+                        heappush(ready, child)
+            if len(order) < len(remaining):
+                cycle = sorted(name for name, count in remaining.items() if count)
+                raise ValueError(f"Assets are derived from each other: {cycle}")
+            self._order = order
+        return list(self._order)
+
+    def _closure(self, name: str, edges: Dict[str, Set[str]], cache: Dict[str, Set[str]]) -> Set[str]:
+        """Assets reachable from an asset, computed bottom up and cached for every asset on the way"""
+        # cycles would never finish, so make sure there are none
+        self.topological_order()
+        stack = [name]
+        while stack:
+            node = stack[-1]
+            if node in cache:
+                stack.pop()
+                continue
+            pending = [neighbor for neighbor in edges[node] if neighbor not in cache]
+            if pending:
+                stack.extend(pending)
+                continue
+            stack.pop()
+            closure = set(edges[node])
+            for neighbor in edges[node]:
+                closure |= cache[neighbor]
+            cache[node] = closure
+        return set(cache[name])
+
+    def ancestors(self, name: str) -> Set[str]:
+        """Every asset an asset was made from, directly or not"""
+        return self._closure(name, self._parents, self._ancestors)
+
+    def descendants(self, name: str) -> Set[str]:
+        """Every asset made from an asset, directly or not"""
+        return self._closure(name, self._children, self._descendants)
+
+    def assets_by_pipeline_version(self, version: str, pipeline_url: Optional[str] = None) -> Set[str]:
+        """
+        Assets whose processing pipeline has a version
+        Parameters
+        ----------
+        version : str
+          pipeline_version of the processing pipeline
+        pipeline_url : Optional[str]
+          Only assets of the pipeline at this URL, since versions of different pipelines can be the same
+
+        Returns
+        -------
+        Set[str]
+          Names of the assets
+        """
+        names = self._by_pipeline_version.get(version, set())
+        if pipeline_url is None:
+            return set(names)
+        return {name for name in names if self._pipelines[name][1] == pipeline_url}
@@ -0,0 +1,231 @@
+"""In-memory secondary indexes over many Metadata records"""
+
+import json
+from bisect import bisect_left, insort
+from datetime import datetime, timezone
+from enum import Enum
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple, Union
+
+from pydantic import TypeAdapter, ValidationError
+
+from aind_data_schema.core.metadata import Metadata
+from aind_data_schema.core.quality_control import QualityControl
+
+Record = Union[Metadata, dict]
+
+# accepts any number of fractional second digits, unlike datetime.fromisoformat before python 3.11
+_DATETIME = TypeAdapter(datetime)
+
+# Keys that are matched by equality. modality is multi-valued: a record is
+# indexed under every modality in its data description.
+INDEXED_KEYS = ("subject_id", "modality", "platform", "rig_id", "qc_status", "metadata_status")
+
+
+def get_path(record: Any, *path: str) -> Any:
+    """Follow attribute or dict keys, returning None if anything along the way is missing"""
+    value = record
+    for key in path:
+        if value is None:
+            return None
+        value = value.get(key) if isinstance(value, dict) else getattr(value, key, None)
+    return value
+
+
+def normalize_value(value: Any) -> Any:
+    """Reduce enums and aind_data_schema_models objects to the plain value they are indexed by"""
+    if isinstance(value, Enum):
+        return value.value
+    abbreviation = get_path(value, "abbreviation")
+    if abbreviation is not None:
+        return abbreviation
+    return value
+
+
+def _as_datetime(value: Any) -> Optional[datetime]:
+    """Parse an ISO timestamp from a raw document, as an aware datetime, reading naive timestamps as UTC"""
+    if value is None:
+        return None
+    if not isinstance(value, datetime):
+        value = _DATETIME.validate_python(value)
+    # naive and aware datetimes cannot be compared, so the sorted time index holds aware ones only
+    return value if value.tzinfo is not None else value.replace(tzinfo=timezone.utc)
+
+
+def _qc_status(record: Record) -> Optional[str]:
+    """Overall QC status of a record, computed from its raw evaluations when needed"""
+    quality_control = get_path(record, "quality_control")
+    if isinstance(quality_control, dict):
+        try:
+            quality_control = QualityControl.model_validate(quality_control)
+        except ValidationError:
+            return None
+    return None if quality_control is None else normalize_value(quality_control.status)
+
+
+def record_keys(record: Record) -> Dict[str, Any]:
+    """Extract the indexed scalar keys of a Metadata record or of a raw document"""
+    if isinstance(record, dict):
+        record_id = record.get("_id", record.get("id"))
+    else:
+        record_id = record.id
+    if record_id is None:
+        # records are indexed by id, so records without one would replace each other
+        raise ValueError("Record has no _id or id")
+    return {
+        "id": str(record_id),
+        "name": get_path(record, "name") or get_path(record, "data_description", "name"),
+        "subject_id": (
+            get_path(record, "subject", "subject_id")
+            or get_path(record, "data_description", "subject_id")
+            or get_path(record, "session", "subject_id")
+            or get_path(record, "procedures", "subject_id")
+        ),
+        "modality": sorted({normalize_value(m) for m in get_path(record, "data_description", "modality") or []}),
+        "platform": normalize_value(get_path(record, "data_description", "platform")),
+        "creation_time": _as_datetime(get_path(record, "data_description", "creation_time")),
+        "rig_id": get_path(record, "rig", "rig_id"),
+        "qc_status": _qc_status(record),
+        "metadata_status": normalize_value(get_path(record, "metadata_status")),
+        "schema_version": get_path(record, "schema_version"),
+    }
+
+
+class MetadataIndex:
+    """Secondary indexes over Metadata records for fast compound queries.
+
+    Records are ingested as Metadata models or as raw documents, and only their
+    indexed keys are kept. Equality keys map each value to the set of record
+    ids that have it, and creation times are kept sorted for range queries, so
+    a query is a handful of set intersections rather than a scan.
+    """
+
+    def __init__(self):
+        """Create an empty index"""
+        self._records: Dict[str, Dict[str, Any]] = {}
+        self._indexes: Dict[str, Dict[Any, Set[str]]] = {key: {} for key in INDEXED_KEYS}
+        self._creation_times: List[Tuple[datetime, str]] = []
+
+    def __len__(self) -> int:
+        """Number of indexed records"""
+        return len(self._records)
+
+    def __contains__(self, record_id: Any) -> bool:
+        """Check whether a record id is indexed"""
+        return str(record_id) in self._records
+
+    def keys(self, record_id: Any) -> Dict[str, Any]:
+        """Indexed keys of a record"""
+        return dict(self._records[str(record_id)])
+
+    def _add(self, keys: Dict[str, Any]):
+        """Add extracted keys to every index"""
+        record_id = keys["id"]
+        self._records[record_id] = keys
+        for key in INDEXED_KEYS:
+            values = keys[key] if key == "modality" else [keys[key]]
+            for value in values:
+                if value is not None:
+                    self._indexes[key].setdefault(value, set()).add(record_id)
+        if keys["creation_time"] is not None:
+            insort(self._creation_times, (keys["creation_time"], record_id))
+
+    def insert(self, record: Record) -> str:
+        """Index a record, replacing any earlier version with the same id, and return its id"""
+        keys = record_keys(record)
+        if keys["id"] in self._records:
+            self.delete(keys["id"])
+        self._add(keys)
+        return keys["id"]
+
+    def update(self, record: Record) -> str:
+        """Re-index a record that has changed"""
+        return self.insert(record)
+
+    def insert_many(self, records: Iterable[Record]) -> List[str]:
+        """Index many records"""
+        return [self.insert(record) for record in records]
+
+    def delete(self, record_id: Any):
+        """Remove a record from every index"""
+        keys = self._records.pop(str(record_id))
+        for key in INDEXED_KEYS:
+            values = keys[key] if key == "modality" else [keys[key]]
+            for value in values:
+                if value is not None:
+                    ids = self._indexes[key][value]
+                    ids.discard(keys["id"])
+                    if not ids:
+                        del self._indexes[key][value]
+        if keys["creation_time"] is not None:
+            position = bisect_left(self._creation_times, (keys["creation_time"], keys["id"]))
+            del self._creation_times[position]
+
+    def _created_between(self, created_after: Optional[datetime], created_before: Optional[datetime]) -> Set[str]:
+        """Ids of records created in [created_after, created_before)"""
+        times = self._creation_times
+        start = 0 if created_after is None else bisect_left(times, (_as_datetime(created_after),))
+        end = len(times) if created_before is None else bisect_left(times, (_as_datetime(created_before),))
+        return {record_id for _, record_id in times[start:end]}
+
+    def query(
+        self,
+        created_after: Optional[datetime] = None,
+        created_before: Optional[datetime] = None,
+        **criteria: Any,
+    ) -> Set[str]:
+        """
+        Find the ids of records matching every criterion
+        Parameters
+        ----------
+        created_after : Optional[datetime]
+          Only records whose data_description.creation_time is at or after this time
+        created_before : Optional[datetime]
+          Only records whose data_description.creation_time is before this time
+        criteria : Any
+          Values for any of INDEXED_KEYS. A list, set or tuple matches any of its values.
+
+        Returns
+        -------
+        Set[str]
+          Matching record ids
+        """
+        unknown = set(criteria) - set(INDEXED_KEYS)
+        if unknown:
+            raise ValueError(f"Cannot query on {sorted(unknown)}. Indexed keys are {list(INDEXED_KEYS)}")
+
+        candidates = []
+        for key, value in criteria.items():
+            index = self._indexes[key]
+            if isinstance(value, (list, set, tuple, frozenset)):
+                candidates.append(set().union(*(index.get(normalize_value(v), set()) for v in value)))
+            else:
+                # a single value uses the index's own set, which is only read
+                candidates.append(index.get(normalize_value(value), set()))
+        if created_after is not None or created_before is not None:
+            candidates.append(self._created_between(created_after, created_before))
+        if not candidates:
+            return set(self._records)
+
+        # intersection walks the smallest set and probes the others
+        candidates.sort(key=len)
+        return candidates[0].intersection(*candidates[1:])
+
+    def save(self, path: Union[str, Path]):
+        """Write the indexed keys to a json file"""
+        records = [
+            dict(keys, creation_time=None if keys["creation_time"] is None else keys["creation_time"].isoformat())
+            for keys in self._records.values()
+        ]
+        with open(path, "w") as f:
+            json.dump({"records": records}, f)
+
+    @classmethod
+    def load(cls, path: Union[str, Path]) -> "MetadataIndex":
+        """Rebuild an index from a file written by save"""
+        with open(path, "r") as f:
+            contents = json.load(f)
+        index = cls()
+        for keys in contents["records"]:
+            index._add(dict(keys, creation_time=_as_datetime(keys["creation_time"])))
+        return index
@@ -0,0 +1,165 @@
+"""Process-wide LRU cache of validated rigs, instruments and other core models"""
+
+import json
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, NamedTuple, Optional, Type, Union
+
+from pydantic import ConfigDict
+
+from aind_data_schema.base import AindCoreModel, document_fingerprint
+
+# Field that identifies a model, used in cache keys alongside its modification date
+ID_FIELDS = {"Rig": "rig_id", "Instrument": "instrument_id"}
+
+_FROZEN_CLASSES: Dict[Type[AindCoreModel], Type[AindCoreModel]] = {}
+
+
+class CacheKey(NamedTuple):
+    """What a cached model is looked up by"""
+
+    model_class: type
+    id: Union[str, None]
+    modification_date: Union[str, None]
+    fingerprint: str
+
+
+class CacheStats(NamedTuple):
+    """Counters of a ModelCache"""
+
+    hits: int
+    misses: int
+    evictions: int
+    size: int
+    maxsize: int
+
+
+def frozen_class(model_class: Type[AindCoreModel]) -> Type[AindCoreModel]:
+    """Subclass of a model that refuses attribute assignment"""
+    if model_class not in _FROZEN_CLASSES:
+        _FROZEN_CLASSES[model_class] = type(
+            f"Frozen{model_class.__name__}",
+            (model_class,),
+            {
+                "__doc__": f"{model_class.__name__} that cannot be changed once created",
+                "__module__": __name__,
+                "model_config": ConfigDict(frozen=True),
+            },
+        )
+    return _FROZEN_CLASSES[model_class]
+
+
+class ModelCache:
+    """Size-bounded LRU cache of validated core models.
+
+    Models are keyed by their class, id, modification date and the fingerprint
+    of their content, so a rig json that was already validated is returned
+    without being parsed into a model again, while an edited rig with the same
+    id and date is still a miss.
+    """
+
+    def __init__(self, maxsize: int = 128, frozen: bool = False):
+        """
+        Parameters
+        ----------
+        maxsize : int
+          Number of models kept
+        frozen : bool
+          Return models of a frozen subclass, e.g. FrozenRig, so that assigning to one of
+          their fields raises instead of silently changing every user of the shared instance.
+          Nested models and lists are not frozen.
+        """
+        self.maxsize = maxsize
+        self.frozen = frozen
+        self._models: "OrderedDict[CacheKey, AindCoreModel]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self) -> int:
+        """Number of cached models"""
+        return len(self._models)
+
+    def stats(self) -> CacheStats:
+        """Hit, miss and eviction counts"""
+        return CacheStats(self.hits, self.misses, self.evictions, len(self._models), self.maxsize)
+
+    def clear(self):
+        """Drop every cached model and reset the counters"""
+        with self._lock:
+            self._models.clear()
+            self.hits = self.misses = self.evictions = 0
+
+    @staticmethod
+    def key(model_class: Type[AindCoreModel], document: dict) -> CacheKey:
+        """Cache key of a json document"""
+        id_field = ID_FIELDS.get(model_class.__name__)
+        return CacheKey(
+            model_class,
+            None if id_field is None else document.get(id_field),
+            document.get("modification_date"),
+            document_fingerprint(document),
+        )
+
+    def get(self, model_class: Type[AindCoreModel], data: Union[dict, str, bytes, Path]) -> AindCoreModel:
+        """
+        Validated model for a json document, from the cache when possible
+        Parameters
+        ----------
+        model_class : Type[AindCoreModel]
+          Model to validate as, e.g. Rig or Instrument
+        data : Union[dict, str, bytes, Path]
+          Json document, json text, or the path of a json file
+
+        Returns
+        -------
+        AindCoreModel
+          The cached instance, shared by everyone who gets the same content
+        """
+        if isinstance(data, Path):
+            data = data.read_text()
+        document = json.loads(data) if isinstance(data, (str, bytes)) else data
+        key = self.key(model_class, document)
+        with self._lock:
+            if key in self._models:
+                self.hits += 1
+                self._models.move_to_end(key)
+                return self._models[key]
+            self.misses += 1
+        model = model_class.model_validate(document)
+        if self.frozen:
+            model = frozen_class(model_class).model_construct(model.model_fields_set, **model.__dict__)
+        return self._add(key, model)
+
+    def _add(self, key: CacheKey, model: AindCoreModel) -> AindCoreModel:
+        """Cache a model, evicting the least recently used one if the cache is full"""
+        with self._lock:
+            # another thread may have validated the same content in the meantime
+            model = self._models.setdefault(key, model)
+            while len(self._models) > self.maxsize:
+                self._models.popitem(last=False)
+                self.evictions += 1
+        return model
+
+    def invalidate(self, model_class: Type[AindCoreModel], model_id: Optional[str] = None) -> int:
+        """Drop the cached models of a class, or of one id of it, and return how many were dropped"""
+        with self._lock:
+            keys = [
+                key
+                for key in self._models
+                if key.model_class is model_class and (model_id is None or key.id == model_id)
+            ]
+            for key in keys:
+                del self._models[key]
+        return len(keys)
+
+
+# Cache shared by the whole process
+DEFAULT_CACHE = ModelCache()
+
+
+def cached_model(model_class: Type[AindCoreModel], data: Union[dict, str, bytes, Path]) -> AindCoreModel:
+    """Validated model from the process-wide cache"""
+    return DEFAULT_CACHE.get(model_class, data)
@@ -0,0 +1,234 @@
+"""Structural diffs of metadata documents as RFC 6902 JSON patches"""
+
+import copy
+import json
+from typing import Any, Dict, List, Optional, Union
+
+from pydantic import BaseModel
+
+# List items are matched by the first of these keys that every item has, with
+# unique values, so that e.g. a device that is added, removed or edited in a
+# device list produces a patch for that device only.
+LIST_KEYS = ("name", "index")
+
+Document = Union[BaseModel, dict]
+Patch = List[Dict[str, Any]]
+
+
+def _document(record: Document) -> Any:
+    """Json document of a record"""
+    if isinstance(record, BaseModel):
+        return json.loads(record.model_dump_json(by_alias=True))
+    return record
+
+
+def _escape(key: Any) -> str:
+    """Escape one reference token of a JSON pointer"""
+    return str(key).replace("~", "~0").replace("/", "~1")
+
+
+def _unescape(token: str) -> str:
+    """Unescape one reference token of a JSON pointer"""
+    return token.replace("~1", "/").replace("~0", "~")
+
+
+def _same(old: Any, new: Any) -> bool:
+    """Json equality, which unlike python equality tells apart True, 1 and 1.0"""
+    return type(old) is type(new) and old == new
+
+
+def _list_key(old: list, new: list) -> Optional[str]:
+    """The key that list items can be matched by, if any"""
+    items = old + new
+    if not items or not all(isinstance(item, dict) for item in items):
+        return None
+    for key in LIST_KEYS:
+        if all(key in item for item in items):
+            old_values = [item[key] for item in old]
+            new_values = [item[key] for item in new]
+            if len(set(map(repr, old_values))) == len(old) and len(set(map(repr, new_values))) == len(new):
+                return key
+    return None
+
+
+def _diff_keyed_list(old: list, new: list, key: str, path: str, patch: Patch) -> bool:
+    """Patch a list by matching items on a key. Returns False if matched items were reordered."""
+    new_keys = [repr(item[key]) for item in new]
+    old_keys = [repr(item[key]) for item in old]
+    kept = [k for k in old_keys if k in new_keys]
+    if kept != [k for k in new_keys if k in old_keys]:
+        return False
+    for position in reversed(range(len(old))):
+        if old_keys[position] not in new_keys:
+            patch.append({"op": "remove", "path": f"{path}/{position}"})
+    new_items = dict(zip(new_keys, new))
+    for position, item_key in enumerate(kept):
+        _diff(old[old_keys.index(item_key)], new_items[item_key], f"{path}/{position}", patch)
+    for position, item_key in enumerate(new_keys):
+        if item_key not in old_keys:
+            patch.append({"op": "add", "path": f"{path}/{position}", "value": new[position]})
+    return True
+
+
+def _diff_list(old: list, new: list, path: str, patch: Patch):
+    """Patch a list, by key when its items have one and otherwise by position"""
+    key = _list_key(old, new)
+    if key is not None and _diff_keyed_list(old, new, key, path, patch):
+        return
+    for position in range(min(len(old), len(new))):
+        _diff(old[position], new[position], f"{path}/{position}", patch)
+    for position in reversed(range(len(new), len(old))):
+        patch.append({"op": "remove", "path": f"{path}/{position}"})
+    for position in range(len(old), len(new)):
+        patch.append({"op": "add", "path": f"{path}/{position}", "value": new[position]})
+
+
+def _diff(old: Any, new: Any, path: str, patch: Patch):
+    """Append the operations that turn old into new"""
+    if isinstance(old, dict) and isinstance(new, dict):
+        for key in old:
+            if key not in new:
+                patch.append({"op": "remove", "path": f"{path}/{_escape(key)}"})
+        for key, value in new.items():
+            if key not in old:
+                patch.append({"op": "add", "path": f"{path}/{_escape(key)}", "value": value})
+            else:
+                _diff(old[key], value, f"{path}/{_escape(key)}", patch)
+    elif isinstance(old, list) and isinstance(new, list):
+        _diff_list(old, new, path, patch)
+    elif not _same(old, new):
+        patch.append({"op": "replace", "path": path, "value": new})
+
+
+def diff(old: Document, new: Document) -> Patch:
+    """
+    Compute a JSON patch (RFC 6902) that turns one document into another
+    Parameters
+    ----------
+    old : Document
+      Model, e.g. Metadata, or its json document
+    new : Document
+      Model or json document to patch towards
+
+    Returns
+    -------
+    Patch
+      List of add, remove and replace operations. Models are compared by their
+      json form with aliases, so paths match documents in the database.
+    """
+    patch: Patch = []
+    _diff(_document(old), _document(new), "", patch)
+    return patch
+
+
+def _parent(doc: Any, path: str) -> tuple:
+    """Resolve a JSON pointer to the container holding its last token"""
+    if not path.startswith("/"):
+        raise ValueError(f"Invalid JSON pointer '{path}'")
+    *parents, last = [_unescape(token) for token in path[1:].split("/")]
+    container = doc
+    for token in parents:
+        container = _child(container, token, path)
+    return container, last
+
+
+def _index(container: list, token: str, path: str, adding: bool = False) -> int:
+    """List index named by a pointer token"""
+    if adding and token == "-":
+        return len(container)
+    if not token.isdigit() or int(token) > len(container) - (0 if adding else 1):
+        raise ValueError(f"Index '{token}' out of range in '{path}'")
+    return int(token)
+
+
+def _child(container: Any, token: str, path: str) -> Any:
+    """Value of one pointer token"""
+    if isinstance(container, list):
+        return container[_index(container, token, path)]
+    if isinstance(container, dict) and token in container:
+        return container[token]
+    raise ValueError(f"Path '{path}' does not exist")
+
+
+def _get(doc: Any, path: str) -> Any:
+    """Value at a JSON pointer"""
+    if path == "":
+        return doc
+    container, last = _parent(doc, path)
+    return _child(container, last, path)
+
+
+def _add(doc: Any, path: str, value: Any) -> Any:
+    """Add a value at a JSON pointer and return the patched document"""
+    if path == "":
+        return value
+    container, last = _parent(doc, path)
+    if isinstance(container, list):
+        container.insert(_index(container, last, path, adding=True), value)
+    elif isinstance(container, dict):
+        container[last] = value
+    else:
+        raise ValueError(f"Path '{path}' does not exist")
+    return doc
+
+
+def _remove(doc: Any, path: str) -> Any:
+    """Remove the value at a JSON pointer and return it"""
+    container, last = _parent(doc, path)
+    _child(container, last, path)
+    if isinstance(container, list):
+        return container.pop(int(last))
+    return container.pop(last)
+
+
+def _apply(doc: Any, operation: Dict[str, Any]) -> Any:
+    """Apply one operation and return the patched document"""
+    op, path = operation.get("op"), operation.get("path")
+    if op == "add":
+        return _add(doc, path, copy.deepcopy(operation["value"]))
+    if op == "remove":
+        _remove(doc, path)
+        return doc
+    if op == "replace":
+        _get(doc, path)
+        if path == "":
+            return copy.deepcopy(operation["value"])
+        _remove(doc, path)
+        return _add(doc, path, copy.deepcopy(operation["value"]))
+    if op == "move":
+        return _add(doc, path, _remove(doc, operation["from"]))
+    if op == "copy":
+        return _add(doc, path, copy.deepcopy(_get(doc, operation["from"])))
+    if op == "test":
+        if not _same(_get(doc, path), operation["value"]):
+            raise ValueError(f"Test failed at '{path}'")
+        return doc
+    raise ValueError(f"Unknown patch operation '{op}'")
+
+
+def apply_patch(doc: Document, patch: Patch, in_place: bool = False) -> Any:
+    """
+    Apply a JSON patch (RFC 6902) to a document
+    Parameters
+    ----------
+    doc : Document
+      Json document to patch, which is left unchanged. A model is patched
+      through its json form and validated back into a model of the same type.
+    patch : Patch
+      Operations to apply in order: add, remove, replace, move, copy and test
+    in_place : bool
+      Patch a json document itself instead of a copy, e.g. to apply a chain of
+      patches to one copy. It is left partly patched if an operation fails.
+
+    Returns
+    -------
+    Any
+      The patched document, or model. Use it even when patching in place,
+      since a patch can replace the whole document.
+    """
+    result = _document(doc) if in_place else copy.deepcopy(_document(doc))
+    for operation in patch:
+        result = _apply(result, operation)
+    if isinstance(doc, BaseModel):
+        return type(doc).model_validate(result)
+    return result
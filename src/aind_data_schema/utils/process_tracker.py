@@ -0,0 +1,238 @@
+"""Sample the resource usage of a processing step while it runs, and describe it as a DataProcess.
+
+    with track_process(ProcessName.SPIKE_SORTING, software_version="0.1.0", ...) as tracker:
+        run_spike_sorting()
+    data_processes.append(tracker.data_process)
+
+A background thread reads the CPU time and resident memory of the process
+from /proc at a fixed rate, which costs two small file reads per sample.
+GPU usage is read by a probe passed in by the pipeline, e.g. one that
+queries NVML, since there is no portable way to read it.
+"""
+
+import os
+import platform
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime, timedelta, timezone
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+from aind_data_schema_models.process_names import ProcessName
+from aind_data_schema_models.units import MemoryUnit
+
+from aind_data_schema.core.processing import DataProcess, ResourceSeries, ResourceUsage
+
+# Returns the current usage in percent, or None if it cannot be read
+Probe = Callable[[], Optional[float]]
+
+
+def _read(path: str) -> Optional[str]:
+    """Content of a small file, e.g. in /proc, or None if it cannot be read"""
+    try:
+        with open(path) as f:
+            return f.read()
+    except OSError:
+        return None
+
+
+def system_memory() -> Optional[int]:
+    """Total memory of the system in bytes, from /proc/meminfo"""
+    meminfo = _read("/proc/meminfo")
+    for line in (meminfo or "").splitlines():
+        if line.startswith("MemTotal:"):
+            return int(line.split()[1]) * 1024
+    return None
+
+
+class CPUProbe:
+    """CPU usage of a process and its finished child processes since the previous call, in percent of all cores"""
+
+    def __init__(self, pid: Optional[int] = None):
+        """
+        Parameters
+        ----------
+        pid : Optional[int]
+          Process to sample, by default this one
+        """
+        self.path = f"/proc/{pid or os.getpid()}/stat"
+        self.cores = os.cpu_count() or 1
+        self.previous = self._times()
+
+    def _times(self) -> Optional[Tuple[float, float]]:
+        """CPU seconds used so far, and the time they were read"""
+        stat = _read(self.path)
+        if stat is None:
+            return None
+        # the fields after the command name, which is in parentheses and may contain spaces
+        fields = stat.rsplit(")", 1)[1].split()
+        # utime, stime, cutime and cstime, in clock ticks
+        ticks = sum(int(field) for field in fields[11:15])
+        return ticks / os.sysconf("SC_CLK_TCK"), time.monotonic()
+
+    def __call__(self) -> Optional[float]:
+        """Usage since the previous call"""
+        previous, self.previous = self.previous, self._times()
+        if previous is None or self.previous is None:
+            return None
+        elapsed = self.previous[1] - previous[1]
+        return 100 * (self.previous[0] - previous[0]) / elapsed / self.cores
+
+
+class MemoryProbe:
+    """Resident memory of a process, in percent of the system memory"""
+
+    def __init__(self, pid: Optional[int] = None):
+        """
+        Parameters
+        ----------
+        pid : Optional[int]
+          Process to sample, by default this one
+        """
+        self.path = f"/proc/{pid or os.getpid()}/statm"
+        self.total = system_memory()
+
+    def __call__(self) -> Optional[float]:
+        """Current usage"""
+        statm = _read(self.path)
+        if statm is None or not self.total:
+            return None
+        return 100 * int(statm.split()[1]) * os.sysconf("SC_PAGE_SIZE") / self.total
+
+
+class ProcessTracker:
+    """Samples resource usage while a processing step runs, see track_process"""
+
+    def __init__(self, name: ProcessName, interval: float, probes: Dict[str, Probe], fields: dict):
+        """
+        Parameters
+        ----------
+        name : ProcessName
+          Name of the step
+        interval : float
+          Time between samples in seconds
+        probes : Dict[str, Probe]
+          Probes by the ResourceUsage field they fill in, e.g. cpu_usage
+        fields : dict
+          Other DataProcess fields
+        """
+        if interval <= 0:
+            raise ValueError("interval must be positive")
+        self.name = name
+        self.interval = interval
+        self.probes = probes
+        self.fields = fields
+        self.gpu: Optional[str] = None
+        self.start_date_time: Optional[datetime] = None
+        self.end_date_time: Optional[datetime] = None
+        self.data_process: Optional[DataProcess] = None
+        self._samples: Dict[str, List[Tuple[datetime, float]]] = {usage: [] for usage in probes}
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="track_process", daemon=True)
+
+    def update(self, **fields):
+        """Set more DataProcess fields before the step finishes, e.g. outputs or notes"""
+        self.fields.update(fields)
+
+    def _sample(self, timestamp: datetime):
+        """Read every probe"""
+        for usage, probe in self.probes.items():
+            value = probe()
+            if value is not None:
+                self._samples[usage].append((timestamp, value))
+
+    def _run(self):
+        """Sample once per interval until stopped"""
+        start = time.monotonic()
+        tick = 1
+        while not self._stop.wait(max(0.0, start + tick * self.interval - time.monotonic())):
+            self._sample(self.start_date_time + timedelta(seconds=tick * self.interval))
+            # samples stay on a grid of intervals, skipping any missed while the machine was busy
+            tick = max(tick + 1, int((time.monotonic() - start) / self.interval) + 1)
+
+    def start(self):
+        """Stamp the start time and start sampling"""
+        self.start_date_time = datetime.now(tz=timezone.utc)
+        self._thread.start()
+
+    def stop(self):
+        """Stop sampling and stamp the end time"""
+        self._stop.set()
+        self._thread.join()
+        self.end_date_time = datetime.now(tz=timezone.utc)
+        if not any(self._samples.values()):
+            # steps shorter than an interval get one sample, at the end
+            self._sample(self.end_date_time)
+
+    def resources(self) -> ResourceUsage:
+        """Description of the system, with the usage sampled so far"""
+        usage = {
+            name: ResourceSeries.from_samples(*zip(*samples)) for name, samples in self._samples.items() if samples
+        }
+        memory = system_memory()
+        return ResourceUsage(
+            os=platform.platform(),
+            architecture=platform.machine(),
+            cpu=platform.processor() or None,
+            cpu_cores=os.cpu_count(),
+            gpu=self.gpu,
+            ram=None if memory is None else round(memory / 1024**3, 2),
+            ram_unit=None if memory is None else MemoryUnit.GB,
+            **usage,
+        )
+
+    def finish(self) -> DataProcess:
+        """Describe the finished step"""
+        self.data_process = DataProcess(
+            name=self.name,
+            start_date_time=self.start_date_time,
+            end_date_time=self.end_date_time,
+            resources=self.resources(),
+            **self.fields,
+        )
+        return self.data_process
+
+
+@contextmanager
+def track_process(
+    name: ProcessName,
+    interval: float = 1.0,
+    gpu_probe: Optional[Probe] = None,
+    gpu: Optional[str] = None,
+    pid: Optional[int] = None,
+    **fields,
+) -> Iterator[ProcessTracker]:
+    """
+    Sample the resource usage of a processing step, and describe it as a DataProcess
+    Parameters
+    ----------
+    name : ProcessName
+      Name of the step
+    interval : float
+      Time between samples in seconds
+    gpu_probe : Optional[Probe]
+      Function returning the GPU usage in percent, or None to not sample the GPU
+    gpu : Optional[str]
+      GPU name
+    pid : Optional[int]
+      Process to sample, by default this one. Child processes are included once they finish.
+    fields
+      Other DataProcess fields, e.g. software_version, input_location, output_location,
+      code_url and parameters. More can be set during the step with ProcessTracker.update.
+
+    Yields
+    ------
+    ProcessTracker
+      Its data_process is set when the step finishes without an exception
+    """
+    probes: Dict[str, Probe] = {"cpu_usage": CPUProbe(pid), "ram_usage": MemoryProbe(pid)}
+    if gpu_probe is not None:
+        probes["gpu_usage"] = gpu_probe
+    tracker = ProcessTracker(name, interval, probes, fields)
+    tracker.gpu = gpu
+    tracker.start()
+    try:
+        yield tracker
+    finally:
+        tracker.stop()
+    tracker.finish()
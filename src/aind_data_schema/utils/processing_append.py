@@ -0,0 +1,85 @@
+"""Append DataProcess entries to processing.json without reading it into a Processing model.
+
+Pipelines add a step to processing_pipeline.data_processes as each one
+finishes. Only the new step is validated, and it is spliced into the text
+of the file, so the cost of an append does not grow with the resource usage
+series and parameters of the steps already there.
+"""
+
+import os
+from pathlib import Path
+from typing import Union
+
+from aind_data_schema.core.processing import DataProcess
+from aind_data_schema.utils.atomic import locked, write_atomic
+from aind_data_schema.utils.json_scan import value_span
+
+DATA_PROCESSES_PATH = ("processing_pipeline", "data_processes")
+
+
+def _line_indent(text: str, pos: int) -> int:
+    """Number of spaces between the start of the line and pos"""
+    return pos - text.rfind("\n", 0, pos) - 1
+
+
+def splice_data_process(text: str, data_process: DataProcess) -> str:
+    """
+    Insert a step at the end of processing_pipeline.data_processes in the json of a Processing
+    Parameters
+    ----------
+    text : str
+      Json of a Processing, indented like files written by write_standard_file, or not indented
+    data_process : DataProcess
+      Step to insert, which is not validated again
+
+    Returns
+    -------
+    str
+      The json with the step added, indented like the rest of the document
+    """
+    start, end = value_span(text, DATA_PROCESSES_PATH)
+    if not text.startswith("[", start):
+        raise ValueError("processing_pipeline.data_processes is not a list")
+    # position just after the last item, or after the opening bracket of an empty list
+    last = end - 1
+    while text[last - 1].isspace():
+        last -= 1
+    empty = last == start + 1
+    if "\n" not in text[:start]:
+        entry = data_process.model_dump_json()
+        return text[:last] + ("" if empty else ",") + entry + text[last:]
+    key_indent = _line_indent(text, text.rfind('"data_processes"', 0, start))
+    # the key is two levels deep in the document
+    step = key_indent // 2
+    entry = data_process.model_dump_json(indent=step).replace("\n", "\n" + " " * (key_indent + step))
+    entry = "\n" + " " * (key_indent + step) + entry
+    if empty:
+        return text[:last] + entry + "\n" + " " * key_indent + "]" + text[end:]
+    return text[:last] + "," + entry + text[last:]
+
+
+def append_data_process(path: Union[str, Path], data_process: Union[DataProcess, dict]) -> DataProcess:
+    """
+    Append a step to processing_pipeline.data_processes of a processing.json file
+    Parameters
+    ----------
+    path : Union[str, Path]
+      processing.json file, which is replaced atomically. Steps appended at the
+      same time, e.g. by parallel steps of a pipeline, are all kept.
+    data_process : Union[DataProcess, dict]
+      Step to append. Only this step is validated.
+
+    Returns
+    -------
+    DataProcess
+      The validated step
+    """
+    data_process = DataProcess.model_validate(data_process)
+    while True:
+        with open(path, "rb") as f, locked(f):
+            if not os.path.samestat(os.fstat(f.fileno()), os.stat(path)):
+                # another append replaced the file while we waited for the lock
+                continue
+            text = splice_data_process(f.read().decode(), data_process)
+            write_atomic(path, text)
+        return data_process
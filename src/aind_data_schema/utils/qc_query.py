@@ -0,0 +1,181 @@
+"""Indexed queries over the metrics of one or many QC documents"""
+
+from bisect import bisect_left
+from datetime import datetime
+from typing import Any, Callable, Dict, Iterable, List, Mapping, NamedTuple, Optional, Set, Union
+
+from aind_data_schema_models.modalities import Modality
+
+from aind_data_schema.core.quality_control import QCEvaluation, QCMetric, QualityControl, Stage, Status
+
+
+class QCMatch(NamedTuple):
+    """A metric found by a query, with its evaluation and the asset whose QC it is in"""
+
+    asset_name: Union[str, None]
+    evaluation: QCEvaluation
+    metric: QCMetric
+
+
+class QCEvaluationMatch(NamedTuple):
+    """An evaluation found by evaluations_for_asset, with the asset whose QC it is in"""
+
+    asset_name: Union[str, None]
+    evaluation: QCEvaluation
+
+
+def _abbreviation(modality: Any) -> str:
+    """Abbreviation of a modality, or the abbreviation itself"""
+    return modality if isinstance(modality, str) else modality.abbreviation
+
+
+# How each indexed attribute is read from a match, and how query arguments are normalized to it
+_KEYS: Dict[str, Callable[[QCMatch], Any]] = {
+    "status": lambda match: Status(match.metric.status.status),
+    "evaluator": lambda match: match.metric.status.evaluator,
+    "modality": lambda match: _abbreviation(match.evaluation.modality),
+    "stage": lambda match: Stage(match.evaluation.stage),
+    "evaluation": lambda match: match.evaluation.name,
+}
+_NORMALIZE: Dict[str, Callable[[Any], Any]] = {
+    "status": Status,
+    "evaluator": str,
+    "modality": _abbreviation,
+    "stage": Stage,
+    "evaluation": str,
+}
+
+
+class QCIndex:
+    """Indexes over the metrics of QC documents, by their latest status.
+
+    Each index is built the first time a query uses it. The index is a
+    snapshot: build a new one after changing the documents. Single documents
+    are usually queried with QualityControl.query, which keeps one index per
+    document until QualityControl.index is called with rebuild=True.
+    """
+
+    def __init__(self, documents: Union[QualityControl, Iterable[QualityControl], Mapping[str, QualityControl]]):
+        """
+        Parameters
+        ----------
+        documents : Union[QualityControl, Iterable[QualityControl], Mapping[str, QualityControl]]
+          One QC document, several, or several by asset name
+        """
+        if isinstance(documents, QualityControl):
+            documents = [documents]
+        named = documents.items() if isinstance(documents, Mapping) else ((None, document) for document in documents)
+        self.matches: List[QCMatch] = [
+            QCMatch(asset_name, evaluation, metric)
+            for asset_name, document in named
+            for evaluation in document.evaluations
+            for metric in evaluation.metrics
+        ]
+        self._indexes: Dict[str, Dict[Any, Set[int]]] = {}
+        self._times: Optional[tuple] = None
+        self._assets: Optional[Dict[str, List[QCEvaluationMatch]]] = None
+
+    def __len__(self) -> int:
+        """Number of indexed metrics"""
+        return len(self.matches)
+
+    def _index(self, attribute: str) -> Dict[Any, Set[int]]:
+        """Positions of the matches with each value of an attribute"""
+        if attribute not in self._indexes:
+            index: Dict[Any, Set[int]] = {}
+            for position, match in enumerate(self.matches):
+                index.setdefault(_KEYS[attribute](match), set()).add(position)
+            self._indexes[attribute] = index
+        return self._indexes[attribute]
+
+    def _between(self, start: Optional[datetime], end: Optional[datetime]) -> Set[int]:
+        """Positions of the matches whose latest status was set from start, inclusive, to end, exclusive"""
+        if self._times is None:
+            ordered = sorted(
+                range(len(self.matches)), key=lambda position: self.matches[position].metric.status.timestamp
+            )
+            self._times = ([self.matches[position].metric.status.timestamp for position in ordered], ordered)
+        timestamps, positions = self._times
+        first = 0 if start is None else bisect_left(timestamps, start)
+        last = len(timestamps) if end is None else bisect_left(timestamps, end)
+        return set(positions[first:last])
+
+    def query(
+        self,
+        status: Optional[Status] = None,
+        modality: Optional[Union[Modality.ONE_OF, str]] = None,
+        stage: Optional[Stage] = None,
+        evaluator: Optional[str] = None,
+        evaluation: Optional[str] = None,
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None,
+    ) -> List[QCMatch]:
+        """
+        Find metrics by their latest status and their evaluation
+        Parameters
+        ----------
+        status : Optional[Status]
+          Latest status of the metric
+        modality : Optional[Union[Modality.ONE_OF, str]]
+          Modality of the evaluation, or its abbreviation
+        stage : Optional[Stage]
+          Stage of the evaluation
+        evaluator : Optional[str]
+          Evaluator of the latest status
+        evaluation : Optional[str]
+          Name of the evaluation
+        start : Optional[datetime]
+          Earliest timestamp of the latest status, inclusive. Timestamps must be timezone aware.
+        end : Optional[datetime]
+          Latest timestamp of the latest status, exclusive
+
+        Returns
+        -------
+        List[QCMatch]
+          Metrics matching every given filter, in document order
+        """
+        filters = {
+            "status": status,
+            "modality": modality,
+            "stage": stage,
+            "evaluator": evaluator,
+            "evaluation": evaluation,
+        }
+        candidates = [
+            self._index(attribute).get(_NORMALIZE[attribute](value), set())
+            for attribute, value in filters.items()
+            if value is not None
+        ]
+        if start is not None or end is not None:
+            candidates.append(self._between(start, end))
+        if not candidates:
+            return list(self.matches)
+        candidates.sort(key=len)
+        positions = candidates[0].intersection(*candidates[1:])
+        return [self.matches[position] for position in sorted(positions)]
+
+    def evaluations_for_asset(self, asset_name: str) -> List[QCEvaluationMatch]:
+        """
+        Multi-asset evaluations that evaluated an asset
+        Parameters
+        ----------
+        asset_name : str
+          Name of an asset in the evaluated_assets of metrics
+
+        Returns
+        -------
+        List[QCEvaluationMatch]
+          Each evaluation with a metric that lists the asset, once, with the asset whose QC it is in
+        """
+        if self._assets is None:
+            self._assets = {}
+            seen = set()
+            for match in self.matches:
+                for evaluated in match.metric.evaluated_assets or []:
+                    key = (evaluated, match.asset_name, id(match.evaluation))
+                    if key not in seen:
+                        seen.add(key)
+                        self._assets.setdefault(evaluated, []).append(
+                            QCEvaluationMatch(match.asset_name, match.evaluation)
+                        )
+        return list(self._assets.get(asset_name, []))
@@ -0,0 +1,168 @@
+"""Store large QC metric values in NumPy sidecar files next to quality_control.json.
+
+A metric value such as a per-channel noise array or a drift trace is written
+to a .npy file, or to one .npz file shared by the whole document, and
+replaced by an ArrayReference holding the file name and checksum. The json
+then stays small, and arrays are only read, or memory-mapped, when they are
+accessed. Requires numpy, which is installed with the ``arrays`` extra.
+"""
+
+import hashlib
+import re
+from pathlib import Path
+from typing import Any, List, Optional, Union
+
+from pydantic import BaseModel, Field, ValidationError
+
+from aind_data_schema.core.quality_control import QualityControl
+
+
+class ArrayReference(BaseModel):
+    """Value of a QC metric that is stored in a NumPy sidecar file"""
+
+    sidecar: str = Field(..., title="Sidecar file name, relative to the directory of the json file")
+    key: Optional[str] = Field(default=None, title="Name of the array in a .npz sidecar")
+    checksum: str = Field(..., title="sha256 of the sidecar file")
+    shape: List[int] = Field(..., title="Array shape")
+    dtype: str = Field(..., title="Array dtype")
+
+
+def is_array_reference(value: Any) -> bool:
+    """Check whether a metric value is a reference to an array in a sidecar file"""
+    if isinstance(value, ArrayReference):
+        return True
+    if not isinstance(value, dict) or "sidecar" not in value or "checksum" not in value:
+        return False
+    try:
+        ArrayReference.model_validate(value)
+    except ValidationError:
+        return False
+    return True
+
+
+def file_checksum(path: Union[str, Path]) -> str:
+    """sha256 of a file, read in blocks"""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return f"sha256:{digest.hexdigest()}"
+
+
+def _array(value: Any, min_size: int) -> Any:
+    """The value as a numeric array if it is one with at least min_size elements, otherwise None"""
+    import numpy as np
+
+    if not isinstance(value, (list, tuple, np.ndarray)):
+        return None
+    try:
+        array = np.asarray(value)
+    except ValueError:
+        # ragged lists
+        return None
+    return array if array.dtype.kind in "biufc" and array.size >= min_size else None
+
+
+def _slug(name: str) -> str:
+    """Metric name made safe for a file name"""
+    return re.sub(r"[^A-Za-z0-9_.-]+", "_", name).strip("_")
+
+
+def _reference(sidecar: str, key: Optional[str], checksum: str, array: Any) -> dict:
+    """Json of a reference, which is what a metric value holds after the document is read back"""
+    reference = ArrayReference(sidecar=sidecar, key=key, checksum=checksum, shape=array.shape, dtype=str(array.dtype))
+    return reference.model_dump()
+
+
+def offload_arrays(
+    quality_control: QualityControl,
+    directory: Union[str, Path],
+    min_size: int = 1000,
+    npz: bool = False,
+    prefix: str = "quality_control",
+) -> QualityControl:
+    """
+    Write large numeric metric values to sidecar files and replace them with references
+    Parameters
+    ----------
+    quality_control : QualityControl
+      QC document, which is left unchanged
+    directory : Union[str, Path]
+      Directory that the QC json will be written to, e.g. with write_standard_file
+    min_size : int
+      Arrays with fewer elements stay in the json
+    npz : bool
+      Write all arrays to one compressed <prefix>_metrics.npz instead of one
+      <prefix>_<evaluation>_<metric>_<name>.npy per value. Arrays in a .npz
+      cannot be memory-mapped, but many small sidecar files are avoided.
+    prefix : str
+      Start of sidecar file names
+
+    Returns
+    -------
+    QualityControl
+      Copy of the document, with an ArrayReference as the value of every offloaded metric.
+      Its evaluations and metrics are new, but their other fields, such as status
+      histories and the values that were not offloaded, are shared with the original.
+    """
+    import numpy as np
+
+    directory = Path(directory)
+    directory.mkdir(parents=True, exist_ok=True)
+    # copy only the evaluations and metrics, since a deep copy would also copy the arrays being offloaded
+    evaluations = [
+        evaluation.model_copy(update={"metrics": [metric.model_copy() for metric in evaluation.metrics]})
+        for evaluation in quality_control.evaluations
+    ]
+    quality_control = quality_control.model_copy(update={"evaluations": evaluations})
+    offloaded = []
+    for e, evaluation in enumerate(quality_control.evaluations):
+        for m, metric in enumerate(evaluation.metrics):
+            array = _array(metric.value, min_size)
+            if array is not None:
+                offloaded.append((metric, array, f"{prefix}_{e}_{m}_{_slug(metric.name)}"))
+    if npz and offloaded:
+        path = directory / f"{prefix}_metrics.npz"
+        np.savez_compressed(path, **{name: array for _, array, name in offloaded})
+        checksum = file_checksum(path)
+        for metric, array, name in offloaded:
+            metric.value = _reference(path.name, name, checksum, array)
+    elif offloaded:
+        for metric, array, name in offloaded:
+            path = directory / f"{name}.npy"
+            np.save(path, array)
+            metric.value = _reference(path.name, None, file_checksum(path), array)
+    return quality_control
+
+
+def load_value(value: Any, directory: Union[str, Path], mmap: bool = True, verify: bool = False) -> Any:
+    """
+    Value of a metric, reading it from its sidecar file if it is an ArrayReference
+    Parameters
+    ----------
+    value : Any
+      Metric value
+    directory : Union[str, Path]
+      Directory of the QC json file
+    mmap : bool
+      Memory-map .npy sidecars read-only instead of reading them
+    verify : bool
+      Check the checksum of the sidecar file first, which reads the whole file
+
+    Returns
+    -------
+    Any
+      A numpy array for references, otherwise the value itself
+    """
+    import numpy as np
+
+    if not is_array_reference(value):
+        return value
+    reference = value if isinstance(value, ArrayReference) else ArrayReference.model_validate(value)
+    path = Path(directory) / reference.sidecar
+    if verify and file_checksum(path) != reference.checksum:
+        raise ValueError(f"Checksum of {path} does not match {reference.checksum}")
+    if reference.key is None:
+        return np.load(path, mmap_mode="r" if mmap else None)
+    with np.load(path) as arrays:
+        return arrays[reference.key]
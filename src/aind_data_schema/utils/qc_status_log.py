@@ -0,0 +1,154 @@
+"""Append-only log of QC status updates, kept next to quality_control.json.
+
+Annotators and automated QC jobs append QCStatus entries to the log instead
+of rewriting the QC file, so concurrent updates are cheap and none of them
+are lost. Readers merge the log into the status histories on the fly, and
+compact_status_log merges it into the QC file and empties it.
+"""
+
+import logging
+from pathlib import Path
+from typing import Dict, List, Tuple, Union
+
+from pydantic import BaseModel, Field
+
+from aind_data_schema.core.quality_control import QCMetric, QCStatus, QualityControl
+from aind_data_schema.utils.atomic import locked, write_atomic
+
+STATUS_LOG_SUFFIX = "_status.jsonl"
+
+
+class StatusLogEntry(BaseModel):
+    """One status update in the log, for the metric with these evaluation and metric names"""
+
+    evaluation: str = Field(..., title="Evaluation name")
+    metric: str = Field(..., title="Metric name")
+    status: QCStatus = Field(..., title="Status")
+
+
+def status_log_path(qc_path: Union[str, Path]) -> Path:
+    """Log of a QC file, e.g. quality_control_status.jsonl for quality_control.json"""
+    qc_path = Path(qc_path)
+    return qc_path.with_name(qc_path.stem + STATUS_LOG_SUFFIX)
+
+
+def append_status(qc_path: Union[str, Path], evaluation: str, metric: str, status: QCStatus):
+    """
+    Append a status update to the log of a QC file
+    Parameters
+    ----------
+    qc_path : Union[str, Path]
+      QC file, e.g. quality_control.json, which is not changed
+    evaluation : str
+      Name of the evaluation
+    metric : str
+      Name of the metric in that evaluation
+    status : QCStatus
+      Status to add to the metric's status history
+    """
+    line = StatusLogEntry(evaluation=evaluation, metric=metric, status=status).model_dump_json() + "\n"
+    # each update is one unbuffered write to a file opened for appending, so lines never interleave
+    with open(status_log_path(qc_path), "ab", buffering=0) as f, locked(f, exclusive=False):
+        f.write(line.encode())
+
+
+def _read_entries(f) -> List[StatusLogEntry]:
+    """Entries of an open log"""
+    return [StatusLogEntry.model_validate_json(line) for line in f.read().decode().splitlines() if line.strip()]
+
+
+def read_status_log(qc_path: Union[str, Path]) -> List[StatusLogEntry]:
+    """Status updates in the log of a QC file, oldest first"""
+    path = status_log_path(qc_path)
+    if not path.exists():
+        return []
+    with open(path, "rb") as f, locked(f, exclusive=False):
+        return _read_entries(f)
+
+
+def _insert(history: List[QCStatus], status: QCStatus) -> bool:
+    """Insert a status into a history by timestamp, unless it is already there"""
+    if any(status == existing for existing in history):
+        return False
+    position = len(history)
+    while position and history[position - 1].timestamp > status.timestamp:
+        position -= 1
+    history.insert(position, status)
+    return True
+
+
+def apply_status_log(
+    quality_control: QualityControl, entries: List[StatusLogEntry]
+) -> Tuple[QualityControl, List[StatusLogEntry]]:
+    """
+    Merge status updates into the status histories of a QC document
+    Parameters
+    ----------
+    quality_control : QualityControl
+      QC document, which is left unchanged
+    entries : List[StatusLogEntry]
+      Status updates. Updates already in a history are skipped, so merging is idempotent.
+
+    Returns
+    -------
+    Tuple[QualityControl, List[StatusLogEntry]]
+      Copy of the document with the updates merged, and the updates for metrics it does not have
+    """
+    quality_control = quality_control.model_copy(deep=True)
+    metrics: Dict[Tuple[str, str], QCMetric] = {}
+    for evaluation in quality_control.evaluations:
+        for metric in evaluation.metrics:
+            metrics.setdefault((evaluation.name, metric.name), metric)
+    unmatched = []
+    for entry in entries:
+        metric = metrics.get((entry.evaluation, entry.metric))
+        if metric is None:
+            unmatched.append(entry)
+        else:
+            _insert(metric.status_history, entry.status)
+    return quality_control, unmatched
+
+
+def read_quality_control(qc_path: Union[str, Path]) -> QualityControl:
+    """Read a QC file with the updates in its log merged in"""
+    path = status_log_path(qc_path)
+    if path.exists():
+        # both files are read under the log's lock, so a compaction cannot merge and empty the log in between
+        with open(path, "rb") as f, locked(f, exclusive=False):
+            text = Path(qc_path).read_text()
+            entries = _read_entries(f)
+    else:
+        text, entries = Path(qc_path).read_text(), []
+    quality_control, unmatched = apply_status_log(QualityControl.model_validate_json(text), entries)
+    for entry in unmatched:
+        logging.warning(f"{qc_path} has no metric '{entry.metric}' in evaluation '{entry.evaluation}'")
+    return quality_control
+
+
+def compact_status_log(qc_path: Union[str, Path]) -> int:
+    """
+    Merge the log of a QC file into it, and empty the log
+    Parameters
+    ----------
+    qc_path : Union[str, Path]
+      QC file, which is replaced atomically. Updates for metrics it does not
+      have are kept in the log, so they can be merged once the metric exists.
+
+    Returns
+    -------
+    int
+      Number of updates merged
+    """
+    path = status_log_path(qc_path)
+    if not path.exists():
+        return 0
+    # appends wait while the log is locked, so none are lost between reading and emptying it
+    with open(path, "r+b") as f, locked(f):
+        entries = _read_entries(f)
+        quality_control = QualityControl.model_validate_json(Path(qc_path).read_text())
+        quality_control, unmatched = apply_status_log(quality_control, entries)
+        write_atomic(qc_path, quality_control.model_dump_json(indent=3))
+        f.seek(0)
+        f.truncate()
+        f.write("".join(entry.model_dump_json() + "\n" for entry in unmatched).encode())
+    return len(entries) - len(unmatched)
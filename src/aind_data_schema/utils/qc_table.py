@@ -0,0 +1,144 @@
+"""Columnar table of QC metrics across many assets, with vectorized status aggregation.
+
+Each row is one metric of one evaluation, with the latest entry of its
+status history. Repetitive string columns such as modality, stage and
+evaluator are dictionary encoded while the table is built. Requires
+pyarrow, which is installed with the ``arrow`` extra.
+"""
+
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Union
+
+from aind_data_schema.core.metadata import Metadata
+from aind_data_schema.core.quality_control import QualityControl
+from aind_data_schema.utils.columnar import column_string, column_timestamp
+
+# Dictionary encoded string columns, in table order
+DICTIONARY_COLUMNS = ("asset_name", "evaluation", "modality", "stage", "metric", "status", "evaluator")
+
+# Units that failure rates can be bucketed by over time
+PERIODS = ("day", "week", "month", "quarter", "year")
+
+
+def _get(item: Any, name: str) -> Any:
+    """Field of a model, or key of its json document"""
+    return item.get(name) if isinstance(item, dict) else getattr(item, name)
+
+
+def _quality_control(record: Union[Metadata, QualityControl, dict]) -> tuple:
+    """Asset name and quality control of a record, which is either a Metadata or a QualityControl"""
+    if isinstance(record, QualityControl) or (isinstance(record, dict) and "evaluations" in record):
+        return None, record
+    return _get(record, "name"), _get(record, "quality_control")
+
+
+def _modality(modality: Any) -> str:
+    """Abbreviation of a modality model, or of its json document"""
+    return column_string(modality) if isinstance(modality, dict) else modality.abbreviation
+
+
+class _DictionaryEncoder:
+    """Builds a dictionary encoded column one value at a time"""
+
+    def __init__(self):
+        """Start with an empty dictionary"""
+        self.dictionary: Dict[str, int] = {}
+        self.indices: List[Optional[int]] = []
+
+    def append(self, value: Optional[str]):
+        """Encode one value"""
+        self.indices.append(None if value is None else self.dictionary.setdefault(value, len(self.dictionary)))
+
+    def array(self):
+        """The column as a pyarrow.DictionaryArray"""
+        import pyarrow as pa
+
+        return pa.DictionaryArray.from_arrays(
+            pa.array(self.indices, pa.int32()), pa.array(list(self.dictionary), pa.string())
+        )
+
+
+def qc_metric_table(records: Iterable[Union[Metadata, QualityControl, dict]]) -> Any:
+    """
+    Build a columnar table of the QC metrics of many assets
+    Parameters
+    ----------
+    records : Iterable[Union[Metadata, QualityControl, dict]]
+      Metadata records, whose name becomes the asset_name column, or QualityControl
+      models, or the json documents of either, e.g. straight from the document database
+
+    Returns
+    -------
+    pyarrow.Table
+      One row per metric, with the columns asset_name, evaluation, modality, stage,
+      metric, status, evaluator, timestamp and evaluated_assets. Status, evaluator
+      and timestamp are those of the latest entry in the metric's status history.
+    """
+    import pyarrow as pa
+
+    encoders = {name: _DictionaryEncoder() for name in DICTIONARY_COLUMNS}
+    timestamps = []
+    evaluated_assets = []
+    for record in records:
+        asset_name, quality_control = _quality_control(record)
+        if quality_control is None:
+            continue
+        for evaluation in _get(quality_control, "evaluations"):
+            evaluation_values = (
+                column_string(_get(evaluation, "name")),
+                _modality(_get(evaluation, "modality")),
+                column_string(_get(evaluation, "stage")),
+            )
+            for metric in _get(evaluation, "metrics"):
+                latest = _get(metric, "status_history")[-1]
+                values = (asset_name, *evaluation_values, _get(metric, "name"))
+                values += (column_string(_get(latest, "status")), _get(latest, "evaluator"))
+                for name, value in zip(DICTIONARY_COLUMNS, values):
+                    encoders[name].append(value)
+                timestamps.append(column_timestamp(_get(latest, "timestamp")))
+                evaluated_assets.append(_get(metric, "evaluated_assets"))
+    columns = {name: encoder.array() for name, encoder in encoders.items()}
+    columns["timestamp"] = pa.array(timestamps, pa.timestamp("us", tz="UTC"))
+    columns["evaluated_assets"] = pa.array(evaluated_assets, pa.list_(pa.string()))
+    return pa.table(columns)
+
+
+def failure_rates(table: Any, by: Sequence[str] = ("modality", "stage"), period: Optional[str] = None) -> Any:
+    """
+    Fraction of metrics whose latest status is Fail, by group
+    Parameters
+    ----------
+    table : pyarrow.Table
+      Table built by qc_metric_table, possibly concatenated from many batches
+    by : Sequence[str]
+      Columns to group by, e.g. ("modality", "stage") or ("evaluator",)
+    period : Optional[str]
+      Also group by the day, week, month, quarter or year of the status timestamp,
+      in a column named period, to follow failure rates over time
+
+    Returns
+    -------
+    pyarrow.Table
+      The group columns as plain strings, then metrics, failed and failure_rate, sorted by group
+    """
+    import pyarrow as pa
+    import pyarrow.compute as pc
+
+    # batches built separately have their own dictionaries
+    table = table.unify_dictionaries()
+    keys = list(by)
+    columns = {key: table[key] for key in keys}
+    if period is not None:
+        if period not in PERIODS:
+            raise ValueError(f"period must be one of {PERIODS}, not '{period}'")
+        columns["period"] = pc.floor_temporal(table["timestamp"], unit=period)
+        keys.append("period")
+    columns["failed"] = pc.cast(pc.equal(table["status"], "Fail"), pa.int64())
+    grouped = pa.table(columns).group_by(keys).aggregate([("failed", "count"), ("failed", "sum")])
+    grouped = grouped.select(keys + ["failed_count", "failed_sum"]).rename_columns(keys + ["metrics", "failed"])
+    # there are few groups, so decode them to plain strings, which can be sorted
+    for position, key in enumerate(keys):
+        if pa.types.is_dictionary(grouped.schema.field(key).type):
+            grouped = grouped.set_column(position, key, grouped[key].cast(pa.string()))
+    failure_rate = pc.divide(pc.cast(grouped["failed"], pa.float64()), grouped["metrics"])
+    grouped = grouped.append_column("failure_rate", failure_rate)
+    return grouped.sort_by([(key, "ascending") for key in keys])
@@ -0,0 +1,161 @@
+"""Versions of each rig over time, for finding the rig a session was acquired on"""
+
+import json
+import re
+from bisect import bisect_left, bisect_right
+from datetime import date, datetime
+from typing import Dict, Iterable, Iterator, List, NamedTuple, Optional, Tuple, Union
+
+from aind_data_schema.core.rig import RIG_ID_PATTERN, Rig
+from aind_data_schema.core.session import Session
+from aind_data_schema.utils.compatibility_check import RigSessionCompatibility
+from aind_data_schema.utils.delta_archive import DeltaArchive
+
+
+class RigKey(NamedTuple):
+    """Room and apparatus that the versions of a rig share"""
+
+    room: str
+    apparatus: str
+
+
+class BackfillResult(NamedTuple):
+    """Rig resolved for a historical session, and any incompatibilities with it"""
+
+    session: Session
+    rig: Union[Rig, None]
+    errors: List[str]
+
+
+def parse_rig_id(rig_id: str) -> Tuple[RigKey, date]:
+    """Split a rig_id of the form <room>_<apparatus>_<YYYYMMDD> into its rig and modification date"""
+    if not re.match(RIG_ID_PATTERN, rig_id):
+        raise ValueError(f"rig_id '{rig_id}' does not match {RIG_ID_PATTERN}")
+    room, apparatus, modified = rig_id.split("_")
+    return RigKey(room, apparatus), datetime.strptime(modified, "%Y%m%d").date()
+
+
+class _Version(NamedTuple):
+    """One version of a rig, and the fingerprint its content is archived under"""
+
+    rig_id: str
+    effective: date
+    fingerprint: str
+
+
+class RigHistory:
+    """Sorted versions of every rig, with point-in-time lookup.
+
+    Versions are grouped by room and apparatus and sorted by the date in their
+    rig_id. Their content is kept in a DeltaArchive, each version as a patch
+    from the version before it, since consecutive versions usually differ by
+    one device.
+    """
+
+    def __init__(self, archive: Optional[DeltaArchive] = None):
+        """
+        Parameters
+        ----------
+        archive : Optional[DeltaArchive]
+          Archive to store rig content in. Defaults to a new one. Content that no
+          version refers to any more is dropped from it when a version is replaced.
+        """
+        self.archive = DeltaArchive(Rig) if archive is None else archive
+        self._versions: Dict[RigKey, List[_Version]] = {}
+        self._dates: Dict[RigKey, List[date]] = {}
+
+    def __len__(self) -> int:
+        """Number of stored versions"""
+        return sum(len(versions) for versions in self._versions.values())
+
+    def rigs(self) -> List[RigKey]:
+        """Every room and apparatus with stored versions"""
+        return sorted(self._versions)
+
+    def versions(self, rig: RigKey) -> List[str]:
+        """rig_ids of the versions of one rig, oldest first"""
+        return [version.rig_id for version in self._versions.get(rig, [])]
+
+    def add(self, rig: Union[Rig, dict]) -> str:
+        """Store a version of a rig, replacing any version with the same rig_id, and return its rig_id"""
+        document = json.loads(rig.model_dump_json(by_alias=True)) if isinstance(rig, Rig) else rig
+        key, effective = parse_rig_id(document["rig_id"])
+        versions = self._versions.setdefault(key, [])
+        dates = self._dates.setdefault(key, [])
+        position = bisect_right(dates, effective)
+        replaced = position > 0 and versions[position - 1].rig_id == document["rig_id"]
+        if replaced:
+            position -= 1
+            del versions[position]
+            del dates[position]
+        # deltas are keyed by content, so the versions after this one keep their own bases
+        base = versions[position - 1].fingerprint if position > 0 else None
+        versions.insert(position, _Version(document["rig_id"], effective, self.archive.add(document, base=base)))
+        dates.insert(position, effective)
+        if replaced:
+            # the replaced content stays archived only while later versions are deltas from it
+            self.archive.gc(version.fingerprint for versions in self._versions.values() for version in versions)
+        return document["rig_id"]
+
+    def add_many(self, rigs: Iterable[Union[Rig, dict]]) -> List[str]:
+        """Store many versions"""
+        return [self.add(rig) for rig in rigs]
+
+    def get(self, rig_id: str) -> Rig:
+        """One version, by its rig_id"""
+        key, effective = parse_rig_id(rig_id)
+        position = bisect_left(self._dates.get(key, []), effective)
+        if position == len(self._dates.get(key, [])) or self._versions[key][position].rig_id != rig_id:
+            raise KeyError(f"No rig version {rig_id}")
+        return self.archive.get(self._versions[key][position].fingerprint)
+
+    def at(self, rig: RigKey, when: Union[date, datetime]) -> Optional[Rig]:
+        """
+        Version of a rig that was in effect at a point in time
+        Parameters
+        ----------
+        rig : RigKey
+          Room and apparatus
+        when : Union[date, datetime]
+          Point in time. A version is in effect from the date in its rig_id until the next version.
+
+        Returns
+        -------
+        Optional[Rig]
+          The latest version modified on or before that date, or None if there is none
+        """
+        day = when.date() if isinstance(when, datetime) else when
+        position = bisect_right(self._dates.get(rig, []), day)
+        return None if position == 0 else self.archive.get(self._versions[rig][position - 1].fingerprint)
+
+    def for_session(self, session: Session) -> Optional[Rig]:
+        """Version of the session's rig that was in effect when the session started"""
+        key, _ = parse_rig_id(session.rig_id)
+        return self.at(key, session.session_start_time)
+
+    def backfill(self, sessions: Iterable[Session]) -> Iterator[BackfillResult]:
+        """
+        Resolve the rig of many historical sessions and check that they are compatible
+        Parameters
+        ----------
+        sessions : Iterable[Session]
+          Sessions whose rig_id names a room and apparatus in this history
+
+        Returns
+        -------
+        Iterator[BackfillResult]
+          For each session, the rig in effect when it started, or None, and the
+          errors from RigSessionCompatibility, e.g. because the session's rig_id
+          names a different version than the one in effect
+        """
+        for session in sessions:
+            rig = self.for_session(session)
+            if rig is None:
+                yield BackfillResult(session, None, [f"No version of rig {session.rig_id} before the session"])
+                continue
+            try:
+                RigSessionCompatibility(rig, session).run_compatibility_check()
+                errors = []
+            except ValueError as e:
+                errors = [str(error) for error in e.args[0]]
+            yield BackfillResult(session, rig, errors)
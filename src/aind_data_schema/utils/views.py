@@ -0,0 +1,179 @@
+"""Read-only views over raw metadata JSON that coerce fields on access"""
+
+import json
+from enum import Enum
+from typing import Any, ClassVar, Dict, List, Optional, Type, TypeVar, Union, get_args, get_origin
+
+from pydantic import BaseModel, TypeAdapter
+from pydantic.fields import FieldInfo
+from typing_extensions import Annotated
+
+_MISSING = object()
+_NONE_TYPE = type(None)
+_VIEW_CLASSES: Dict[Type[BaseModel], Type["ModelView"]] = {}
+_ADAPTERS: Dict[Any, TypeAdapter] = {}
+
+
+def _is_viewable(annotation: Any) -> bool:
+    """Views are generated for models defined in this package; other models are small and validated directly"""
+    return (
+        isinstance(annotation, type)
+        and issubclass(annotation, BaseModel)
+        and annotation.__module__.startswith("aind_data_schema.")
+    )
+
+
+def _adapter(annotation: Any) -> TypeAdapter:
+    """Cached TypeAdapter for a leaf annotation"""
+    if annotation not in _ADAPTERS:
+        _ADAPTERS[annotation] = TypeAdapter(annotation)
+    return _ADAPTERS[annotation]
+
+
+def _select_member(members: List[Type[BaseModel]], raw: dict, discriminator: Optional[str]) -> Type[BaseModel]:
+    """Pick the union member that a raw dict belongs to"""
+    if discriminator is not None:
+        for member in members:
+            field = member.model_fields.get(discriminator)
+            if field is not None and field.default == raw.get(discriminator):
+                return member
+    for member in members:
+        required = [name for name, field in member.model_fields.items() if field.is_required()]
+        if all(name in raw for name in required) and all(key in member.model_fields for key in raw):
+            return member
+    return members[0]
+
+
+def _coerce_union(annotation: Any, raw: Any, discriminator: Optional[str]) -> Any:
+    """Coerce a raw value to a union, viewing it as a model when one of the members is viewable"""
+    members = [arg for arg in get_args(annotation) if arg is not _NONE_TYPE]
+    viewable = [member for member in members if _is_viewable(member)]
+    if viewable and isinstance(raw, dict):
+        return view_class(_select_member(viewable, raw, discriminator))(raw)
+    if len(members) == 1:
+        return _coerce(members[0], raw, discriminator)
+    return _adapter(annotation).validate_python(raw)
+
+
+def _coerce(annotation: Any, raw: Any, discriminator: Optional[str] = None) -> Any:
+    """Coerce a raw JSON value to the type described by an annotation, wrapping nested models in views"""
+    if raw is None:
+        return None
+    origin = get_origin(annotation)
+    if origin is Annotated:
+        args = get_args(annotation)
+        for metadata in args[1:]:
+            if isinstance(metadata, FieldInfo) and isinstance(metadata.discriminator, str):
+                discriminator = metadata.discriminator
+        return _coerce(args[0], raw, discriminator)
+    if isinstance(annotation, TypeVar):
+        return _coerce(annotation.__bound__, raw)
+    if origin is Union:
+        return _coerce_union(annotation, raw, discriminator)
+    if origin in (list, List) and isinstance(raw, list):
+        (item_annotation,) = get_args(annotation) or (Any,)
+        return [_coerce(item_annotation, item) for item in raw]
+    if origin in (dict, Dict) and isinstance(raw, dict):
+        _, value_annotation = get_args(annotation) or (Any, Any)
+        return {key: _coerce(value_annotation, value) for key, value in raw.items()}
+    if _is_viewable(annotation) and isinstance(raw, dict):
+        return view_class(annotation)(raw)
+    return _adapter(annotation).validate_python(raw)
+
+
+def _enum_values(value: Any) -> Any:
+    """Mirror use_enum_values by unwrapping enum members, including those in lists"""
+    if isinstance(value, Enum):
+        return value.value
+    if isinstance(value, list):
+        return [_enum_values(item) for item in value]
+    return value
+
+
+class ModelView:
+    """Read-only view of a raw JSON dict that mirrors a model's attributes.
+
+    Nothing is validated up front. Each attribute is coerced to its annotated
+    type the first time it is read, and nested models are wrapped in views of
+    their own, so reading a few fields out of a large record only pays for
+    those fields.
+    """
+
+    __slots__ = ("_data", "_cache")
+
+    model_class: ClassVar[Type[BaseModel]]
+
+    def __init__(self, data: dict):
+        """Wrap a parsed JSON dict"""
+        object.__setattr__(self, "_data", data)
+        object.__setattr__(self, "_cache", {})
+
+    @classmethod
+    def from_json(cls, json_data: Union[str, bytes]) -> "ModelView":
+        """Parse a JSON document and wrap it"""
+        return cls(json.loads(json_data))
+
+    def __getattr__(self, name: str) -> Any:
+        """Look up and coerce a field the first time it is read"""
+        cache = object.__getattribute__(self, "_cache")
+        if name in cache:
+            return cache[name]
+        data = object.__getattribute__(self, "_data")
+        field = self.model_class.model_fields.get(name)
+        if field is None:
+            if self.model_class.model_config.get("extra") == "allow" and name in data:
+                return data[name]
+            raise AttributeError(f"'{type(self).__name__}' object has no attribute '{name}'")
+        raw = data.get(field.alias or name, _MISSING)
+        if raw is _MISSING:
+            value = field.get_default(call_default_factory=True)
+        else:
+            value = _coerce(field.annotation, raw, field.discriminator)
+            if self.model_class.model_config.get("use_enum_values"):
+                value = _enum_values(value)
+        cache[name] = value
+        return value
+
+    def __setattr__(self, name: str, value: Any):
+        """Views are read-only"""
+        raise AttributeError(f"'{type(self).__name__}' is read-only")
+
+    def __dir__(self) -> List[str]:
+        """List the model's fields"""
+        return sorted(set(super().__dir__()) | set(self.model_class.model_fields))
+
+    def __repr__(self) -> str:
+        """Show the model the view stands in for"""
+        return f"{type(self).__name__}({', '.join(object.__getattribute__(self, '_data'))})"
+
+    @property
+    def raw(self) -> dict:
+        """The underlying JSON dict"""
+        return object.__getattribute__(self, "_data")
+
+    def to_model(self) -> BaseModel:
+        """Fully validate the underlying dict into the model"""
+        return self.model_class.model_validate(self.raw)
+
+
+def view_class(model_class: Type[BaseModel]) -> Type[ModelView]:
+    """Return the view class generated for a model class"""
+    if model_class not in _VIEW_CLASSES:
+        _VIEW_CLASSES[model_class] = type(
+            f"{model_class.__name__}View",
+            (ModelView,),
+            {
+                "__slots__": (),
+                "__doc__": f"Read-only view of {model_class.__name__}",
+                "__module__": __name__,
+                "model_class": model_class,
+            },
+        )
+    return _VIEW_CLASSES[model_class]
+
+
+def view(model_class: Type[BaseModel], data: Union[dict, str, bytes]) -> ModelView:
+    """Wrap a raw dict, or a JSON string, in a read-only view of model_class"""
+    if isinstance(data, (str, bytes)):
+        return view_class(model_class).from_json(data)
+    return view_class(model_class)(data)
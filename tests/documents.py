@@ -0,0 +1,19 @@
+"""Raw Metadata documents shared by the index and store tests"""
+
+
+def raw_metadata(number: int, subject_id: str, modality: list, platform: str, created: str, **extra) -> dict:
+    """Build a raw Metadata document, as stored in the document database"""
+    doc = {
+        "_id": f"00000000-0000-0000-0000-{number:012d}",
+        "name": f"asset_{number}",
+        "location": "s3://bucket",
+        "metadata_status": "Valid",
+        "subject": {"subject_id": subject_id},
+        "data_description": {
+            "modality": [{"abbreviation": m} for m in modality],
+            "platform": {"abbreviation": platform},
+            "creation_time": created,
+        },
+    }
+    doc.update(extra)
+    return doc
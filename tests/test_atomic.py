@@ -0,0 +1,39 @@
+""" tests for atomic """
+
+import os
+import stat
+import tempfile
+import unittest
+from pathlib import Path
+
+from aind_data_schema.utils.atomic import locked, write_atomic
+
+
+class AtomicTests(unittest.TestCase):
+    """Tests for file locking and atomic replacement"""
+
+    def test_write_atomic(self):
+        """Test that files are replaced whole, keeping their permissions"""
+        with tempfile.TemporaryDirectory() as directory:
+            path = Path(directory) / "quality_control.json"
+            write_atomic(path, "{}")
+            self.assertEqual("{}", path.read_text())
+
+            os.chmod(path, 0o664)
+            write_atomic(path, b'{"notes": null}')
+            self.assertEqual('{"notes": null}', path.read_text())
+            self.assertEqual(0o664, stat.S_IMODE(os.stat(path).st_mode))
+            # no temporary files are left behind
+            self.assertEqual([path], list(Path(directory).iterdir()))
+
+    def test_locked(self):
+        """Test that the locked file is yielded and can be locked again afterwards"""
+        with tempfile.TemporaryFile() as f:
+            with locked(f) as held:
+                self.assertIs(f, held)
+            with locked(f, exclusive=False):
+                pass
+
+
+if __name__ == "__main__":
+    unittest.main()
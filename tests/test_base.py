@@ -1,15 +1,21 @@
 """ tests for Subject """
 
+import json
+import tempfile
 import unittest
 from datetime import datetime, timezone
 from pathlib import Path
 from unittest.mock import MagicMock, call, mock_open, patch
 
-from pydantic import create_model
+from pydantic import ValidationError, create_model
 
 from aind_data_schema.base import AwareDatetimeWithDefault
+from aind_data_schema.core.metadata import Metadata
+from aind_data_schema.core.session import Session
 from aind_data_schema.core.subject import Subject
 
+EXAMPLES_DIR = Path(__file__).parents[1] / "examples"
+
 
 class BaseTests(unittest.TestCase):
     """tests for the base module"""
@@ -56,5 +62,71 @@ class BaseTests(unittest.TestCase):
         self.assertEqual(expected_json, model_instance.model_dump_json())
 
 
+class LoadFieldsTests(unittest.TestCase):
+    """tests for AindCoreModel.load_fields"""
+
+    def test_load_top_level_fields(self):
+        """Top level fields are validated, missing optional fields get defaults"""
+        fields = Session.load_fields(
+            EXAMPLES_DIR / "ephys_session.json",
+            fields=["subject_id", "session_start_time", "rig_id", "notes", "reward_consumed_unit"],
+        )
+        session = Session.model_validate_json((EXAMPLES_DIR / "ephys_session.json").read_text())
+        for name, value in fields.items():
+            self.assertEqual(getattr(session, name), value)
+        self.assertEqual("milliliter", fields["reward_consumed_unit"])
+
+    def test_dotted_fields_through_lists(self):
+        """Dotted fields cannot reach into the items of list fields"""
+        with self.assertRaises(ValueError) as context:
+            Session.load_fields(EXAMPLES_DIR / "ephys_session.json", ["data_streams.daq_names"])
+        self.assertIn("is inside a list", str(context.exception))
+        with self.assertRaises(ValueError) as context:
+            Session.load_fields(EXAMPLES_DIR / "ephys_session.json", ["reward_delivery.reward_spouts.side"])
+        self.assertIn("is inside a list", str(context.exception))
+        with self.assertRaises(ValueError) as context:
+            Session.load_fields(EXAMPLES_DIR / "ephys_session.json", ["notes.text"])
+        self.assertIn("has no field", str(context.exception))
+
+    def test_load_dotted_fields(self):
+        """Dotted fields reach into nested core models"""
+        session = Session.model_validate_json((EXAMPLES_DIR / "ephys_session.json").read_text())
+        metadata = Metadata(name="ecephys_664484_2023-04-25_02-35-00", location="s3://bucket", session=session)
+        with tempfile.TemporaryDirectory() as tmpdir:
+            metadata.write_standard_file(output_directory=Path(tmpdir))
+            path = Path(tmpdir) / "metadata.nd.json"
+            fields = Metadata.load_fields(path, ["session.rig_id", "id", "subject.subject_id", "name", "session"])
+            with self.assertRaises(ValueError):
+                Metadata.load_fields(path, ["session.not_a_field"])
+            with self.assertRaises(ValueError):
+                Metadata.load_fields(path, ["name.rig_id"])
+
+        self.assertEqual(session.rig_id, fields["session.rig_id"])
+        self.assertEqual(metadata.id, fields["id"])
+        self.assertIsNone(fields["subject.subject_id"])
+        self.assertEqual(session, fields["session"])
+
+    def test_missing_required_field(self):
+        """A required field that is not in the file raises a ValueError"""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = Path(tmpdir) / "session.json"
+            path.write_text(json.dumps({"rig_id": "323_EPHYS1_20231003"}))
+            self.assertEqual(
+                {"rig_id": "323_EPHYS1_20231003", "notes": None, "reward_consumed_unit": "milliliter"},
+                Session.load_fields(path, ["rig_id", "notes", "reward_consumed_unit"]),
+            )
+            with self.assertRaises(ValueError) as e:
+                Session.load_fields(path, ["subject_id"])
+        self.assertIn("subject_id", str(e.exception))
+
+    def test_invalid_value(self):
+        """Requested values are validated against the field's constraints"""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = Path(tmpdir) / "session.json"
+            path.write_text(json.dumps({"schema_version": "not a version", "rig_id": "rig"}))
+            with self.assertRaises(ValidationError):
+                Session.load_fields(path, ["schema_version"])
+
+
 if __name__ == "__main__":
     unittest.main()
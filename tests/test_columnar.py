@@ -0,0 +1,227 @@
+""" tests for columnar flattening """
+
+import json
+import tempfile
+import unittest
+from datetime import date, datetime, timedelta, timezone
+from pathlib import Path
+from typing import Dict, List, Literal, Optional, Union
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+from aind_data_schema_models.modalities import Modality
+from pydantic import BaseModel, Field
+
+from aind_data_schema.core.metadata import Metadata
+from aind_data_schema.core.subject import Subject
+from aind_data_schema.utils.columnar import (
+    ASSET_ID,
+    MAIN_TABLE,
+    POSITION,
+    arrow_schemas,
+    flatten,
+    flatten_records,
+    table_plans,
+    to_arrow_tables,
+    write_parquet,
+)
+
+EXAMPLES_DIR = Path(__file__).parents[1] / "examples"
+
+
+class Leaf(BaseModel):
+    """Model used inside lists"""
+
+    value: int
+    children: List["Leaf"] = []
+
+
+class OtherLeaf(BaseModel):
+    """Union member whose value disagrees with Leaf"""
+
+    value: str
+    label: Optional[str] = Field(default=None)
+
+
+class Node(BaseModel):
+    """Model covering every kind of column"""
+
+    id: str
+    flag: bool
+    count: Optional[int] = Field(default=None)
+    ratio: float
+    when: datetime
+    day: date
+    duration: Optional[timedelta] = Field(default=None)
+    code: Literal[1, 2] = 1
+    extra: Dict[str, int] = {}
+    modality: Optional[Modality.ONE_OF] = Field(default=None)
+    parent: Optional["Node"] = Field(default=None)
+    tags: List[str] = []
+    leaves: List[Union[Leaf, OtherLeaf]] = []
+    mixed: List[Union[Leaf, int]] = []
+
+
+class ColumnarTests(unittest.TestCase):
+    """tests for columnar flattening"""
+
+    @classmethod
+    def setUpClass(cls):
+        """Build a raw Metadata document from the example files"""
+        cls.document = {"_id": "asset-1", "name": "asset", "location": "s3://bucket"}
+        for filename, field in [
+            ("subject.json", "subject"),
+            ("data_description.json", "data_description"),
+            ("procedures.json", "procedures"),
+            ("ephys_session.json", "session"),
+            ("quality_control.json", "quality_control"),
+        ]:
+            with open(EXAMPLES_DIR / filename, "r") as f:
+                cls.document[field] = json.load(f)
+
+    def test_metadata_plans(self):
+        """Column names are derived from the schema"""
+        main, *children = table_plans()
+        names = [column.name for column in main.columns]
+        self.assertEqual(MAIN_TABLE, main.name)
+        self.assertIn("session.session_start_time", names)
+        self.assertIn("data_description.modality", names)
+        self.assertNotIn("session.data_streams", names)
+        children = {child.name: child for child in children}
+        for name in ["session.data_streams", "procedures.subject_procedures", "quality_control.evaluations"]:
+            self.assertEqual([ASSET_ID, POSITION], [column.name for column in children[name].columns[:2]])
+
+    def test_flatten_metadata(self):
+        """Records flatten into one main row and child rows joined by asset id"""
+        rows = flatten(self.document)
+        (row,) = rows[MAIN_TABLE]
+        self.assertEqual("asset-1", row["id"])
+        self.assertEqual(["ecephys", "behavior-videos"], row["data_description.modality"])
+        self.assertEqual(datetime(2023, 4, 25, 2, 35, tzinfo=timezone.utc), row["session.session_start_time"])
+        self.assertEqual("AIND", row["data_description.institution"])
+        self.assertEqual(date(2022, 11, 22), row["subject.date_of_birth"])
+        self.assertIsNone(row["rig.rig_id"])
+
+        evaluations = rows["quality_control.evaluations"]
+        self.assertEqual(len(self.document["quality_control"]["evaluations"]), len(evaluations))
+        self.assertEqual(["asset-1"], list({evaluation[ASSET_ID] for evaluation in evaluations}))
+        self.assertEqual(list(range(len(evaluations))), [evaluation[POSITION] for evaluation in evaluations])
+        self.assertEqual("ecephys", evaluations[0]["modality"])
+        self.assertIsInstance(evaluations[0]["metrics"], str)
+
+    def test_flatten_model(self):
+        """Models are flattened through their json form"""
+        with open(EXAMPLES_DIR / "subject.json", "r") as f:
+            subject = Subject.model_validate_json(f.read())
+        metadata = Metadata(name="asset", location="s3://bucket", subject=subject)
+        (row,) = flatten(metadata)[MAIN_TABLE]
+        self.assertEqual(str(metadata.id), row["id"])
+        self.assertEqual(subject.subject_id, row["subject.subject_id"])
+        self.assertEqual("Valid", row["metadata_status"])
+        self.assertEqual(metadata.created.replace(tzinfo=timezone.utc), row["created"])
+
+    def test_column_kinds(self):
+        """Annotations map to column kinds, and unions that disagree fall back to json"""
+        main, leaves = table_plans(Node)
+        kinds = {column.name: (column.kind, column.repeated) for column in main.columns}
+        self.assertEqual(("string", False), kinds["id"])
+        self.assertEqual(("bool", False), kinds["flag"])
+        self.assertEqual(("int", False), kinds["count"])
+        self.assertEqual(("float", False), kinds["ratio"])
+        self.assertEqual(("timestamp", False), kinds["when"])
+        self.assertEqual(("date", False), kinds["day"])
+        self.assertEqual(("json", False), kinds["duration"])
+        self.assertEqual(("json", False), kinds["code"])
+        self.assertEqual(("json", False), kinds["extra"])
+        self.assertEqual(("string", False), kinds["modality"])
+        self.assertEqual(("string", True), kinds["tags"])
+        # recursive models and lists that mix models with other types are kept as json
+        self.assertEqual(("json", False), kinds["parent"])
+        self.assertEqual(("json", False), kinds["mixed"])
+
+        self.assertEqual("leaves", leaves.name)
+        leaf_kinds = {column.name: column.kind for column in leaves.columns}
+        self.assertEqual(
+            {ASSET_ID: "string", POSITION: "int", "value": "json", "children": "json", "label": "string"}, leaf_kinds
+        )
+
+    def test_conversions(self):
+        """Values are converted to their column kind"""
+        node = {
+            "id": "n1",
+            "flag": 1,
+            "ratio": "0.5",
+            "when": "2024-01-01T10:00:00",
+            "day": "2024-01-02",
+            "duration": 3.0,
+            "modality": {"name": "Extracellular electrophysiology", "abbreviation": "ecephys"},
+            "tags": ["a", None],
+            "leaves": [{"value": 1}, {"value": "x", "label": "y"}],
+        }
+        rows = flatten(node, Node)
+        (row,) = rows[MAIN_TABLE]
+        self.assertEqual(True, row["flag"])
+        self.assertEqual(0.5, row["ratio"])
+        self.assertEqual(datetime(2024, 1, 1, 10, tzinfo=timezone.utc), row["when"])
+        self.assertEqual(date(2024, 1, 2), row["day"])
+        self.assertEqual("3.0", row["duration"])
+        self.assertEqual("ecephys", row["modality"])
+        self.assertEqual(["a", None], row["tags"])
+        self.assertEqual(["1", '"x"'], [leaf["value"] for leaf in rows["leaves"]])
+        self.assertEqual([None, "y"], [leaf["label"] for leaf in rows["leaves"]])
+
+        (row,) = flatten(Node(id="n2", flag=False, ratio=1, when=datetime(2024, 1, 1), day=date(2024, 1, 1)), Node)[
+            MAIN_TABLE
+        ]
+        self.assertEqual("n2", row["id"])
+        # fractions of a second with other than 3 or 6 digits, and offsets other than UTC
+        (row,) = flatten(dict(node, when="2024-01-01T12:00:00.12+02:00"), Node)[MAIN_TABLE]
+        self.assertEqual(datetime(2024, 1, 1, 10, 0, 0, 120000, tzinfo=timezone.utc), row["when"])
+        with self.assertRaises(ValueError):
+            flatten(dict(node, ratio="not a number"), Node)
+
+    def test_arrow_tables(self):
+        """Arrow tables use the schema-derived types"""
+        documents = [self.document, dict(self.document, _id="asset-2", quality_control=None)]
+        tables = to_arrow_tables(documents)
+        self.assertEqual(set(arrow_schemas()), set(tables))
+        main = tables[MAIN_TABLE]
+        self.assertEqual(["asset-1", "asset-2"], main.column("id").to_pylist())
+        self.assertEqual(pa.timestamp("us", tz="UTC"), main.schema.field("session.session_start_time").type)
+        self.assertEqual(pa.list_(pa.string()), main.schema.field("data_description.modality").type)
+        evaluations = tables["quality_control.evaluations"]
+        self.assertEqual(len(self.document["quality_control"]["evaluations"]), evaluations.num_rows)
+        self.assertEqual(0, tables["rig.cameras"].num_rows)
+
+        columns = flatten_records(documents)
+        self.assertEqual(main.column("name").to_pylist(), columns[MAIN_TABLE]["name"])
+
+    def test_write_parquet(self):
+        """Tables are written as partitioned Parquet datasets, in batches"""
+        documents = [dict(self.document, _id=f"asset-{i}") for i in range(5)]
+        with tempfile.TemporaryDirectory() as tmp:
+            counts = write_parquet(iter(documents), tmp, batch_size=2)
+            self.assertEqual(5, counts[MAIN_TABLE])
+            self.assertEqual(0, counts["rig.cameras"])
+            self.assertEqual(
+                ["data_description.platform=ecephys"], [p.name for p in (Path(tmp) / MAIN_TABLE).iterdir()]
+            )
+            self.assertFalse((Path(tmp) / "rig.cameras").exists())
+            main = pq.read_table(Path(tmp) / MAIN_TABLE)
+            self.assertEqual(sorted(d["_id"] for d in documents), sorted(main.column("id").to_pylist()))
+            evaluations = pq.read_table(Path(tmp) / "quality_control.evaluations")
+            self.assertEqual(counts["quality_control.evaluations"], evaluations.num_rows)
+            self.assertEqual({"ecephys"}, set(evaluations.column("data_description.platform").to_pylist()))
+
+        with tempfile.TemporaryDirectory() as tmp:
+            write_parquet(documents, tmp, partition_by=())
+            self.assertEqual(5, pq.read_table(Path(tmp) / MAIN_TABLE).num_rows)
+            # a second write into the same root adds to the dataset instead of overwriting it
+            write_parquet(documents[:2], tmp, partition_by=())
+            self.assertEqual(7, pq.read_table(Path(tmp) / MAIN_TABLE).num_rows)
+            with self.assertRaises(ValueError):
+                write_parquet(documents, tmp, partition_by=["location.path"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,102 @@
+""" tests for compact leaf models """
+
+import pickle
+import unittest
+from datetime import datetime, timezone
+from decimal import Decimal
+
+from aind_data_schema_models.units import SizeUnit
+
+from aind_data_schema.components.coordinates import Axis, Coordinates3d, Translation3dTransform
+from aind_data_schema.components.devices import DAQChannel
+from aind_data_schema.core.quality_control import QCStatus, Status
+from aind_data_schema.utils.compact import (
+    CompactCoordinates3d,
+    CompactDAQChannel,
+    CompactQCStatus,
+    CompactTranslation3dTransform,
+    compact,
+    compact_class,
+)
+
+
+class CompactModelTests(unittest.TestCase):
+    """tests for CompactModel classes"""
+
+    def test_from_model_keeps_attributes(self):
+        """Compact copies expose the same attribute values as the model"""
+        coords = Coordinates3d.model_validate({"x": "1.5", "y": "-2", "z": "0.1", "unit": "millimeter"})
+        compact_coords = compact(coords)
+
+        self.assertIsInstance(compact_coords, CompactCoordinates3d)
+        self.assertFalse(hasattr(compact_coords, "__dict__"))
+        self.assertEqual(Decimal("1.5"), compact_coords.x)
+        self.assertEqual(Decimal("-2"), compact_coords.y)
+        self.assertEqual(Decimal("0.1"), compact_coords.z)
+        self.assertEqual("millimeter", compact_coords.unit)
+        self.assertEqual(coords, compact_coords.to_model())
+        self.assertEqual(compact_coords, coords)
+        self.assertEqual(coords.model_dump_json(), compact_coords.model_dump_json())
+        self.assertEqual(coords.model_dump(), compact_coords.model_dump())
+
+    def test_decimal_precision_preserved(self):
+        """Decimals that do not survive a float round trip are kept as Decimals"""
+        value = Decimal("0.12345678901234567890")
+        compact_coords = CompactCoordinates3d(x=value, y=1, z=2)
+        self.assertEqual(value, compact_coords.x)
+        self.assertEqual(SizeUnit.UM, compact_coords.unit)
+
+    def test_units_are_interned(self):
+        """Equal unit strings share one object"""
+        first = CompactCoordinates3d(x=1, y=2, z=3, unit="".join(["milli", "meter"]))
+        second = CompactCoordinates3d(x=1, y=2, z=3, unit="".join(["millim", "eter"]))
+        self.assertIs(first.unit, second.unit)
+
+    def test_lists_and_optional_fields(self):
+        """List fields come back as lists and optional fields keep their defaults"""
+        transform = Translation3dTransform(translation=[1, "2.5", 3])
+        compact_transform = compact(transform)
+        self.assertIsInstance(compact_transform, CompactTranslation3dTransform)
+        self.assertEqual([Decimal(1), Decimal("2.5"), Decimal(3)], compact_transform.translation)
+        self.assertEqual("translation", compact_transform.type)
+
+        channel = CompactDAQChannel(channel_name="ch0", device_name="Laser A", channel_type="Analog Output")
+        self.assertIsNone(channel.sample_rate)
+        self.assertEqual(
+            DAQChannel(channel_name="ch0", device_name="Laser A", channel_type="Analog Output"), channel.to_model()
+        )
+
+    def test_init_errors(self):
+        """Missing and unexpected fields raise TypeError"""
+        with self.assertRaises(TypeError):
+            CompactCoordinates3d(x=1, y=2)
+        with self.assertRaises(TypeError):
+            CompactCoordinates3d(x=1, y=2, z=3, w=4)
+
+    def test_setattr_eq_hash_pickle(self):
+        """Assignment, equality, hashing and pickling work on packed values"""
+        status = compact(
+            QCStatus(evaluator="Bob", status=Status.PASS, timestamp=datetime(2024, 1, 1, tzinfo=timezone.utc))
+        )
+        self.assertIsInstance(status, CompactQCStatus)
+        status.status = Status.FAIL
+        self.assertEqual(Status.FAIL, status.status)
+        with self.assertRaises(AttributeError):
+            status.other = 1
+
+        restored = pickle.loads(pickle.dumps(status))
+        self.assertEqual(status, restored)
+        self.assertEqual(hash(status), hash(restored))
+        self.assertNotEqual(status, CompactCoordinates3d(x=1, y=2, z=3))
+        self.assertNotEqual(status, "Bob")
+        self.assertIn("evaluator='Bob'", repr(status))
+
+    def test_compact_unregistered_model(self):
+        """Models without a compact form are returned unchanged, and classes are cached"""
+        axis = Axis(name="X", direction="Left")
+        self.assertIs(axis, compact(axis))
+        self.assertIs(CompactTranslation3dTransform, compact_class(Translation3dTransform))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,97 @@
+""" tests for ContentStore """
+
+import json
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+from aind_data_schema.base import document_fingerprint
+from aind_data_schema.content_store import ContentStore, is_ref
+from aind_data_schema.core.metadata import Metadata, MetadataStatus
+from aind_data_schema.core.procedures import Procedures
+from aind_data_schema.core.subject import Subject
+
+EXAMPLES_DIR = Path(__file__).parents[1] / "examples"
+
+
+class ContentStoreTests(unittest.TestCase):
+    """tests for ContentStore"""
+
+    @classmethod
+    def setUpClass(cls):
+        """Load example files"""
+        with open(EXAMPLES_DIR / "subject.json", "r") as f:
+            cls.subject = Subject.model_validate_json(f.read())
+        with open(EXAMPLES_DIR / "procedures.json", "r") as f:
+            cls.procedures = json.load(f)
+
+    def setUp(self):
+        """Build records that share their subject and procedures"""
+        self.records = [
+            Metadata(
+                name=f"asset_{i}", location=f"s3://bucket/asset_{i}", subject=self.subject, procedures=self.procedures
+            )
+            for i in range(3)
+        ]
+
+    def test_fingerprint(self):
+        """Fingerprints depend on content only"""
+        document = json.loads(self.subject.model_dump_json(by_alias=True))
+        reordered = dict(reversed(list(document.items())))
+        self.assertEqual(self.subject.fingerprint(), document_fingerprint(reordered))
+        self.assertTrue(self.subject.fingerprint().startswith("sha256:"))
+        changed = self.subject.model_copy(update={"notes": "changed"})
+        self.assertNotEqual(self.subject.fingerprint(), changed.fingerprint())
+
+    def test_dehydrate_rehydrate(self):
+        """Shared core files are stored once and rehydrated as shared instances"""
+        store = ContentStore()
+        documents = [store.dehydrate(record) for record in self.records]
+        self.assertEqual(2, len(store))
+        self.assertEqual({"$ref": self.subject.fingerprint()}, documents[0]["subject"])
+        self.assertTrue(is_ref(documents[0]["procedures"]))
+        self.assertFalse(is_ref(documents[0]["name"]))
+        self.assertIsNone(documents[0]["rig"])
+        self.assertEqual(documents[0], store.dehydrate(documents[0]))
+        self.assertEqual(self.subject.fingerprint(), store.put(self.subject))
+
+        first = store.rehydrate(documents[0])
+        self.assertEqual(self.records[0], first)
+        # the second record reuses both the cached models and their known validity
+        with patch.object(Subject, "model_dump") as model_dump:
+            second = store.rehydrate(documents[1])
+            model_dump.assert_not_called()
+        self.assertEqual(self.records[1], second)
+        self.assertIs(first.subject, second.subject)
+        self.assertEqual(MetadataStatus.VALID, second.metadata_status)
+
+    def test_invalid_content(self):
+        """Invalid core files are kept, and the records that use them are marked invalid"""
+        store = ContentStore(cache_size=1)
+        key = store.put({"subject_id": "123"})
+        document = {"name": "asset", "location": "s3://bucket", "subject": {"$ref": key}}
+        self.assertEqual(MetadataStatus.INVALID, store.rehydrate(document).metadata_status)
+        self.assertEqual(MetadataStatus.INVALID, store.rehydrate(document).metadata_status)
+        self.assertEqual("123", store.get(key, Subject).subject_id)
+        # with a cache of one, fetching another model evicts the first
+        cached = store.get(key, Subject)
+        store.get(key, Procedures)
+        self.assertIsNot(cached, store.get(key, Subject))
+        with self.assertRaises(KeyError):
+            store.get_document("sha256:missing")
+
+    def test_directory(self):
+        """Core files can be kept in a directory"""
+        with tempfile.TemporaryDirectory() as tmp:
+            store = ContentStore(tmp)
+            documents = [store.dehydrate(record.model_dump(by_alias=True, mode="json")) for record in self.records]
+            self.assertEqual(2, len(store))
+            self.assertEqual(2, len(list(Path(tmp).glob("*/*.json.z"))))
+            reopened = ContentStore(tmp)
+            self.assertIn(documents[2]["subject"]["$ref"], reopened)
+            self.assertEqual(self.records[2], reopened.rehydrate(documents[2]))
+
+
+if __name__ == "__main__":
+    unittest.main()
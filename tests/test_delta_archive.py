@@ -0,0 +1,123 @@
+""" tests for DeltaArchive """
+
+import json
+import tempfile
+import unittest
+from pathlib import Path
+
+from aind_data_schema.base import document_fingerprint
+from aind_data_schema.core.instrument import Instrument
+from aind_data_schema.core.rig import Rig
+from aind_data_schema.utils.delta_archive import DeltaArchive, apply_delta, make_delta
+
+EXAMPLES_DIR = Path(__file__).parents[1] / "examples"
+
+
+class DeltaArchiveTests(unittest.TestCase):
+    """tests for DeltaArchive"""
+
+    @classmethod
+    def setUpClass(cls):
+        """Load example files"""
+        cls.rig = json.loads((EXAMPLES_DIR / "ephys_rig.json").read_text())
+        cls.instrument = json.loads((EXAMPLES_DIR / "exaspim_instrument.json").read_text())
+
+    def revisions(self, count: int) -> list:
+        """Versions of the example rig, each with new notes"""
+        versions = [self.rig]
+        for revision in range(1, count):
+            rig = json.loads(json.dumps(versions[-1]))
+            rig["notes"] = f"revision {revision}"
+            versions.append(rig)
+        return versions
+
+    def test_make_and_apply_delta(self):
+        """Deltas patch only what changed, and check the documents they apply to"""
+        rig = Rig.model_validate(self.rig)
+        edited = json.loads(json.dumps(self.rig))
+        edited["cameras"][0]["camera"]["serial_number"] = "new"
+        delta = make_delta(rig, edited)
+        self.assertEqual(document_fingerprint(self.rig), delta.base)
+        self.assertEqual(document_fingerprint(edited), delta.fingerprint)
+        self.assertEqual([{"op": "replace", "path": "/cameras/0/camera/serial_number", "value": "new"}], delta.patch)
+        self.assertEqual(edited, apply_delta(rig, delta))
+
+        with self.assertRaises(ValueError):
+            apply_delta(edited, delta)
+        with self.assertRaises(ValueError):
+            apply_delta(self.rig, delta._replace(fingerprint=delta.base))
+
+    def test_chains(self):
+        """Versions are stored as deltas, with a full copy every snapshot_interval versions"""
+        archive = DeltaArchive(snapshot_interval=3, cache_size=2)
+        versions = self.revisions(5)
+        fingerprints = [archive.add(versions[0])]
+        for version in versions[1:]:
+            fingerprints.append(archive.add(version, base=fingerprints[-1]))
+        self.assertEqual(fingerprints[0], archive.add(Rig.model_validate(versions[0])))
+        self.assertEqual(5, len(archive))
+        self.assertNotIn("sha256:0", archive)
+        self.assertEqual(
+            [True, False, False, True, False], [archive.delta(fingerprint) is None for fingerprint in fingerprints]
+        )
+        self.assertEqual(
+            [{"op": "replace", "path": "/notes", "value": "revision 2"}], archive.delta(fingerprints[2]).patch
+        )
+
+        for fingerprint, version in zip(fingerprints, versions):
+            self.assertEqual(version, archive.get_document(fingerprint))
+        self.assertEqual(2, len(archive._cache))
+
+        rig = archive.get(fingerprints[2])
+        self.assertEqual("revision 2", rig.notes)
+        self.assertIs(rig, archive.get(fingerprints[2]))
+        archive.get(fingerprints[1])
+        archive.get(fingerprints[0])
+        self.assertIsNot(rig, archive.get(fingerprints[2]))
+
+        # returned documents are copies
+        archive.get_document(fingerprints[0])["notes"] = "changed"
+        self.assertEqual(versions[0], archive.get_document(fingerprints[0]))
+
+        with self.assertRaises(KeyError):
+            archive.add(dict(self.rig, notes="unknown base"), base="sha256:0")
+        with self.assertRaises(KeyError):
+            archive.get("sha256:0")
+
+    def test_gc(self):
+        """Versions that are not kept are dropped, unless a kept version is a delta from them"""
+        archive = DeltaArchive(cache_size=2)
+        fingerprints = []
+        for version in self.revisions(4):
+            fingerprints.append(archive.add(version, base=fingerprints[-1] if fingerprints else None))
+        replacement = archive.add(dict(self.rig, notes="replacement"), base=fingerprints[0])
+        archive.get(fingerprints[1])
+        archive.get_document(fingerprints[3])
+
+        self.assertEqual(1, archive.gc([fingerprints[2], replacement]))
+        self.assertEqual(fingerprints[:3] + [replacement], list(archive._depths))
+        self.assertNotIn(fingerprints[3], archive._cache)
+        self.assertEqual("revision 2", archive.get(fingerprints[2]).notes)
+        self.assertEqual(3, archive.gc([fingerprints[0]]))
+        self.assertEqual([fingerprints[0]], list(archive._depths))
+        self.assertEqual({}, archive._models)
+        with self.assertRaises(KeyError):
+            archive.gc(["sha256:0"])
+
+    def test_write_and_read(self):
+        """Archives round trip through JSON Lines files"""
+        archive = DeltaArchive(Instrument)
+        first = archive.add(self.instrument)
+        second = archive.add(dict(self.instrument, notes="moved"), base=first)
+        with tempfile.TemporaryDirectory() as directory:
+            path = Path(directory) / "instrument.jsonl.gz"
+            self.assertEqual(2, archive.write(path))
+            copy = DeltaArchive.read(path, model_class=Instrument)
+        self.assertEqual(2, len(copy))
+        self.assertEqual(archive.delta(second), copy.delta(second))
+        self.assertIsInstance(copy.get(second), Instrument)
+        self.assertEqual("moved", copy.get(second).notes)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,85 @@
+""" tests for string interning """
+
+import json
+import unittest
+from pathlib import Path
+
+from aind_data_schema.core.metadata import Metadata
+from aind_data_schema.core.procedures import Procedures
+from aind_data_schema.core.rig import Rig
+from aind_data_schema.core.session import Session
+from aind_data_schema.core.subject import Subject
+from aind_data_schema.utils.interning import StringInterner, maybe_intern
+
+EXAMPLES_DIR = Path(__file__).parents[1] / "examples"
+
+
+class StringInternerTests(unittest.TestCase):
+    """tests for StringInterner"""
+
+    @classmethod
+    def setUpClass(cls):
+        """Load example json files"""
+        with open(EXAMPLES_DIR / "ephys_session.json", "r") as f:
+            cls.session_json = f.read()
+        with open(EXAMPLES_DIR / "procedures.json", "r") as f:
+            cls.procedures_json = f.read()
+        with open(EXAMPLES_DIR / "ephys_rig.json", "r") as f:
+            cls.rig_json = f.read()
+        with open(EXAMPLES_DIR / "subject.json", "r") as f:
+            cls.subject_json = f.read()
+
+    def test_session_strings_shared(self):
+        """Repeated names in separately loaded sessions become one object"""
+        interner = StringInterner()
+        first = interner.model_validate(Session, json.loads(self.session_json))
+        second = interner.model_validate(Session, json.loads(self.session_json))
+
+        self.assertEqual(first, second)
+        self.assertIs(first.experimenter_full_name[0], second.experimenter_full_name[0])
+        self.assertIs(first.rig_id, second.rig_id)
+        self.assertIs(first.data_streams[0].daq_names[0], second.data_streams[0].daq_names[0])
+        self.assertGreater(interner.strings_replaced, 0)
+        self.assertGreater(interner.bytes_saved, 0)
+        self.assertIn("bytes_saved=", repr(interner))
+        self.assertGreater(len(interner), 0)
+
+    def test_devices_and_procedures(self):
+        """Device names, units, organization names and procedure fields are interned"""
+        interner = StringInterner()
+        rigs = [interner.model_validate(Rig, json.loads(self.rig_json)) for _ in range(2)]
+        procedures = [interner.model_validate(Procedures, json.loads(self.procedures_json)) for _ in range(2)]
+
+        self.assertIs(rigs[0].daqs[0].name, rigs[1].daqs[0].name)
+        self.assertIs(rigs[0].daqs[0].manufacturer.name, rigs[1].daqs[0].manufacturer.name)
+        self.assertIs(
+            procedures[0].subject_procedures[0].experimenter_full_name,
+            procedures[1].subject_procedures[0].experimenter_full_name,
+        )
+        # subject_id is unique per record and is left alone
+        self.assertIsNot(procedures[0].subject_id, procedures[1].subject_id)
+
+    def test_fields_outside_modules_not_interned(self):
+        """Only models from the configured modules are touched"""
+        interner = StringInterner()
+        subject = interner.model_validate_json(Subject, self.subject_json)
+        self.assertNotIn(subject.genotype, interner._pool)
+        self.assertIn(subject.species.name, interner._pool)
+
+        metadata = interner.intern_model(
+            Metadata(name="asset", location="bucket", subject=subject, external_links={"Code Ocean": ["abc"]})
+        )
+        self.assertEqual(["abc"], metadata.external_links["Code Ocean"])
+        self.assertNotIn("abc", interner._pool)
+
+    def test_maybe_intern(self):
+        """maybe_intern is a no-op without an interner"""
+        session = Session.model_validate_json(self.session_json)
+        self.assertIs(session, maybe_intern(session, None))
+        interner = StringInterner()
+        self.assertIs(session, maybe_intern(session, interner))
+        self.assertIn(session.rig_id, interner._pool)
+
+
+if __name__ == "__main__":
+    unittest.main()
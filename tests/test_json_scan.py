@@ -0,0 +1,56 @@
+""" tests for json_scan """
+
+import json
+import unittest
+
+from aind_data_schema.utils.json_scan import extract_paths, skip_value, value_span
+
+
+class JsonScanTests(unittest.TestCase):
+    """tests for partial json decoding"""
+
+    def test_extract_paths(self):
+        """Only the requested keys are returned"""
+        text = json.dumps({"a": {"b": 1, "c": [{"x": 'a}]" {'}], "d": 2}, "e": "z", "f": [1, [2, 3]], "g": None})
+        self.assertEqual({"a": {"d": 2}, "e": "z"}, extract_paths(text, [("a", "d"), ("e",)]))
+        self.assertEqual({"a": json.loads(text)["a"]}, extract_paths(text, [("a",), ("a", "d")]))
+        self.assertEqual({"a": json.loads(text)["a"]}, extract_paths(text, [("a", "d"), ("a",)]))
+        self.assertEqual({"g": None}, extract_paths(text, [("g", "h")]))
+        self.assertEqual({"f": [1, [2, 3]]}, extract_paths(text, [("f", "h")]))
+        self.assertEqual({}, extract_paths(text, [("missing",)]))
+        self.assertEqual({}, extract_paths(" { } ", [("missing",)]))
+        self.assertEqual({"a": {}}, extract_paths('{"a": {}}', [("a", "b")]))
+
+    def test_skip_value(self):
+        """Values of each json type are skipped to their end"""
+        text = '{"a": [1, {"b": "]"}], "c": true, "d": "s\\"t", "e": -1.5e3}'
+        self.assertEqual(len(text), skip_value(text, 0))
+        self.assertEqual(text.index(', "c"'), skip_value(text, text.index("[")))
+        self.assertEqual(text.index(', "d"'), skip_value(text, text.index("true")))
+        self.assertEqual(text.index(', "e"'), skip_value(text, text.index('"s')))
+
+    def test_value_span(self):
+        """Values are located by their key path"""
+        text = '{"a": {"b": [1, 2], "c": {"d": "}"}}, "e": null}'
+        start, end = value_span(text, ["a", "c", "d"])
+        self.assertEqual('"}"', text[start:end])
+        self.assertEqual("[1, 2]", text[slice(*value_span(text, ["a", "b"]))])
+        self.assertEqual("null", text[slice(*value_span(text, ["e"]))])
+        self.assertEqual((0, len(text)), value_span(text, []))
+        for path in [["f"], ["a", "f"], ["a", "c", "d", "f"]]:
+            with self.assertRaises((KeyError, ValueError), msg=path):
+                value_span(text, path)
+        with self.assertRaises(KeyError):
+            value_span('{"a": {}}', ["a", "b"])
+        with self.assertRaises(ValueError):
+            value_span('{"a": 1, 2: 3}', ["b"])
+
+    def test_malformed_json(self):
+        """Malformed documents raise ValueError"""
+        for text in ["[1]", '{"a" 1}', '{"a": 1 "b": 2}', "{1: 2}", '{"a": ', '{"a": [1, 2', '{"a": }']:
+            with self.assertRaises(ValueError, msg=text):
+                extract_paths(text, [("b",)])
+
+
+if __name__ == "__main__":
+    unittest.main()
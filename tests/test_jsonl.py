@@ -0,0 +1,91 @@
+""" tests for JSON Lines streaming """
+
+import gzip
+import tempfile
+import unittest
+from pathlib import Path
+
+from aind_data_schema.core.metadata import Metadata
+from aind_data_schema.core.subject import Subject
+from aind_data_schema.utils.interning import StringInterner
+from aind_data_schema.utils.jsonl import iter_jsonl, write_jsonl
+
+EXAMPLES_DIR = Path(__file__).parents[1] / "examples"
+
+
+class JsonlTests(unittest.TestCase):
+    """tests for iter_jsonl and write_jsonl"""
+
+    @classmethod
+    def setUpClass(cls):
+        """Build a few Metadata records"""
+        with open(EXAMPLES_DIR / "subject.json", "r") as f:
+            subject = Subject.model_validate_json(f.read())
+        cls.records = [
+            Metadata(name=f"asset_{i}", location=f"s3://bucket/asset_{i}", subject=subject) for i in range(7)
+        ]
+
+    def setUp(self):
+        """Create a scratch directory"""
+        self.tmp = tempfile.TemporaryDirectory()
+        self.dir = Path(self.tmp.name)
+
+    def tearDown(self):
+        """Remove the scratch directory"""
+        self.tmp.cleanup()
+
+    def test_round_trip(self):
+        """Records written in parallel chunks are read back in order"""
+        for filename in ["records.jsonl", "records.jsonl.gz", "records.jsonl.bz2", "records.jsonl.xz"]:
+            path = self.dir / filename
+            self.assertEqual(7, write_jsonl(iter(self.records), path, threads=2, chunk_size=2))
+            self.assertEqual(self.records, list(iter_jsonl(path)))
+        with gzip.open(self.dir / "records.jsonl.gz", "rt") as f:
+            self.assertIn('"_id"', f.readline())
+
+    def test_dicts(self):
+        """Plain dicts can be written and read without a model"""
+        path = self.dir / "records.txt"
+        docs = [{"a": i} for i in range(3)]
+        self.assertEqual(3, write_jsonl(docs, path, compression=None))
+        self.assertEqual(docs, list(iter_jsonl(path, model=None)))
+        self.assertEqual(0, write_jsonl([], self.dir / "empty.jsonl"))
+        self.assertEqual([], list(iter_jsonl(self.dir / "empty.jsonl")))
+
+    def test_errors(self):
+        """Invalid lines are reported with their line number, or skipped"""
+        path = self.dir / "records.jsonl"
+        with open(path, "w") as f:
+            f.write(self.records[0].model_dump_json(by_alias=True) + "\n\n")
+            f.write('{"name": "missing location"}\n')
+            f.write("not json\n")
+            f.write(self.records[1].model_dump_json(by_alias=True) + "\n")
+
+        records = iter_jsonl(path)
+        self.assertEqual(self.records[0], next(records))
+        with self.assertRaises(ValueError) as e:
+            next(records)
+        self.assertIn("line 3", str(e.exception))
+
+        with self.assertLogs(level="WARNING") as logs:
+            self.assertEqual(self.records[:2], list(iter_jsonl(path, errors="skip")))
+        self.assertIn("line 4", logs.output[1])
+        with self.assertRaises(ValueError):
+            list(iter_jsonl(path, model=None))
+
+        with self.assertRaises(ValueError):
+            list(iter_jsonl(path, errors="ignore"))
+        with self.assertRaises(ValueError):
+            list(iter_jsonl(path, compression="zip"))
+
+    def test_interner(self):
+        """Loaded models can share their repeated strings"""
+        path = self.dir / "records.jsonl"
+        write_jsonl(self.records, path)
+        interner = StringInterner()
+        records = list(iter_jsonl(path, interner=interner))
+        self.assertIs(records[0].subject.species.name, records[1].subject.species.name)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,128 @@
+""" tests for lineage """
+
+import unittest
+from pathlib import Path
+
+from aind_data_schema.core.data_description import DataDescription, DerivedDataDescription
+from aind_data_schema.core.metadata import Metadata
+from aind_data_schema.core.processing import Processing
+from aind_data_schema.utils.lineage import LineageIndex, asset_name_from_location
+
+EXAMPLES_DIR = Path(__file__).parents[1] / "examples"
+
+RAW = "ecephys_12345_2022-02-21_16-30-01"
+SORTED = "ecephys_12345_2022-02-21_16-30-01_sorted_2022-03-01_10-00-00"
+CURATED = "ecephys_12345_2022-02-21_16-30-01_sorted_2022-03-01_10-00-00_curated_2022-03-02_10-00-00"
+OTHER_RAW = "ecephys_67890_2022-02-22_16-30-01"
+COMBINED = "combined_2022-04-01_10-00-00"
+REFERENCE = "smartspim_12345_2022-01-01_10-00-00"
+
+
+def _processing(version: str, *inputs: str, url: str = "https://github.com/AllenNeuralDynamics/sorting") -> dict:
+    """Json of a processing record with one step per input location"""
+    return {
+        "processing_pipeline": {
+            "pipeline_version": version,
+            "pipeline_url": url,
+            "data_processes": [{"input_location": location} for location in inputs],
+        }
+    }
+
+
+class LineageIndexTests(unittest.TestCase):
+    """Tests for LineageIndex"""
+
+    def setUp(self):
+        """Build a graph of raw, derived and combined assets"""
+        self.index = LineageIndex()
+        self.index.add({"name": RAW}, {"processing_pipeline": {"data_processes": [{"input_location": "/acquire"}]}})
+        self.index.add({"name": SORTED, "input_data_name": RAW}, _processing("1.0", f"s3://bucket/{RAW}/ecephys"))
+        self.index.add(
+            {"name": CURATED, "input_data_name": SORTED, "related_data": [{"related_data_path": f"/data/{REFERENCE}"}]},
+            _processing("2.0", f"/data/{SORTED}"),
+        )
+        self.index.add({"name": COMBINED}, _processing("1.0", f"/data/{SORTED}", f"/data/{OTHER_RAW}", url="other"))
+
+    def test_graph(self):
+        """Test adjacency, ancestry and topological order"""
+        index = self.index
+        self.assertEqual(6, len(index))
+        self.assertIn(OTHER_RAW, index)
+        self.assertEqual({CURATED, COMBINED}, index.children(SORTED))
+        self.assertEqual({SORTED, REFERENCE}, index.parents(CURATED))
+        self.assertEqual(set(), index.parents(RAW))
+        self.assertEqual({SORTED, CURATED, COMBINED}, index.descendants(RAW))
+        self.assertEqual({COMBINED}, index.descendants(OTHER_RAW))
+        self.assertEqual(set(), index.descendants(CURATED))
+        self.assertEqual({RAW, SORTED, REFERENCE}, index.ancestors(CURATED))
+        self.assertEqual({RAW, SORTED, OTHER_RAW}, index.ancestors(COMBINED))
+
+        order = index.topological_order()
+        self.assertEqual(set(index._parents), set(order))
+        for name in order:
+            for parent in index.parents(name):
+                self.assertLess(order.index(parent), order.index(name))
+        with self.assertRaises(KeyError):
+            index.descendants("unknown")
+
+    def test_pipeline_versions(self):
+        """Test finding assets by pipeline version"""
+        self.assertEqual({SORTED, COMBINED}, self.index.assets_by_pipeline_version("1.0"))
+        self.assertEqual({COMBINED}, self.index.assets_by_pipeline_version("1.0", pipeline_url="other"))
+        self.assertEqual(set(), self.index.assets_by_pipeline_version("3.0"))
+
+    def test_replace(self):
+        """Test that adding an asset again replaces its links and pipeline"""
+        self.assertEqual({SORTED, CURATED, COMBINED}, self.index.descendants(RAW))
+        self.index.add({"name": COMBINED}, _processing("3.0", f"/data/{OTHER_RAW}"))
+        self.assertEqual({SORTED, CURATED}, self.index.descendants(RAW))
+        self.assertEqual({CURATED}, self.index.children(SORTED))
+        self.assertEqual({COMBINED}, self.index.assets_by_pipeline_version("3.0"))
+        self.assertEqual({SORTED}, self.index.assets_by_pipeline_version("1.0"))
+        self.index.add({"name": COMBINED})
+        self.assertEqual(set(), self.index.assets_by_pipeline_version("3.0"))
+
+    def test_cycles(self):
+        """Test that assets derived from each other are reported"""
+        self.index.add({"name": RAW, "input_data_name": CURATED})
+        with self.assertRaises(ValueError) as e:
+            self.index.descendants(RAW)
+        self.assertIn(RAW, str(e.exception))
+        self.assertNotIn(OTHER_RAW, str(e.exception))
+
+    def test_records(self):
+        """Test adding Metadata records and their json documents"""
+        raw = DataDescription.model_validate_json((EXAMPLES_DIR / "data_description.json").read_text())
+        derived = DerivedDataDescription.from_data_description(raw, process_name="sorted")
+        processing = Processing.model_validate_json((EXAMPLES_DIR / "processing.json").read_text())
+        # a partial record, which would not have the files its modality requires
+        record = Metadata.model_construct(name=derived.name, data_description=derived, processing=processing)
+
+        index = LineageIndex()
+        # documents keep the fields of the derived data description
+        names = index.add_many(
+            [record, {"data_description": derived.model_dump(), "processing": processing.model_dump()}]
+        )
+        self.assertEqual([derived.name, derived.name], names)
+        self.assertEqual({raw.name}, index.parents(derived.name))
+        self.assertEqual(
+            {derived.name}, index.assets_by_pipeline_version(processing.processing_pipeline.pipeline_version)
+        )
+
+        # assets are keyed by name, so records without one are rejected and leave the graph usable
+        with self.assertRaises(ValueError):
+            index.add_record({"processing": processing.model_dump()})
+        with self.assertRaises(ValueError):
+            index.add({"input_data_name": raw.name})
+        self.assertEqual([raw.name, derived.name], index.topological_order())
+
+    def test_asset_name_from_location(self):
+        """Test finding the asset a location is in"""
+        self.assertEqual(RAW, asset_name_from_location(f"s3://bucket/{RAW}/"))
+        self.assertEqual(SORTED, asset_name_from_location(f"C:\\data\\{RAW}\\{SORTED}\\curated"))
+        self.assertIsNone(asset_name_from_location("/path/to/inputs"))
+        self.assertIsNone(asset_name_from_location(None))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -4,10 +4,12 @@ import json
 import re
 import unittest
 from datetime import time
+from pathlib import Path
+from unittest.mock import patch
 
 from aind_data_schema_models.organizations import Organization
 from aind_data_schema_models.platforms import Platform
-from aind_data_schema_models.modalities import Modality
+from aind_data_schema_models.modalities import FileRequirement, Modality
 from pydantic import ValidationError
 from pydantic import __version__ as pyd_version
 
@@ -15,7 +17,7 @@ from aind_data_schema.components.devices import MousePlatform
 from aind_data_schema.core.acquisition import Acquisition
 from aind_data_schema.core.data_description import DataDescription
 from aind_data_schema.core.instrument import Instrument
-from aind_data_schema.core.metadata import Metadata, MetadataStatus
+from aind_data_schema.core.metadata import VALIDATOR_DEPENDENCIES, Metadata, MetadataStatus, expected_files_for
 from aind_data_schema.core.procedures import (
     IontophoresisInjection,
     NanojectInjection,
@@ -24,10 +26,12 @@ from aind_data_schema.core.procedures import (
     ViralMaterial,
 )
 from aind_data_schema.core.processing import Processing
+from aind_data_schema.core.quality_control import QualityControl
 from aind_data_schema.core.rig import Rig
 from aind_data_schema.core.session import Session
 from aind_data_schema.core.subject import BreedingInfo, Sex, Species, Subject
 
+EXAMPLES_DIR = Path(__file__).parents[1] / "examples"
 PYD_VERSION = re.match(r"(\d+.\d+).\d+", pyd_version).group(1)
 
 
@@ -58,6 +62,13 @@ class TestMetadata(unittest.TestCase):
         self.assertEqual(MetadataStatus.VALID, d1.metadata_status)
         self.assertEqual(s1, d1.subject)
 
+        # Tests constructed via dictionary
+        d2 = Metadata(
+            name="ecephys_655019_2023-04-03_18-17-09", location="bucket", subject=json.loads(s1.model_dump_json())
+        )
+        self.assertEqual(MetadataStatus.VALID, d2.metadata_status)
+        self.assertEqual(s1, d2.subject)
+
     def test_missing_subject_info(self):
         """Marks the metadata status as MISSING if a Subject model is not
         present"""
@@ -326,6 +337,82 @@ class TestMetadata(unittest.TestCase):
             str(context.exception),
         )
 
+    def test_update(self):
+        """Tests that update revalidates only the changed fields and their dependent validators"""
+        with open(EXAMPLES_DIR / "subject.json", "r") as f:
+            subject = Subject.model_validate_json(f.read())
+        with open(EXAMPLES_DIR / "quality_control.json", "r") as f:
+            quality_control = json.load(f)
+        m = Metadata(name="ecephys_655019_2023-04-03_18-17-09", location="bucket", subject=subject)
+        self.assertEqual(MetadataStatus.VALID, m.metadata_status)
+
+        with patch("aind_data_schema.core.metadata.RigSessionCompatibility") as compatibility:
+            self.assertIs(m, m.update(quality_control=quality_control))
+            compatibility.assert_not_called()
+        self.assertIsInstance(m.quality_control, QualityControl)
+        self.assertEqual(MetadataStatus.VALID, m.metadata_status)
+        self.assertIn("quality_control", m.model_fields_set)
+
+        self.assertLess(m.created, m.last_modified)
+        m.update(quality_control=dict(quality_control, evaluations="not a list"))
+        self.assertEqual(MetadataStatus.INVALID, m.metadata_status)
+        m.update(quality_control=None, name="renamed")
+        self.assertEqual(MetadataStatus.VALID, m.metadata_status)
+        self.assertEqual("renamed", m.name)
+        m.update(subject=None)
+        self.assertEqual(MetadataStatus.MISSING, m.metadata_status)
+
+        with self.assertRaises(ValueError):
+            m.update(location2="bucket")
+        with self.assertRaises(ValidationError):
+            m.update(name=["not", "a", "name"])
+
+    def test_update_validator_dependencies(self):
+        """Tests that update knows which fields every cross-file validator depends on"""
+        validators = set(Metadata.__pydantic_decorators__.model_validators)
+        # update sets metadata_status itself instead of rerunning validate_metadata
+        self.assertEqual(validators - {"validate_metadata"}, set(VALIDATOR_DEPENDENCIES))
+        for dependencies in VALIDATOR_DEPENDENCIES.values():
+            self.assertLessEqual(set(dependencies), set(Metadata.model_fields))
+
+    def test_update_rolls_back(self):
+        """Tests that a failing dependent validator undoes the update"""
+        mouse_platform = MousePlatform.model_construct(name="platform1")
+        rig = Rig.model_construct(rig_id="123_EPHYS1_20220101", mouse_platform=mouse_platform)
+        session = Session.model_construct(rig_id="123_EPHYS1_20220101", mouse_platform_name="platform1")
+        m = Metadata(
+            name="ecephys_655019_2023-04-03_18-17-09",
+            location="bucket",
+            subject=Subject.model_construct(),
+            rig=rig,
+            session=session,
+        )
+        self.assertEqual(MetadataStatus.INVALID, m.metadata_status)
+
+        other_session = Session.model_construct(rig_id="123_EPHYS2_20230101", mouse_platform_name="platform1")
+        with self.assertRaises(ValueError) as context:
+            m.update(session=other_session, name="renamed")
+        self.assertIn("does not match the rig's", str(context.exception))
+        self.assertIs(session, m.session)
+        self.assertEqual("ecephys_655019_2023-04-03_18-17-09", m.name)
+        self.assertEqual(MetadataStatus.INVALID, m.metadata_status)
+
+    def test_expected_files_for(self):
+        """Tests the cached requirement table for a combination of modalities"""
+        ecephys = expected_files_for([Modality.ECEPHYS])
+        self.assertEqual(FileRequirement.REQUIRED, ecephys["rig"])
+        self.assertEqual(ecephys, expected_files_for(["ecephys"]))
+
+        combined = expected_files_for([Modality.SPIM, "behavior"])
+        self.assertEqual(combined, expected_files_for(["behavior", Modality.SPIM, Modality.SPIM]))
+        self.assertEqual(FileRequirement.EXCLUDED, expected_files_for([Modality.SPIM])["session"])
+        self.assertEqual(FileRequirement.REQUIRED, combined["session"])
+        self.assertEqual(FileRequirement.OPTIONAL, combined["quality_control"])
+
+        self.assertEqual({}, expected_files_for([]))
+        combined["session"] = FileRequirement.EXCLUDED
+        self.assertEqual(FileRequirement.REQUIRED, expected_files_for([Modality.SPIM, "behavior"])["session"])
+
 
 if __name__ == "__main__":
     unittest.main()
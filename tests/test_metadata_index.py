@@ -0,0 +1,141 @@
+""" tests for MetadataIndex """
+
+import json
+import tempfile
+import unittest
+from datetime import datetime, timezone
+from pathlib import Path
+
+from aind_data_schema_models.modalities import Modality
+from aind_data_schema_models.platforms import Platform
+
+from aind_data_schema.core.metadata import Metadata, MetadataStatus
+from aind_data_schema.core.quality_control import Status
+from aind_data_schema.core.subject import Subject
+from aind_data_schema.utils.metadata_index import MetadataIndex, record_keys
+from tests.documents import raw_metadata
+
+EXAMPLES_DIR = Path(__file__).parents[1] / "examples"
+
+
+class MetadataIndexTests(unittest.TestCase):
+    """tests for MetadataIndex"""
+
+    @classmethod
+    def setUpClass(cls):
+        """Load example files"""
+        with open(EXAMPLES_DIR / "quality_control.json", "r") as f:
+            cls.quality_control = json.load(f)
+        with open(EXAMPLES_DIR / "subject.json", "r") as f:
+            cls.subject = Subject.model_validate_json(f.read())
+
+    def setUp(self):
+        """Index a few documents"""
+        self.docs = [
+            raw_metadata(
+                1, "100", ["ecephys", "behavior-videos"], "ecephys", "2024-01-01T10:00:00Z", rig={"rig_id": "r1"}
+            ),
+            raw_metadata(2, "100", ["behavior"], "behavior", "2024-02-01T10:00:00Z", rig={"rig_id": "r1"}),
+            raw_metadata(
+                3, "200", ["ecephys"], "ecephys", "2024-03-01T10:00:00+00:00", quality_control=self.quality_control
+            ),
+            raw_metadata(4, "300", ["pophys"], "multiplane-ophys", "2024-03-01T10:00:00Z", metadata_status="Invalid"),
+        ]
+        self.index = MetadataIndex()
+        self.ids = self.index.insert_many(self.docs)
+
+    def test_equality_queries(self):
+        """Compound equality queries intersect the indexes"""
+        self.assertEqual(4, len(self.index))
+        self.assertEqual({self.ids[0], self.ids[1]}, self.index.query(subject_id="100"))
+        self.assertEqual({self.ids[0], self.ids[2]}, self.index.query(modality=Modality.ECEPHYS))
+        self.assertEqual({self.ids[0]}, self.index.query(modality="ecephys", rig_id="r1"))
+        self.assertEqual({self.ids[1], self.ids[3]}, self.index.query(platform=[Platform.BEHAVIOR, "multiplane-ophys"]))
+        self.assertEqual({self.ids[3]}, self.index.query(metadata_status=MetadataStatus.INVALID))
+        self.assertEqual({self.ids[2]}, self.index.query(qc_status=Status.PENDING))
+        self.assertEqual(set(), self.index.query(subject_id="100", platform="missing"))
+        self.assertEqual(set(self.ids), self.index.query())
+        with self.assertRaises(ValueError):
+            self.index.query(location="s3://bucket")
+
+    def test_time_range_queries(self):
+        """creation_time ranges are answered from the sorted time index"""
+        jan = datetime(2024, 1, 1, tzinfo=timezone.utc)
+        feb = datetime(2024, 2, 1, 10, tzinfo=timezone.utc)
+        self.assertEqual({self.ids[1], self.ids[2], self.ids[3]}, self.index.query(created_after=feb))
+        self.assertEqual({self.ids[0]}, self.index.query(created_after=jan, created_before=feb))
+        self.assertEqual(
+            {self.ids[1]},
+            self.index.query(
+                created_before=datetime(2024, 3, 1, tzinfo=timezone.utc), subject_id="100", created_after=feb
+            ),
+        )
+
+        # naive timestamps, in documents and in queries, are read as UTC
+        self.index.insert(raw_metadata(9, "300", ["ecephys"], "ecephys", "2024-01-15T00:00:00"))
+        self.assertEqual(
+            {self.ids[0], "00000000-0000-0000-0000-000000000009"},
+            self.index.query(created_after=datetime(2024, 1, 1), created_before=feb),
+        )
+
+        # fractions of a second with other than 3 or 6 digits
+        self.index.insert(raw_metadata(10, "300", ["ecephys"], "ecephys", "2024-01-20T00:00:00.5+00:00"))
+        self.assertEqual(3, len(self.index.query(created_after=jan, created_before=feb)))
+
+    def test_update_and_delete(self):
+        """Updates re-index a record and deletes remove it from every index"""
+        self.index.update(raw_metadata(1, "200", ["ecephys"], "ecephys", "2023-01-01T00:00:00Z"))
+        self.assertEqual({self.ids[1]}, self.index.query(subject_id="100"))
+        self.assertEqual({self.ids[0], self.ids[2]}, self.index.query(subject_id="200"))
+        self.assertEqual({self.ids[0]}, self.index.query(created_before=datetime(2024, 1, 1, tzinfo=timezone.utc)))
+        self.assertEqual("200", self.index.keys(self.ids[0])["subject_id"])
+
+        self.index.delete(self.ids[2])
+        self.assertNotIn(self.ids[2], self.index)
+        self.assertEqual({self.ids[0]}, self.index.query(modality="ecephys"))
+        self.assertEqual(set(), self.index.query(qc_status="Pending"))
+        self.assertEqual(3, len(self.index))
+
+    def test_save_and_load(self):
+        """An index written to disk answers the same queries"""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = Path(tmpdir) / "index.json"
+            self.index.save(path)
+            loaded = MetadataIndex.load(path)
+        self.assertEqual(len(self.index), len(loaded))
+        self.assertEqual(self.index.query(modality="ecephys"), loaded.query(modality="ecephys"))
+        self.assertEqual(
+            self.index.query(created_after=datetime(2024, 2, 1, tzinfo=timezone.utc)),
+            loaded.query(created_after=datetime(2024, 2, 1, tzinfo=timezone.utc)),
+        )
+
+    def test_metadata_models(self):
+        """Metadata models are indexed the same way as raw documents"""
+        metadata = Metadata(name="asset", location="s3://bucket", subject=self.subject)
+        keys = record_keys(metadata)
+        self.assertEqual(str(metadata.id), keys["id"])
+        self.assertEqual(self.subject.subject_id, keys["subject_id"])
+        self.assertEqual("Valid", keys["metadata_status"])
+        self.assertEqual([], keys["modality"])
+        self.assertIsNone(keys["creation_time"])
+        self.assertIsNone(keys["qc_status"])
+
+        self.index.insert(metadata)
+        self.assertIn(metadata.id, self.index)
+        self.assertEqual({str(metadata.id)}, self.index.query(subject_id=self.subject.subject_id))
+
+    def test_invalid_quality_control(self):
+        """Raw quality control that does not validate has no status"""
+        self.assertIsNone(record_keys({"_id": "x", "quality_control": {"evaluations": "bad"}})["qc_status"])
+
+    def test_records_without_id(self):
+        """Records without an id are rejected rather than indexed under the same key"""
+        document = raw_metadata(1, "100", ["ecephys"], "ecephys", "2024-01-01T10:00:00Z")
+        del document["_id"]
+        with self.assertRaises(ValueError):
+            self.index.insert(document)
+        self.assertEqual(4, len(self.index))
+
+
+if __name__ == "__main__":
+    unittest.main()
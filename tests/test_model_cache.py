@@ -0,0 +1,83 @@
+""" tests for ModelCache """
+
+import json
+import unittest
+from pathlib import Path
+
+from pydantic import ValidationError
+
+from aind_data_schema.core.instrument import Instrument
+from aind_data_schema.core.rig import Rig
+from aind_data_schema.utils.model_cache import DEFAULT_CACHE, CacheStats, ModelCache, cached_model, frozen_class
+
+EXAMPLES_DIR = Path(__file__).parents[1] / "examples"
+
+
+class ModelCacheTests(unittest.TestCase):
+    """tests for ModelCache"""
+
+    @classmethod
+    def setUpClass(cls):
+        """Load example files"""
+        cls.rig_text = (EXAMPLES_DIR / "ephys_rig.json").read_text()
+        cls.rig = json.loads(cls.rig_text)
+        cls.instrument = json.loads((EXAMPLES_DIR / "exaspim_instrument.json").read_text())
+
+    def test_hits_and_misses(self):
+        """Equal content is validated once, whatever form it comes in"""
+        cache = ModelCache()
+        rig = cache.get(Rig, self.rig_text)
+        self.assertIsInstance(rig, Rig)
+        self.assertIs(rig, cache.get(Rig, self.rig))
+        self.assertIs(rig, cache.get(Rig, self.rig_text.encode()))
+        self.assertIs(rig, cache.get(Rig, EXAMPLES_DIR / "ephys_rig.json"))
+        self.assertEqual(CacheStats(hits=3, misses=1, evictions=0, size=1, maxsize=128), cache.stats())
+
+        key = ModelCache.key(Rig, self.rig)
+        self.assertEqual((self.rig["rig_id"], self.rig["modification_date"]), (key.id, key.modification_date))
+        self.assertIsNone(ModelCache.key(Rig.__base__, self.rig).id)
+
+        # same id and date but different content is a different entry
+        edited = cache.get(Rig, dict(self.rig, notes="edited"))
+        self.assertIsNot(rig, edited)
+        self.assertEqual(2, len(cache))
+        cache.clear()
+        self.assertEqual(CacheStats(0, 0, 0, 0, 128), cache.stats())
+
+    def test_eviction_and_invalidation(self):
+        """The least recently used model is evicted, and ids can be invalidated"""
+        cache = ModelCache(maxsize=2)
+        rig = cache.get(Rig, self.rig)
+        cache.get(Instrument, self.instrument)
+        cache.get(Rig, self.rig)
+        cache.get(Rig, dict(self.rig, notes="edited"))
+        self.assertEqual(1, cache.stats().evictions)
+        self.assertIs(rig, cache.get(Rig, self.rig))
+
+        self.assertEqual(0, cache.invalidate(Rig, "another rig"))
+        self.assertEqual(2, cache.invalidate(Rig, self.rig["rig_id"]))
+        cache.get(Rig, self.rig)
+        self.assertEqual(1, cache.invalidate(Rig))
+        self.assertEqual(0, len(cache))
+
+    def test_frozen(self):
+        """Frozen caches return models that cannot be assigned to"""
+        cache = ModelCache(frozen=True)
+        rig = cache.get(Rig, self.rig)
+        self.assertIsInstance(rig, Rig)
+        self.assertIs(frozen_class(Rig), type(rig))
+        self.assertEqual("rig.json", rig.default_filename())
+        with self.assertRaises(ValidationError):
+            rig.notes = "changed"
+        self.assertEqual(Rig.model_validate(self.rig).model_dump_json(), rig.model_dump_json())
+
+    def test_default_cache(self):
+        """A cache is shared by the whole process"""
+        DEFAULT_CACHE.clear()
+        self.assertIs(cached_model(Rig, self.rig), cached_model(Rig, self.rig_text))
+        self.assertEqual(1, DEFAULT_CACHE.stats().hits)
+        DEFAULT_CACHE.clear()
+
+
+if __name__ == "__main__":
+    unittest.main()
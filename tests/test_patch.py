@@ -0,0 +1,145 @@
+""" tests for metadata diffs and JSON patches """
+
+import copy
+import json
+import unittest
+from datetime import datetime, timezone
+from pathlib import Path
+
+from aind_data_schema.core.quality_control import QCStatus, QualityControl, Status
+from aind_data_schema.utils.patch import apply_patch, diff
+
+EXAMPLES_DIR = Path(__file__).parents[1] / "examples"
+
+
+class PatchTests(unittest.TestCase):
+    """tests for diff and apply_patch"""
+
+    @classmethod
+    def setUpClass(cls):
+        """Load example files"""
+        with open(EXAMPLES_DIR / "ephys_rig.json", "r") as f:
+            cls.rig = json.load(f)
+        with open(EXAMPLES_DIR / "multiplane_ophys_session.json", "r") as f:
+            cls.session = json.load(f)
+        with open(EXAMPLES_DIR / "quality_control.json", "r") as f:
+            cls.quality_control = QualityControl.model_validate_json(f.read())
+
+    def assertRoundTrip(self, old, new):
+        """diff then apply_patch reproduces the new document without touching the old one"""
+        before = copy.deepcopy(old)
+        patch = diff(old, new)
+        self.assertEqual(new, apply_patch(old, patch))
+        self.assertEqual(before, old)
+        return patch
+
+    def test_scalar_changes(self):
+        """Changed scalars are replaced in place"""
+        new = copy.deepcopy(self.rig)
+        new["modification_date"] = "2024-01-01"
+        new["cameras"][1]["camera"]["frame_rate"] = 60
+        patch = self.assertRoundTrip(self.rig, new)
+        self.assertEqual(
+            [
+                {"op": "replace", "path": "/modification_date", "value": "2024-01-01"},
+                {"op": "replace", "path": "/cameras/1/camera/frame_rate", "value": 60},
+            ],
+            patch,
+        )
+        self.assertEqual([], diff(self.rig, copy.deepcopy(self.rig)))
+        self.assertEqual([{"op": "replace", "path": "/a", "value": True}], diff({"a": 1}, {"a": True}))
+        self.assertEqual([{"op": "replace", "path": "", "value": [1]}], diff({"a": 1}, [1]))
+
+    def test_keys(self):
+        """Added and removed keys, including ones that need escaping"""
+        old = {"a/b": 1, "c~d": 2, "e": 3}
+        new = {"a/b": 2, "e": 3, "f": [1]}
+        patch = self.assertRoundTrip(old, new)
+        self.assertEqual(
+            [
+                {"op": "remove", "path": "/c~0d"},
+                {"op": "replace", "path": "/a~1b", "value": 2},
+                {"op": "add", "path": "/f", "value": [1]},
+            ],
+            patch,
+        )
+
+    def test_keyed_lists(self):
+        """Device lists are matched by name, so edits touch only the changed devices"""
+        new = copy.deepcopy(self.rig)
+        removed = new["stick_microscopes"].pop(1)
+        new["stick_microscopes"][2]["notes"] = "moved"
+        new["stick_microscopes"].insert(0, dict(removed, name="Stick_assembly_0"))
+        new["stick_microscopes"].append(dict(removed, name="Stick_assembly_5"))
+        patch = self.assertRoundTrip(self.rig, new)
+        self.assertEqual(
+            [
+                ("remove", "/stick_microscopes/1"),
+                ("add", "/stick_microscopes/2/notes"),
+                ("add", "/stick_microscopes/0"),
+                ("add", "/stick_microscopes/4"),
+            ],
+            [(op["op"], op["path"]) for op in patch],
+        )
+
+    def test_reordered_and_positional_lists(self):
+        """Reordered keyed lists and lists without keys fall back to positions"""
+        new = copy.deepcopy(self.rig)
+        new["cameras"].reverse()
+        self.assertRoundTrip(self.rig, new)
+
+        new = copy.deepcopy(self.session)
+        fovs = new["data_streams"][0]["ophys_fovs"]
+        del fovs[3]
+        fovs[0]["notes"] = "edited"
+        patch = self.assertRoundTrip(self.session, new)
+        self.assertEqual(2, len(patch))
+
+        self.assertRoundTrip([1, 2, 3], [1, 4])
+        self.assertRoundTrip([1], [1, 2, 3])
+        self.assertRoundTrip([{"name": "a"}, {"name": "a"}], [{"name": "a"}])
+
+    def test_models(self):
+        """Models are diffed by their json form and patched back into models"""
+        new = self.quality_control.model_copy(deep=True)
+        new.evaluations[0].metrics[0].status_history.append(
+            QCStatus(evaluator="Automated", status=Status.PASS, timestamp=datetime(2024, 1, 1, tzinfo=timezone.utc))
+        )
+        patch = diff(self.quality_control, new)
+        self.assertEqual(["add"], [op["op"] for op in patch])
+        self.assertEqual("/evaluations/0/metrics/0/status_history/1", patch[0]["path"])
+        self.assertEqual(new, apply_patch(self.quality_control, patch))
+
+    def test_operations(self):
+        """All RFC 6902 operations are supported"""
+        doc = {"a": {"b": [1, 2]}, "c": "x"}
+        patch = [
+            {"op": "test", "path": "/a/b/0", "value": 1},
+            {"op": "add", "path": "/a/b/-", "value": 3},
+            {"op": "move", "from": "/c", "path": "/d"},
+            {"op": "copy", "from": "/a/b", "path": "/e"},
+            {"op": "replace", "path": "/a/b/1", "value": 5},
+            {"op": "remove", "path": "/e/0"},
+        ]
+        self.assertEqual({"a": {"b": [1, 5, 3]}, "d": "x", "e": [2, 3]}, apply_patch(doc, patch))
+        self.assertEqual({"a": {"b": [1, 2]}, "c": "x"}, doc)
+        self.assertIs(doc, apply_patch(doc, [{"op": "add", "path": "/f", "value": 1}], in_place=True))
+        self.assertEqual({"a": {"b": [1, 2]}, "c": "x", "f": 1}, doc)
+        self.assertEqual([0], apply_patch(doc, [{"op": "replace", "path": "", "value": [0]}]))
+        self.assertEqual(2, apply_patch(doc, [{"op": "add", "path": "", "value": 2}]))
+
+        for operation in [
+            {"op": "test", "path": "/c", "value": "y"},
+            {"op": "remove", "path": "/missing"},
+            {"op": "remove", "path": "/a/b/2"},
+            {"op": "add", "path": "/a/b/x", "value": 0},
+            {"op": "add", "path": "/c/d", "value": 0},
+            {"op": "replace", "path": "c", "value": 0},
+            {"op": "rename", "path": "/c"},
+        ]:
+            with self.assertRaises(ValueError):
+                apply_patch(doc, [operation])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,113 @@
+""" tests for process_tracker """
+
+import os
+import time
+import unittest
+from datetime import timedelta
+from unittest.mock import patch
+
+from aind_data_schema_models.process_names import ProcessName
+from aind_data_schema_models.units import MemoryUnit
+
+from aind_data_schema.core.processing import DataProcess
+from aind_data_schema.utils.process_tracker import (
+    CPUProbe,
+    MemoryProbe,
+    ProcessTracker,
+    system_memory,
+    track_process,
+)
+
+FIELDS = {
+    "software_version": "0.1.0",
+    "input_location": "/data/ecephys_raw",
+    "output_location": "/results/ecephys_sorted",
+    "code_url": "https://github.com/AllenNeuralDynamics/spike-sorting",
+    "parameters": {"detect_threshold": 5},
+}
+
+
+def busy(seconds: float):
+    """Keep the CPU busy"""
+    end = time.monotonic() + seconds
+    while time.monotonic() < end:
+        pass
+
+
+class ProcessTrackerTests(unittest.TestCase):
+    """Tests for track_process"""
+
+    def test_track_process(self):
+        """Test that a finished step is described with its sampled usage"""
+        with track_process(
+            ProcessName.SPIKE_SORTING, interval=0.02, gpu_probe=lambda: 42.0, gpu="A100", **FIELDS
+        ) as tracker:
+            busy(0.2)
+            tracker.update(notes="sorted all probes")
+            self.assertIsNone(tracker.data_process)
+
+        data_process = tracker.data_process
+        self.assertIsInstance(data_process, DataProcess)
+        self.assertEqual(ProcessName.SPIKE_SORTING, data_process.name)
+        self.assertEqual("sorted all probes", data_process.notes)
+        self.assertEqual(FIELDS["parameters"], data_process.parameters.model_dump())
+        self.assertGreaterEqual(data_process.end_date_time - data_process.start_date_time, timedelta(seconds=0.2))
+
+        resources = data_process.resources
+        self.assertEqual(
+            ("A100", os.cpu_count(), MemoryUnit.GB), (resources.gpu, resources.cpu_cores, resources.ram_unit)
+        )
+        self.assertGreater(len(resources.cpu_usage), 2)
+        self.assertEqual(len(resources.cpu_usage), len(resources.gpu_usage))
+        self.assertEqual({42.0}, set(resources.gpu_usage.values))
+        # samples are taken on a grid of intervals from the start time
+        for timestamp in resources.cpu_usage.timestamps():
+            ticks = (timestamp - data_process.start_date_time) / timedelta(seconds=0.02)
+            self.assertAlmostEqual(round(ticks), ticks)
+        self.assertGreater(max(resources.cpu_usage.values), 0)
+        self.assertTrue(all(0 < value < 100 for value in resources.ram_usage.values))
+        self.assertIsNotNone(DataProcess.model_validate_json(data_process.model_dump_json()).resources.cpu_usage)
+
+    def test_short_step(self):
+        """Test that a step shorter than the interval gets one sample, at its end"""
+        with track_process(ProcessName.SPIKE_SORTING, interval=60, **FIELDS) as tracker:
+            pass
+        resources = tracker.data_process.resources
+        self.assertEqual(1, len(resources.cpu_usage))
+        self.assertEqual(tracker.end_date_time, resources.ram_usage.start_time)
+        self.assertIsNone(resources.gpu_usage)
+
+    def test_errors(self):
+        """Test that failed steps are not described, and that bad intervals are rejected"""
+        with self.assertRaises(RuntimeError):
+            with track_process(ProcessName.SPIKE_SORTING, interval=0.01, **FIELDS) as tracker:
+                raise RuntimeError("sorting failed")
+        self.assertIsNone(tracker.data_process)
+        self.assertFalse(tracker._thread.is_alive())
+
+        with self.assertRaises(ValueError):
+            ProcessTracker(ProcessName.SPIKE_SORTING, 0, {}, FIELDS)
+
+    def test_probes(self):
+        """Test the /proc probes, including processes and systems they cannot read"""
+        cpu = CPUProbe()
+        busy(0.05)
+        self.assertGreater(cpu(), 0)
+        self.assertLess(MemoryProbe(os.getpid())(), 100)
+        self.assertGreater(system_memory(), 0)
+
+        # no such process
+        self.assertIsNone(CPUProbe(2**31 - 1)())
+        self.assertIsNone(MemoryProbe(2**31 - 1)())
+
+        with patch("aind_data_schema.utils.process_tracker._read", return_value=None):
+            self.assertIsNone(system_memory())
+            self.assertIsNone(MemoryProbe()())
+            with track_process(ProcessName.SPIKE_SORTING, interval=60, **FIELDS) as tracker:
+                pass
+        resources = tracker.data_process.resources
+        self.assertEqual((None, None, None), (resources.cpu_usage, resources.ram, resources.ram_unit))
+
+
+if __name__ == "__main__":
+    unittest.main()
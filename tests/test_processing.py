@@ -5,12 +5,13 @@ import unittest
 
 import pydantic
 
-from datetime import datetime
+from datetime import datetime, timedelta, timezone
 
 from aind_data_schema.core.processing import (
     DataProcess,
     PipelineProcess,
     Processing,
+    ResourceSeries,
     ResourceUsage,
     ResourceTimestamped,
 )
@@ -78,6 +79,8 @@ class ProcessingTest(unittest.TestCase):
         )
 
         self.assertIsNotNone(resources)
+        legacy = ResourceUsage.model_validate({"os": "macOS Sonoma", "architecture": "x86_64", "cpu_usage": []})
+        self.assertEqual(0, len(legacy.cpu_usage))
 
         with self.assertRaises(pydantic.ValidationError):
             ResourceUsage()
@@ -120,6 +123,76 @@ class ProcessingTest(unittest.TestCase):
 
         self.assertTrue(expected_exception in repr(e.exception))
 
+    def test_resource_series(self):
+        """Test that usage series are stored compactly and read from the earlier list form"""
+        t0 = datetime(2024, 9, 13, tzinfo=timezone.utc)
+        samples = [{"timestamp": (t0 + timedelta(seconds=i)).isoformat(), "usage": 50.0 + i} for i in range(4)]
+        resources = ResourceUsage(
+            os=OperatingSystem.MACOS_SONOMA, architecture=CPUArchitecture.X86_64, cpu_usage=samples
+        )
+        series = resources.cpu_usage
+        self.assertEqual((t0, 1.0, None), (series.start_time, series.period, series.offsets))
+        self.assertEqual([50.0, 51.0, 52.0, 53.0], list(series.values))
+        self.assertEqual(
+            '{"start_time":"2024-09-13T00:00:00Z","period":1.0,"offsets":null,"values":[50.0,51.0,52.0,53.0]}',
+            series.model_dump_json(),
+        )
+        self.assertEqual(series, ResourceSeries.model_validate_json(series.model_dump_json()))
+        self.assertEqual(4, len(series))
+        self.assertEqual(samples[3]["timestamp"], series.to_list()[3].timestamp.isoformat())
+
+        # irregular samples keep their offsets, and are sorted
+        irregular = ResourceSeries.model_validate([samples[2], samples[0], samples[3]])
+        self.assertEqual([0, 2 * 10**9, 3 * 10**9], list(irregular.offsets))
+        self.assertEqual([t0 + timedelta(seconds=s) for s in (0, 2, 3)], irregular.timestamps())
+        self.assertIsNone(ResourceSeries.model_validate(samples[:1]).period)
+        # legacy lists whose samples share one timestamp keep zero offsets instead of a zero period
+        same_time = ResourceUsage(
+            os=OperatingSystem.MACOS_SONOMA,
+            architecture=CPUArchitecture.X86_64,
+            cpu_usage=[dict(samples[0], usage=usage) for usage in (0.5, 0.7, 0.6)],
+        ).cpu_usage
+        self.assertEqual((None, [0, 0, 0]), (same_time.period, list(same_time.offsets)))
+        self.assertEqual([t0] * 3, same_time.timestamps())
+        self.assertEqual(same_time, ResourceSeries.model_validate_json(same_time.model_dump_json()))
+        self.assertEqual(0, len(ResourceSeries.from_samples([], [])))
+
+        self.assertEqual(ResourceSeries.from_samples([], []), ResourceSeries.model_validate([]))
+        with self.assertRaises(pydantic.ValidationError):
+            ResourceSeries(start_time=t0, values=["high"])
+        with self.assertRaises(pydantic.ValidationError):
+            ResourceSeries(start_time=t0, period=1.0, offsets=[0, 1], values=[1, 2])
+        with self.assertRaises(pydantic.ValidationError):
+            ResourceSeries(start_time=t0, offsets=[0], values=[1, 2])
+        with self.assertRaises(pydantic.ValidationError):
+            ResourceSeries(start_time=t0, values=[1, 2])
+        with self.assertRaises(pydantic.ValidationError):
+            ResourceSeries(start_time=t0, period=0.0, values=[1, 2])
+        with self.assertRaises(ValueError):
+            ResourceSeries.from_samples([t0], [])
+
+    def test_downsample(self):
+        """Test downsampling a usage series"""
+        t0 = datetime(2024, 9, 13, tzinfo=timezone.utc)
+        series = ResourceSeries(start_time=t0, period=0.5, values=[1, 3, 2, 8, 4, 4])
+        self.assertEqual([2.0, 5.0, 4.0], list(series.downsample(1.0).values))
+        self.assertEqual(1.0, series.downsample(1.0).period)
+        self.assertEqual([1.0, 2.0, 4.0], list(series.downsample(1.0, how="min").values))
+        self.assertEqual([8.0, 4.0], list(series.downsample(2.0, how="max").values))
+        self.assertEqual([8.0], list(series.downsample(10.0, how="max").values))
+
+        # intervals without samples are skipped
+        gappy = ResourceSeries.from_samples([t0 + timedelta(seconds=s) for s in (5, 6, 30)], [1, 2, 3])
+        downsampled = gappy.downsample(10.0)
+        self.assertEqual(([1.5, 3.0], [0, 20 * 10**9]), (list(downsampled.values), list(downsampled.offsets)))
+        self.assertEqual(t0 + timedelta(seconds=5), downsampled.start_time)
+        self.assertEqual(0, len(ResourceSeries.from_samples([], []).downsample(1.0)))
+
+        with self.assertRaises(ValueError):
+            series.downsample(1.0, how="median")
+        with self.assertRaises(ValueError):
+            series.downsample(0)
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,92 @@
+""" tests for processing_append """
+
+import os
+import shutil
+import stat
+import tempfile
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from unittest.mock import patch
+
+import pydantic
+
+from aind_data_schema.core.processing import Processing
+from aind_data_schema.utils.processing_append import append_data_process, splice_data_process
+
+EXAMPLES_DIR = Path(__file__).parents[1] / "examples"
+
+
+class ProcessingAppendTests(unittest.TestCase):
+    """Tests for appending steps to processing.json"""
+
+    @classmethod
+    def setUpClass(cls):
+        """Load the processing example"""
+        cls.processing = Processing.model_validate_json((EXAMPLES_DIR / "processing.json").read_text())
+        cls.step = cls.processing.processing_pipeline.data_processes[0]
+
+    def setUp(self):
+        """Write the example to a temporary directory"""
+        self.directory = Path(tempfile.mkdtemp())
+        self.path = self.directory / "processing.json"
+        self.processing.write_standard_file(self.directory)
+
+    def tearDown(self):
+        """Remove the temporary directory"""
+        shutil.rmtree(self.directory)
+
+    def with_steps(self, steps: list) -> Processing:
+        """The example with other data processes"""
+        processing = self.processing.model_copy(deep=True)
+        processing.processing_pipeline.data_processes = steps
+        return processing
+
+    def test_append_data_process(self):
+        """Test that an appended step is written as if the whole document had been rewritten"""
+        os.chmod(self.path, 0o644)
+        step = self.step.model_copy(update={"notes": "rerun"})
+        self.assertEqual(step, append_data_process(self.path, step.model_dump(mode="json")))
+        expected = self.with_steps(self.processing.processing_pipeline.data_processes + [step])
+        self.assertEqual(expected.model_dump_json(indent=3), self.path.read_text())
+        self.assertEqual(0o644, stat.S_IMODE(os.stat(self.path).st_mode))
+
+        with self.assertRaises(pydantic.ValidationError):
+            append_data_process(self.path, {"name": "Other"})
+        self.assertEqual(expected.model_dump_json(indent=3), self.path.read_text())
+
+    def test_splice_data_process(self):
+        """Test splicing into empty lists and documents that are not indented"""
+        empty, one = self.with_steps([]), self.with_steps([self.step])
+        self.assertEqual(one.model_dump_json(indent=3), splice_data_process(empty.model_dump_json(indent=3), self.step))
+        self.assertEqual(one.model_dump_json(indent=2), splice_data_process(empty.model_dump_json(indent=2), self.step))
+        self.assertEqual(one.model_dump_json(), splice_data_process(empty.model_dump_json(), self.step))
+        two = self.with_steps([self.step, self.step])
+        self.assertEqual(two.model_dump_json(), splice_data_process(one.model_dump_json(), self.step))
+
+        with self.assertRaises(ValueError):
+            splice_data_process('{"processing_pipeline": {"data_processes": null}}', self.step)
+        with self.assertRaises(KeyError):
+            splice_data_process('{"processing_pipeline": {}}', self.step)
+
+    def test_concurrent_appends(self):
+        """Test that steps appended at the same time are all kept"""
+        steps = [self.step.model_copy(update={"notes": f"step {i}"}) for i in range(20)]
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            list(executor.map(lambda step: append_data_process(self.path, step), steps))
+        processing = Processing.model_validate_json(self.path.read_text())
+        data_processes = processing.processing_pipeline.data_processes
+        self.assertEqual(len(self.processing.processing_pipeline.data_processes) + 20, len(data_processes))
+        appended = data_processes[-20:]
+        self.assertEqual({step.notes for step in steps}, {step.notes for step in appended})
+
+    def test_replaced_while_waiting(self):
+        """Test that the file is read again if another append replaced it while waiting for the lock"""
+        with patch("aind_data_schema.utils.processing_append.os.path.samestat", side_effect=[False, True]):
+            append_data_process(self.path, self.step)
+        processing = Processing.model_validate_json(self.path.read_text())
+        self.assertEqual(self.step, processing.processing_pipeline.data_processes[-1])
+
+
+if __name__ == "__main__":
+    unittest.main()
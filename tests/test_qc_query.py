@@ -0,0 +1,110 @@
+""" tests for qc_query """
+
+import unittest
+from datetime import datetime, timezone
+
+from aind_data_schema_models.modalities import Modality
+
+from aind_data_schema.core.quality_control import QCEvaluation, QCMetric, QCStatus, QualityControl, Stage, Status
+from aind_data_schema.utils.qc_query import QCIndex
+
+
+def metric(name: str, status: Status, evaluator: str, day: int, **kwargs) -> QCMetric:
+    """Metric whose latest status was set on a day of March 2024"""
+    timestamp = datetime(2024, 3, day, tzinfo=timezone.utc)
+    return QCMetric(
+        name=name, value=1, status_history=[QCStatus(evaluator=evaluator, status=status, timestamp=timestamp)], **kwargs
+    )
+
+
+class QCQueryTests(unittest.TestCase):
+    """tests for QCIndex and QualityControl.query"""
+
+    def setUp(self):
+        """QC documents of two assets"""
+        self.drift = QCEvaluation(
+            name="Drift map",
+            modality=Modality.ECEPHYS,
+            stage=Stage.PROCESSING,
+            metrics=[
+                metric("Probe A", Status.FAIL, "Alice", 1),
+                metric("Probe B", Status.PASS, "Alice", 2),
+                metric("Probe C", Status.FAIL, "Bob", 3),
+            ],
+        )
+        self.video = QCEvaluation(
+            name="Frame count",
+            modality=Modality.BEHAVIOR_VIDEOS,
+            stage=Stage.RAW,
+            metrics=[metric("Camera", Status.FAIL, "Alice", 4)],
+        )
+        self.matching = QCEvaluation(
+            name="Unit matching",
+            modality=Modality.ECEPHYS,
+            stage=Stage.MULTI_ASSET,
+            metrics=[
+                metric("Units", Status.PASS, "Bob", 5, evaluated_assets=["asset_1", "asset_2"]),
+                metric("Waveforms", Status.PENDING, "Bob", 6, evaluated_assets=["asset_2"]),
+            ],
+        )
+        self.first = QualityControl(evaluations=[self.drift, self.video])
+        self.second = QualityControl(evaluations=[self.matching])
+
+    def test_query(self):
+        """Filters are combined, and accept enums, models or strings"""
+        names = [m.metric.name for m in self.first.query(status=Status.FAIL, modality=Modality.ECEPHYS)]
+        self.assertEqual(["Probe A", "Probe C"], names)
+        self.assertEqual(
+            ["Probe A"],
+            [m.metric.name for m in self.first.query(status="Fail", stage=Stage.PROCESSING, evaluator="Alice")],
+        )
+        self.assertEqual(["Camera"], [m.metric.name for m in self.first.query(modality="behavior-videos")])
+        self.assertEqual(4, len(self.first.query()))
+        self.assertEqual([], self.first.query(status=Status.PENDING))
+        match = self.first.query(evaluation="Frame count")[0]
+        self.assertEqual((None, self.video), (match.asset_name, match.evaluation))
+
+        # time ranges are on the latest status, from start inclusive to end exclusive
+        names = [
+            m.metric.name
+            for m in self.first.query(
+                start=datetime(2024, 3, 2, tzinfo=timezone.utc), end=datetime(2024, 3, 4, tzinfo=timezone.utc)
+            )
+        ]
+        self.assertEqual(["Probe B", "Probe C"], names)
+        self.assertEqual(2, len(self.first.query(status=Status.FAIL, start=datetime(2024, 3, 2, tzinfo=timezone.utc))))
+        self.assertEqual(1, len(self.first.query(end=datetime(2024, 3, 2, tzinfo=timezone.utc))))
+
+    def test_cached_index(self):
+        """The index of a document is reused until it is rebuilt"""
+        index = self.first.index()
+        self.assertIs(index, self.first.index())
+        self.assertIsNot(index, QualityControl(evaluations=[self.drift, self.video]).index())
+        self.assertEqual(1, len(self.first.model_copy(update={"evaluations": [self.video]}).query()))
+        self.assertIs(index, self.first.model_copy().index())
+        # the index is not part of the document
+        self.assertEqual(QualityControl(evaluations=self.first.evaluations), self.first)
+        self.assertNotIn("_query_index", self.first.model_dump_json())
+        self.drift.metrics[1].status_history.append(
+            QCStatus(evaluator="Bob", status=Status.FAIL, timestamp=datetime(2024, 3, 7, tzinfo=timezone.utc))
+        )
+        self.assertIsNot(index, self.first.index(rebuild=True))
+        self.assertEqual(3, len(self.first.query(status=Status.FAIL, modality=Modality.ECEPHYS)))
+
+    def test_multiple_documents(self):
+        """Indexes span documents, and map assets to the multi-asset evaluations that evaluated them"""
+        index = QCIndex({"asset_1": self.first, "asset_2": self.second})
+        self.assertEqual(6, len(index))
+        self.assertEqual(
+            [("asset_1", "Probe C"), ("asset_2", "Units"), ("asset_2", "Waveforms")],
+            [(m.asset_name, m.metric.name) for m in index.query(evaluator="Bob")],
+        )
+        self.assertEqual([("asset_2", self.matching)], index.evaluations_for_asset("asset_1"))
+        # the evaluation is found once, though both of its metrics list the asset
+        self.assertEqual([("asset_2", self.matching)], index.evaluations_for_asset("asset_2"))
+        self.assertEqual([], index.evaluations_for_asset("asset_3"))
+        self.assertEqual(6, len(QCIndex([self.first, self.second])))
+
+
+if __name__ == "__main__":
+    unittest.main()
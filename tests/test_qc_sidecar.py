@@ -0,0 +1,101 @@
+""" tests for qc_sidecar """
+
+import tempfile
+import unittest
+from datetime import datetime, timezone
+from pathlib import Path
+
+import numpy as np
+from aind_data_schema_models.modalities import Modality
+
+from aind_data_schema.core.quality_control import QCEvaluation, QCMetric, QCStatus, QualityControl, Stage, Status
+from aind_data_schema.utils.qc_sidecar import ArrayReference, is_array_reference, load_value, offload_arrays
+
+
+def metric(name, value) -> QCMetric:
+    """Passing metric"""
+    status = QCStatus(evaluator="Automated", status=Status.PASS, timestamp=datetime(2024, 1, 1, tzinfo=timezone.utc))
+    return QCMetric(name=name, value=value, status_history=[status])
+
+
+class QCSidecarTests(unittest.TestCase):
+    """tests for qc_sidecar"""
+
+    def setUp(self):
+        """QC with large and small values"""
+        self.noise = np.linspace(0, 1, 2000)
+        self.quality_control = QualityControl(
+            evaluations=[
+                QCEvaluation(
+                    name="Noise",
+                    modality=Modality.ECEPHYS,
+                    stage=Stage.PROCESSING,
+                    metrics=[
+                        metric("Noise per channel (uV)", self.noise),
+                        metric("Drift trace", [[1, 2]] * 600),
+                        metric("Mean", 0.5),
+                        metric("Short", [1, 2, 3]),
+                        metric("Ragged", [[1], [1, 2]]),
+                        metric("Labels", ["a"] * 1000),
+                        metric("Settings", {"threshold": 5}),
+                    ],
+                )
+            ]
+        )
+        self.directory = tempfile.TemporaryDirectory()
+        self.root = Path(self.directory.name)
+
+    def tearDown(self):
+        """Remove sidecar files"""
+        self.directory.cleanup()
+
+    def test_npy(self):
+        """Large numeric values are written to .npy files and memory-mapped back"""
+        offloaded = offload_arrays(self.quality_control, self.root)
+        self.assertIs(self.noise, self.quality_control.evaluations[0].metrics[0].value)
+        values = [m.value for m in offloaded.evaluations[0].metrics]
+        # values that are not offloaded are shared, not copied
+        self.assertIs(self.quality_control.evaluations[0].metrics[2].value, values[2])
+        self.assertIsNot(self.quality_control.evaluations[0].metrics[0], offloaded.evaluations[0].metrics[0])
+        self.assertEqual([True, True, False, False, False, False, False], [is_array_reference(v) for v in values])
+        self.assertEqual(
+            ["quality_control_0_0_Noise_per_channel_uV.npy", "quality_control_0_1_Drift_trace.npy"],
+            sorted(p.name for p in self.root.iterdir()),
+        )
+        self.assertEqual({"sidecar", "key", "checksum", "shape", "dtype"}, set(values[1]))
+        self.assertEqual(([600, 2], "int64"), (values[1]["shape"], values[1]["dtype"]))
+
+        # the json stays small, and references survive a round trip
+        text = offloaded.model_dump_json()
+        self.assertLess(len(text), 8000)
+        value = QualityControl.model_validate_json(text).evaluations[0].metrics[0].value
+        noise = load_value(value, self.root, verify=True)
+        self.assertIsInstance(noise, np.memmap)
+        np.testing.assert_array_equal(self.noise, noise)
+        self.assertNotIsInstance(load_value(ArrayReference(**value), self.root, mmap=False), np.memmap)
+        self.assertEqual(0.5, load_value(values[2], self.root))
+
+        np.save(self.root / value["sidecar"], self.noise[::-1])
+        with self.assertRaises(ValueError):
+            load_value(value, self.root, verify=True)
+
+    def test_npz(self):
+        """Large values can share one .npz file"""
+        offloaded = offload_arrays(self.quality_control, self.root / "qc", npz=True, prefix="probe_a")
+        self.assertEqual(["probe_a_metrics.npz"], [p.name for p in (self.root / "qc").iterdir()])
+        value = offloaded.evaluations[0].metrics[1].value
+        self.assertEqual("probe_a_0_1_Drift_trace", value["key"])
+        np.testing.assert_array_equal([[1, 2]] * 600, load_value(value, self.root / "qc"))
+
+        unchanged = offload_arrays(self.quality_control, self.root / "small", min_size=10**6, npz=True)
+        self.assertFalse(any(is_array_reference(m.value) for m in unchanged.evaluations[0].metrics))
+        self.assertEqual([], list((self.root / "small").iterdir()))
+
+    def test_is_array_reference(self):
+        """Only values shaped like a reference are references"""
+        self.assertFalse(is_array_reference({"sidecar": "a.npy", "checksum": "sha256:0"}))
+        self.assertFalse(is_array_reference([1, 2]))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,118 @@
+""" tests for qc_status_log """
+
+import shutil
+import tempfile
+import unittest
+from concurrent.futures import ThreadPoolExecutor, wait
+from datetime import datetime, timezone
+from pathlib import Path
+from unittest.mock import patch
+
+from aind_data_schema.core.quality_control import QCStatus, QualityControl, Status
+from aind_data_schema.utils.qc_status_log import (
+    append_status,
+    compact_status_log,
+    read_quality_control,
+    read_status_log,
+    status_log_path,
+)
+
+EXAMPLES_DIR = Path(__file__).parents[1] / "examples"
+
+
+def status(evaluator: str, day: int, value: Status = Status.PASS) -> QCStatus:
+    """Status set on a day of November 2022"""
+    return QCStatus(evaluator=evaluator, status=value, timestamp=datetime(2022, 11, day, tzinfo=timezone.utc))
+
+
+class QCStatusLogTests(unittest.TestCase):
+    """tests for qc_status_log"""
+
+    def setUp(self):
+        """Copy the example QC file"""
+        self.directory = tempfile.TemporaryDirectory()
+        self.qc_path = Path(self.directory.name) / "quality_control.json"
+        shutil.copy(EXAMPLES_DIR / "quality_control.json", self.qc_path)
+
+    def tearDown(self):
+        """Remove the copy"""
+        self.directory.cleanup()
+
+    def history(self, quality_control: QualityControl, metric: int = 0) -> list:
+        """Evaluators and statuses of a metric of the Drift map evaluation"""
+        return [(s.evaluator, s.status) for s in quality_control.evaluations[0].metrics[metric].status_history]
+
+    def test_read_with_log(self):
+        """Readers merge the log, in timestamp order, without changing the QC file"""
+        self.assertEqual(Path(self.directory.name) / "quality_control_status.jsonl", status_log_path(self.qc_path))
+        self.assertEqual([], read_status_log(self.qc_path))
+        self.assertEqual(0, compact_status_log(self.qc_path))
+        self.assertEqual([("", "Pending")], self.history(read_quality_control(self.qc_path)))
+
+        append_status(self.qc_path, "Drift map", "Probe A drift", status("Alice", 25, Status.FAIL))
+        append_status(self.qc_path, "Drift map", "Probe A drift", status("Bob", 23))
+        append_status(self.qc_path, "Drift map", "Probe A drift", status("Bob", 23))
+        append_status(self.qc_path, "Drift map", "Probe D drift", status("Bob", 23))
+        self.assertEqual(4, len(read_status_log(self.qc_path)))
+
+        with self.assertLogs(level="WARNING") as logs:
+            quality_control = read_quality_control(self.qc_path)
+        self.assertIn("no metric 'Probe D drift' in evaluation 'Drift map'", logs.output[0])
+        self.assertEqual([("", "Pending"), ("Bob", "Pass"), ("Alice", "Fail")], self.history(quality_control))
+        self.assertEqual(Status.FAIL, quality_control.status)
+        original = QualityControl.model_validate_json(self.qc_path.read_text())
+        self.assertEqual([("", "Pending")], self.history(original))
+
+    def test_compaction(self):
+        """Compaction merges the log into the QC file and keeps only unmatched updates"""
+        append_status(self.qc_path, "Drift map", "Probe B drift", status("Alice", 24))
+        append_status(self.qc_path, "Drift map", "Probe D drift", status("Bob", 23))
+        self.assertEqual(1, compact_status_log(self.qc_path))
+        self.assertEqual(["Probe D drift"], [entry.metric for entry in read_status_log(self.qc_path)])
+        compacted = QualityControl.model_validate_json(self.qc_path.read_text())
+        self.assertEqual([("", "Pending"), ("Alice", "Pass")], self.history(compacted, 1))
+
+        # merging the same update again, e.g. after a crash before the log was emptied, changes nothing
+        append_status(self.qc_path, "Drift map", "Probe B drift", status("Alice", 24))
+        self.assertEqual(1, compact_status_log(self.qc_path))
+        self.assertEqual(compacted, QualityControl.model_validate_json(self.qc_path.read_text()))
+
+    def test_read_during_compaction(self):
+        """A compaction that starts while a reader has read the QC file waits until the reader has read the log"""
+        append_status(self.qc_path, "Drift map", "Probe B drift", status("Alice", 24))
+        read_text = Path.read_text
+        pending = []
+
+        def compact_after_first_read(path, *args, **kwargs):
+            """Read a file, then start a compaction the first time"""
+            text = read_text(path, *args, **kwargs)
+            if not pending:
+                pending.append(executor.submit(compact_status_log, self.qc_path))
+                # without the reader's lock, the compaction would finish here
+                wait(pending, timeout=0.5)
+            return text
+
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            with patch.object(Path, "read_text", compact_after_first_read):
+                quality_control = read_quality_control(self.qc_path)
+            self.assertEqual(1, pending[0].result())
+        self.assertEqual([("", "Pending"), ("Alice", "Pass")], self.history(quality_control, 1))
+        self.assertEqual(quality_control, read_quality_control(self.qc_path))
+
+    def test_concurrent_appends(self):
+        """Concurrent appends are all kept"""
+
+        def append(day: int):
+            """Append one update"""
+            append_status(self.qc_path, "Probes present", "ProbeA_success", status(f"job {day}", day))
+
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            list(executor.map(append, range(1, 29)))
+        self.assertEqual(28, compact_status_log(self.qc_path))
+        history = read_quality_control(self.qc_path).evaluations[2].metrics[0].status_history
+        self.assertEqual(29, len(history))
+        self.assertEqual(sorted(s.timestamp for s in history), [s.timestamp for s in history])
+
+
+if __name__ == "__main__":
+    unittest.main()
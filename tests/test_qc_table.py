@@ -0,0 +1,113 @@
+""" tests for qc_table """
+
+import json
+import unittest
+from datetime import datetime, timezone
+from pathlib import Path
+
+import pyarrow as pa
+from aind_data_schema_models.modalities import Modality
+
+from aind_data_schema.core.metadata import Metadata
+from aind_data_schema.core.quality_control import QCEvaluation, QCMetric, QCStatus, QualityControl, Stage, Status
+from aind_data_schema.core.subject import Subject
+from aind_data_schema.utils.qc_table import failure_rates, qc_metric_table
+
+EXAMPLES_DIR = Path(__file__).parents[1] / "examples"
+
+
+def metric(name: str, evaluator: str, month: int, status: Status, **kwargs) -> QCMetric:
+    """Metric whose latest status was set in a month of 2024"""
+    timestamp = datetime(2024, month, 15, tzinfo=timezone.utc)
+    history = [
+        QCStatus(evaluator="Automated", status=Status.PENDING, timestamp=datetime(2024, 1, 1, tzinfo=timezone.utc))
+    ]
+    history.append(QCStatus(evaluator=evaluator, status=status, timestamp=timestamp))
+    return QCMetric(name=name, value=1, status_history=history, **kwargs)
+
+
+class QCTableTests(unittest.TestCase):
+    """tests for qc_table"""
+
+    @classmethod
+    def setUpClass(cls):
+        """Build QC for two assets"""
+        cls.first = QualityControl(
+            evaluations=[
+                QCEvaluation(
+                    name="Drift map",
+                    modality=Modality.ECEPHYS,
+                    stage=Stage.PROCESSING,
+                    metrics=[metric("Probe A", "Alice", 2, Status.FAIL), metric("Probe B", "Bob", 2, Status.PASS)],
+                ),
+                QCEvaluation(
+                    name="Matching",
+                    modality=Modality.ECEPHYS,
+                    stage=Stage.MULTI_ASSET,
+                    metrics=[metric("Units", "Alice", 3, Status.PASS, evaluated_assets=["a", "b"])],
+                ),
+            ]
+        )
+        cls.second = QualityControl(
+            evaluations=[
+                QCEvaluation(
+                    name="Frame count",
+                    modality=Modality.BEHAVIOR_VIDEOS,
+                    stage=Stage.RAW,
+                    metrics=[metric("Camera", "Alice", 3, Status.FAIL)],
+                )
+            ]
+        )
+        subject = Subject.model_validate_json((EXAMPLES_DIR / "subject.json").read_text())
+        cls.records = [
+            Metadata(name="asset_1", location="s3://bucket/asset_1", subject=subject, quality_control=cls.first),
+            {"name": "asset_2", "quality_control": json.loads(cls.second.model_dump_json())},
+            {"name": "asset_3", "quality_control": None},
+        ]
+
+    def test_qc_metric_table(self):
+        """Each metric becomes a row with its latest status, and strings are dictionary encoded"""
+        table = qc_metric_table(self.records)
+        self.assertEqual(4, table.num_rows)
+        self.assertTrue(pa.types.is_dictionary(table.schema.field("evaluator").type))
+        self.assertEqual(["Alice", "Bob"], table["evaluator"].chunk(0).dictionary.to_pylist())
+        self.assertEqual(
+            {
+                "asset_name": "asset_1",
+                "evaluation": "Matching",
+                "modality": "ecephys",
+                "stage": "Multi-asset",
+                "metric": "Units",
+                "status": "Pass",
+                "evaluator": "Alice",
+                "timestamp": datetime(2024, 3, 15, tzinfo=timezone.utc),
+                "evaluated_assets": ["a", "b"],
+            },
+            table.slice(2, 1).to_pylist()[0],
+        )
+        self.assertEqual("asset_2", table["asset_name"][3].as_py())
+        self.assertEqual([None], qc_metric_table([self.first])["asset_name"].unique().to_pylist())
+        self.assertEqual(0, qc_metric_table([]).num_rows)
+
+    def test_failure_rates(self):
+        """Failure rates are aggregated by group, and over time"""
+        table = pa.concat_tables([qc_metric_table(self.records[:1]), qc_metric_table(self.records[1:])])
+        self.assertEqual(
+            [
+                {"modality": "behavior-videos", "stage": "Raw data", "metrics": 1, "failed": 1, "failure_rate": 1.0},
+                {"modality": "ecephys", "stage": "Multi-asset", "metrics": 1, "failed": 0, "failure_rate": 0.0},
+                {"modality": "ecephys", "stage": "Processing", "metrics": 2, "failed": 1, "failure_rate": 0.5},
+            ],
+            failure_rates(table).to_pylist(),
+        )
+        by_evaluator = failure_rates(table, by=("evaluator",), period="month").to_pylist()
+        self.assertEqual(
+            [("Alice", 2, 1.0), ("Alice", 3, 0.5), ("Bob", 2, 0.0)],
+            [(row["evaluator"], row["period"].month, row["failure_rate"]) for row in by_evaluator],
+        )
+        with self.assertRaises(ValueError):
+            failure_rates(table, period="hour")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,7 +1,7 @@
 """test quality metrics """
 
 import unittest
-from datetime import datetime
+from datetime import datetime, timezone
 
 from aind_data_schema_models.modalities import Modality
 from pydantic import ValidationError
@@ -367,6 +367,147 @@ class QualityControlTests(unittest.TestCase):
 
         self.assertTrue("is in a multi-asset QCEvaluation and must have evaluated_assets" in repr(context.exception))
 
+    def test_status_counts(self):
+        """Statuses and counts follow changes to statuses, metrics and evaluations"""
+        t0 = datetime.fromisoformat("2020-10-10 00:00:00+00:00")
+
+        def metric(name, status):
+            """Metric with one status"""
+            return QCMetric(name=name, value=1, status_history=[QCStatus(evaluator="Bob", timestamp=t0, status=status)])
+
+        evaluation = QCEvaluation(
+            name="Drift map",
+            modality=Modality.ECEPHYS,
+            stage=Stage.PROCESSING,
+            metrics=[metric("a", Status.PASS), metric("b", Status.PASS)],
+        )
+        qc = QualityControl(evaluations=[evaluation])
+        self.assertEqual(Status.PASS, qc.status)
+        self.assertEqual({Status.PASS: 2, Status.FAIL: 0, Status.PENDING: 0}, evaluation.status_counts())
+
+        # status history appended in place
+        evaluation.metrics[0].status_history.append(QCStatus(evaluator="Bob", timestamp=t0, status=Status.FAIL))
+        self.assertEqual(Status.FAIL, qc.status)
+
+        # latest status edited
+        evaluation.metrics[0].status.status = Status.PENDING
+        self.assertEqual(Status.PENDING, qc.status)
+
+        # metric lists assigned, then changed in place
+        evaluation.metrics = [metric("a", Status.PASS)]
+        self.assertEqual(Status.PASS, qc.status)
+        evaluation.metrics += [metric("c", Status.FAIL)]
+        self.assertEqual(Status.FAIL, qc.status)
+        evaluation.allow_failed_metrics = True
+        self.assertEqual(Status.PASS, qc.status)
+        self.assertEqual(["c"], [m.name for m in evaluation.failed_metrics])
+
+        # copies with other metrics, changed in place
+        copied = evaluation.model_copy(update={"metrics": [metric("d", Status.PASS)], "allow_failed_metrics": False})
+        self.assertEqual(Status.PASS, copied.status)
+        copied.metrics.append(metric("e", Status.FAIL))
+        self.assertEqual(Status.FAIL, copied.status)
+
+        # evaluations added, and copies with other evaluations
+        qc.evaluations.append(evaluation.model_copy(update={"allow_failed_metrics": False}))
+        self.assertEqual(Status.FAIL, qc.status)
+        self.assertEqual(Status.PASS, qc.model_copy(update={"evaluations": [evaluation]}).status)
+        self.assertEqual(
+            {"Drift map": {Status.PASS: 2, Status.FAIL: 2, Status.PENDING: 0}}, qc.evaluation_status_counts()
+        )
+
+        self.assertEqual(qc, QualityControl.model_validate_json(qc.model_dump_json()))
+
+    def test_merge(self):
+        """Partial documents are merged by evaluation and metric, with histories in timestamp order"""
+
+        def status(day, value=Status.PASS, evaluator="Automated"):
+            """Status on a day of October 2020"""
+            return QCStatus(evaluator=evaluator, status=value, timestamp=datetime(2020, 10, day, tzinfo=timezone.utc))
+
+        def evaluation(stage, metrics, **kwargs):
+            """Drift map evaluation"""
+            return QCEvaluation(name="Drift map", modality=Modality.ECEPHYS, stage=stage, metrics=metrics, **kwargs)
+
+        probe_a = QualityControl(
+            evaluations=[
+                evaluation(
+                    Stage.PROCESSING,
+                    [QCMetric(name="Probe A", value=1, status_history=[status(1), status(3, Status.FAIL, "Bob")])],
+                    description="Drift of each probe",
+                )
+            ],
+            notes="probe A job",
+        )
+        probe_b = QualityControl(
+            evaluations=[
+                evaluation(
+                    Stage.PROCESSING,
+                    [
+                        QCMetric(name="Probe A", value=2, status_history=[status(1), status(2)]),
+                        QCMetric(name="Probe B", value=3, status_history=[status(1)]),
+                    ],
+                ),
+                evaluation(Stage.RAW, [QCMetric(name="Probe B", value=4, status_history=[status(1)])]),
+            ],
+            notes="probe B job",
+        )
+
+        merged = QualityControl.merge(probe_a, probe_b, probe_a)
+        self.assertEqual([Stage.PROCESSING, Stage.RAW], [e.stage for e in merged.evaluations])
+        processing = merged.evaluations[0]
+        self.assertEqual("Drift of each probe", processing.description)
+        self.assertEqual(["Probe A", "Probe B"], [m.name for m in processing.metrics])
+        self.assertEqual(1, processing.metrics[0].value)
+        self.assertEqual([1, 2, 3], [s.timestamp.day for s in processing.metrics[0].status_history])
+        self.assertEqual(Status.FAIL, merged.status)
+        self.assertEqual("probe A job\nprobe B job", merged.notes)
+        self.assertIsNot(probe_a.evaluations[0].metrics[0].status_history[0], processing.metrics[0].status_history[0])
+        self.assertEqual(QualityControl(evaluations=[]), QualityControl.merge())
+
+        # defaults a document never set do not override another document
+        lenient = QualityControl(
+            evaluations=[
+                evaluation(
+                    Stage.RAW,
+                    [QCMetric(name="Probe A", value=1, status_history=[status(1, Status.FAIL)])],
+                    allow_failed_metrics=True,
+                )
+            ]
+        )
+        strict = QualityControl(
+            evaluations=[evaluation(Stage.RAW, [QCMetric(name="Probe B", value=2, status_history=[status(1)])])]
+        )
+        self.assertEqual(Status.PASS, QualityControl.merge(lenient, strict).status)
+        self.assertEqual(Status.PASS, QualityControl.merge(strict, lenient).status)
+
+        # hundreds of partial documents, one per channel
+        channels = [
+            QualityControl(
+                evaluations=[
+                    evaluation(Stage.RAW, [QCMetric(name=f"Channel {c}", value=c, status_history=[status(1)])])
+                ]
+            )
+            for c in range(300)
+        ]
+        merged = QualityControl.merge(*channels)
+        self.assertEqual(1, len(merged.evaluations))
+        self.assertEqual(300, len(merged.evaluations[0].metrics))
+
+        # the combined result is validated
+        multi_asset = QCEvaluation(
+            name="Drift map",
+            modality=Modality.ECEPHYS,
+            stage=Stage.MULTI_ASSET,
+            metrics=[QCMetric(name="Probe A", value=1, status_history=[status(1)], evaluated_assets=["a"])],
+        )
+        invalid = QCMetric.model_construct(name="Probe B", value=1, status_history=[status(1)])
+        with self.assertRaises(ValidationError):
+            QualityControl.merge(
+                QualityControl(evaluations=[multi_asset]),
+                QualityControl.model_construct(evaluations=[multi_asset.model_copy(update={"metrics": [invalid]})]),
+            )
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,104 @@
+""" tests for RigHistory """
+
+import json
+import unittest
+from datetime import date, datetime, timezone
+from pathlib import Path
+
+from aind_data_schema.core.rig import Rig
+from aind_data_schema.core.session import Session
+from aind_data_schema.utils.delta_archive import DeltaArchive
+from aind_data_schema.utils.rig_history import RigHistory, RigKey, parse_rig_id
+
+EXAMPLES_DIR = Path(__file__).parents[1] / "examples"
+EPHYS1 = RigKey("323", "EPHYS1")
+
+
+def rig_version(rig: dict, modified: str, **changes) -> dict:
+    """Copy of a rig json modified on a YYYYMMDD date"""
+    rig = dict(rig, **changes)
+    rig["rig_id"] = f"323_EPHYS1_{modified}"
+    rig["modification_date"] = f"{modified[:4]}-{modified[4:6]}-{modified[6:]}"
+    return rig
+
+
+class RigHistoryTests(unittest.TestCase):
+    """tests for RigHistory"""
+
+    @classmethod
+    def setUpClass(cls):
+        """Load example files"""
+        cls.rig = json.loads((EXAMPLES_DIR / "ephys_rig.json").read_text())
+        cls.session = Session.model_validate_json((EXAMPLES_DIR / "ephys_session.json").read_text())
+
+    def test_parse_rig_id(self):
+        """rig_ids are split into room, apparatus and date"""
+        self.assertEqual((EPHYS1, date(2023, 10, 3)), parse_rig_id("323_EPHYS1_20231003"))
+        with self.assertRaises(ValueError):
+            parse_rig_id("323-EPHYS1")
+
+    def test_point_in_time_lookup(self):
+        """The version in effect is the latest one modified on or before the date"""
+        history = RigHistory(DeltaArchive(Rig, snapshot_interval=2))
+        history.add(rig_version(self.rig, "20230601"))
+        history.add(rig_version(self.rig, "20230101"))
+        history.add_many([Rig.model_validate(rig_version(self.rig, "20230401", notes="new probe"))])
+        history.add(rig_version(self.rig, "20230801", notes="new camera"))
+        history.add(rig_version(self.rig, "20231003"))
+
+        self.assertEqual(5, len(history))
+        self.assertEqual([EPHYS1], history.rigs())
+        self.assertEqual(
+            [
+                "323_EPHYS1_20230101",
+                "323_EPHYS1_20230401",
+                "323_EPHYS1_20230601",
+                "323_EPHYS1_20230801",
+                "323_EPHYS1_20231003",
+            ],
+            history.versions(EPHYS1),
+        )
+        self.assertIsNone(history.at(EPHYS1, date(2022, 12, 31)))
+        self.assertIsNone(history.at(RigKey("323", "EPHYS2"), date(2023, 5, 1)))
+        rig = history.at(EPHYS1, datetime(2023, 4, 1, 9, tzinfo=timezone.utc))
+        self.assertEqual("323_EPHYS1_20230401", rig.rig_id)
+        self.assertEqual("new probe", rig.notes)
+        self.assertIs(rig, history.get("323_EPHYS1_20230401"))
+        self.assertEqual("new camera", history.at(EPHYS1, date(2023, 9, 1)).notes)
+        self.assertEqual(self.rig, json.loads(history.at(EPHYS1, date(2024, 1, 1)).model_dump_json()))
+        with self.assertRaises(KeyError):
+            history.get("323_EPHYS1_20230501")
+        with self.assertRaises(KeyError):
+            history.get("323_EPHYS1_20240101")
+
+        # versions after the first full copy are stored as patches
+        deltas = [history.archive.delta(version.fingerprint) for version in history._versions[EPHYS1]]
+        self.assertEqual([True, False, True, False, True], [delta is None for delta in deltas])
+        self.assertEqual([{"op": "replace", "path": "/notes", "value": "new camera"}], deltas[3].patch[-1:])
+
+        # replacing a version drops it from the cache, and its content from the archive
+        history.add(rig_version(self.rig, "20230401", notes="fixed probe"))
+        self.assertEqual(5, len(history))
+        self.assertEqual(5, len(history.archive))
+        self.assertEqual("fixed probe", history.get("323_EPHYS1_20230401").notes)
+        self.assertEqual("new camera", history.get("323_EPHYS1_20230801").notes)
+
+    def test_backfill(self):
+        """Sessions are checked against the rig in effect when they started"""
+        history = RigHistory()
+        history.add_many([rig_version(self.rig, "20230101"), rig_version(self.rig, "20230401")])
+        matching = self.session.model_copy(update={"rig_id": "323_EPHYS1_20230401"})
+        stale = self.session.model_copy(update={"rig_id": "323_EPHYS1_20230101"})
+        early = self.session.model_copy(update={"session_start_time": datetime(2022, 1, 1, tzinfo=timezone.utc)})
+
+        results = list(history.backfill([matching, stale, early]))
+        self.assertEqual(("323_EPHYS1_20230401", []), (results[0].rig.rig_id, results[0].errors))
+        self.assertIs(stale, results[1].session)
+        self.assertEqual("323_EPHYS1_20230401", results[1].rig.rig_id)
+        self.assertTrue(any("Rig ID" in error for error in results[1].errors))
+        self.assertIsNone(results[2].rig)
+        self.assertEqual(["No version of rig 323_EPHYS1_20231003 before the session"], results[2].errors)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,130 @@
+""" tests for MetadataStore """
+
+import json
+import tempfile
+import unittest
+from datetime import datetime, timezone
+from pathlib import Path
+
+from aind_data_schema_models.modalities import Modality
+
+from aind_data_schema.core.metadata import Metadata, MetadataStatus
+from aind_data_schema.core.session import Session
+from aind_data_schema.core.subject import Subject
+from aind_data_schema.store import MetadataStore
+from aind_data_schema.utils.interning import StringInterner
+from tests.documents import raw_metadata
+
+EXAMPLES_DIR = Path(__file__).parents[1] / "examples"
+
+
+class MetadataStoreTests(unittest.TestCase):
+    """tests for MetadataStore"""
+
+    @classmethod
+    def setUpClass(cls):
+        """Load example files"""
+        with open(EXAMPLES_DIR / "subject.json", "r") as f:
+            cls.subject = Subject.model_validate_json(f.read())
+        with open(EXAMPLES_DIR / "ephys_session.json", "r") as f:
+            cls.session = json.load(f)
+
+    def setUp(self):
+        """Store a few raw documents"""
+        self.docs = [
+            raw_metadata(1, "100", ["ecephys", "behavior-videos"], "ecephys", "2024-01-01T10:00:00Z"),
+            raw_metadata(2, "100", ["behavior"], "ecephys", "2024-02-01T10:00:00Z"),
+            raw_metadata(3, "200", ["ecephys"], "ecephys", "2024-03-01T12:00:00+02:00", metadata_status="Invalid"),
+        ]
+        self.ids = [doc["_id"] for doc in self.docs]
+        self.store = MetadataStore()
+        self.assertEqual(3, self.store.upsert(self.docs, batch_size=2))
+
+    def tearDown(self):
+        """Close the store"""
+        self.store.close()
+
+    def test_queries(self):
+        """Indexed columns, modality and time ranges can be combined"""
+        self.assertEqual(self.ids, self.store.ids())
+        self.assertEqual(self.ids[:2], self.store.ids(subject_id="100"))
+        self.assertEqual([self.ids[0], self.ids[2]], self.store.ids(modality=Modality.ECEPHYS))
+        self.assertEqual([self.ids[0]], self.store.ids(modality="ecephys", subject_id="100"))
+        self.assertEqual([self.ids[2]], self.store.ids(metadata_status=MetadataStatus.INVALID))
+        self.assertEqual(self.ids, self.store.ids(subject_id=None))
+        self.assertEqual(0, self.store.count(name="missing"))
+        self.assertEqual(1, self.store.count(name="asset_2"))
+        self.assertEqual(1, self.store.count(modality="ecephys", subject_id="100"))
+        with self.assertRaises(ValueError):
+            self.store.ids(location="s3://bucket")
+
+        feb = datetime(2024, 2, 1, 10, tzinfo=timezone.utc)
+        self.assertEqual(self.ids[1:], self.store.ids(created_after=feb))
+        self.assertEqual(self.ids[:1], self.store.ids(created_before=feb))
+        self.assertEqual(2, self.store.count(created_after=feb, created_before=datetime(2030, 1, 1)))
+        # naive times are taken to be UTC, and 12:00+02:00 is stored as 10:00 UTC
+        self.assertEqual(self.ids[2:], self.store.ids(created_after=datetime(2024, 3, 1, 10)))
+
+    def test_raw_documents(self):
+        """Raw documents round trip when validation is skipped"""
+        self.assertEqual(self.docs[1:2], list(self.store.query(subject_id="100", modality="behavior", validate=False)))
+        self.assertEqual(self.docs[0], self.store.get(self.ids[0], validate=False))
+        self.assertIsNone(self.store.get("missing"))
+
+    def test_upsert_replaces(self):
+        """Upserting an existing id replaces the record and its modalities"""
+        self.store.upsert([raw_metadata(1, "300", ["pophys"], "ecephys", "2024-01-01T10:00:00Z")])
+        self.assertEqual(3, self.store.count())
+        self.assertEqual([self.ids[0]], self.store.ids(subject_id="300"))
+        self.assertEqual([self.ids[2]], self.store.ids(modality="ecephys"))
+
+    def test_delete(self):
+        """Deleted records no longer match any query"""
+        self.store.delete(self.ids[0])
+        self.assertEqual(self.ids[1:], self.store.ids())
+        self.assertEqual([], self.store.ids(modality="behavior-videos"))
+
+    def test_models(self):
+        """Metadata models are stored and validated back lazily"""
+        metadata = Metadata(
+            name="ecephys_632269_2023-10-10_10-10-10",
+            location="s3://bucket/ecephys_632269_2023-10-10_10-10-10",
+            subject=self.subject,
+        )
+        self.store.upsert([metadata])
+        records = self.store.query(subject_id=self.subject.subject_id)
+        self.assertEqual(metadata, next(records))
+        self.assertEqual(metadata, self.store.get(metadata.id))
+
+        interner = StringInterner()
+        (loaded,) = self.store.query(name=metadata.name, interner=interner)
+        self.assertEqual(metadata, loaded)
+        self.assertGreater(interner.strings_seen, 0)
+
+    def test_core_files(self):
+        """Core files are stored per type, keyed by the id of the record they belong to"""
+        self.assertEqual(1, self.store.upsert_core_files([(self.ids[0], self.session)], Session))
+        self.assertEqual([self.ids[0]], self.store.ids(Session, subject_id=self.session["subject_id"]))
+        self.assertEqual([self.ids[0]], self.store.ids(Session, schema_version=self.session["schema_version"]))
+        self.assertEqual([], self.store.ids(Subject))
+        session = self.store.get(self.ids[0], Session)
+        self.assertEqual(Session.model_validate(self.session), session)
+
+        self.store.upsert_core_files([(self.ids[1], self.subject)], Subject)
+        self.assertEqual([self.ids[1]], self.store.ids(Subject, subject_id=self.subject.subject_id))
+        self.store.delete(self.ids[1], Subject)
+        self.assertEqual(0, self.store.count(Subject))
+        self.assertEqual(3, self.store.count())
+
+    def test_file_database(self):
+        """A store on disk keeps its records after being reopened"""
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / "metadata.db"
+            with MetadataStore(path) as store:
+                store.upsert(self.docs)
+            with MetadataStore(path) as store:
+                self.assertEqual(self.ids, store.ids())
+
+
+if __name__ == "__main__":
+    unittest.main()
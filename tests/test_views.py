@@ -0,0 +1,121 @@
+""" tests for read-only model views """
+
+import json
+import unittest
+from datetime import datetime, timezone
+from decimal import Decimal
+from pathlib import Path
+from typing import Optional, Union
+from uuid import UUID
+
+from pydantic import create_model
+
+from aind_data_schema.components.devices import Disc, HarpDevice, NeuropixelsBasestation
+from aind_data_schema.core.metadata import Metadata, MetadataStatus
+from aind_data_schema.core.processing import Processing
+from aind_data_schema.core.rig import Rig
+from aind_data_schema.core.session import Session
+from aind_data_schema.utils.views import ModelView, view, view_class
+
+EXAMPLES_DIR = Path(__file__).parents[1] / "examples"
+
+
+class ModelViewTests(unittest.TestCase):
+    """tests for ModelView"""
+
+    @classmethod
+    def setUpClass(cls):
+        """Load example json files"""
+        with open(EXAMPLES_DIR / "ephys_session.json", "r") as f:
+            cls.session = json.load(f)
+        with open(EXAMPLES_DIR / "ephys_rig.json", "r") as f:
+            cls.rig = json.load(f)
+        with open(EXAMPLES_DIR / "processing.json", "r") as f:
+            cls.processing_json = f.read()
+
+    def test_metadata_attribute_paths(self):
+        """Nested attribute paths match the validated model"""
+        doc = {
+            "_id": "4e4f4c1a-2c6b-4b0b-9c42-3c3b7a3f5d2a",
+            "name": "ecephys_625100_2023-04-25_02-35-00",
+            "location": "s3://bucket/asset",
+            "session": self.session,
+            "rig": self.rig,
+            "subject": None,
+        }
+        meta = view(Metadata, doc)
+        session = Session.model_validate(self.session)
+
+        self.assertEqual(UUID("4e4f4c1a-2c6b-4b0b-9c42-3c3b7a3f5d2a"), meta.id)
+        self.assertEqual(session.data_streams[0].daq_names, meta.session.data_streams[0].daq_names)
+        self.assertEqual(session.session_start_time, meta.session.session_start_time)
+        self.assertEqual(session.data_streams[0].stream_modalities, meta.session.data_streams[0].stream_modalities)
+        self.assertEqual(MetadataStatus.UNKNOWN, meta.metadata_status)
+        self.assertIsNone(meta.subject)
+        self.assertEqual({}, meta.external_links)
+        links = view(Metadata, dict(doc, external_links={"Code Ocean": ["abc"]})).external_links
+        self.assertEqual({"Code Ocean": ["abc"]}, links)
+        self.assertIs(meta.session, meta.session)
+        self.assertEqual(session, meta.session.to_model())
+        self.assertEqual("Session", meta.session.model_class.__name__)
+
+    def test_discriminated_unions(self):
+        """Union members are picked by discriminator value"""
+        rig = view(Rig, self.rig)
+        self.assertIs(Disc, rig.mouse_platform.model_class)
+        self.assertEqual([NeuropixelsBasestation, HarpDevice], [daq.model_class for daq in rig.daqs])
+        self.assertIsInstance(rig.mouse_platform.radius, Decimal)
+        self.assertEqual("centimeter", rig.mouse_platform.radius_unit)
+        self.assertEqual(Rig.model_validate(self.rig).daqs[0].ports, rig.daqs[0].to_model().ports)
+
+    def test_json_input_and_generic_fields(self):
+        """Views accept JSON text and expose extra fields of generic models"""
+        processing = view(Processing, self.processing_json)
+        process = processing.processing_pipeline.data_processes[0]
+        self.assertEqual(
+            Processing.model_validate_json(self.processing_json).processing_pipeline.data_processes[0].parameters.size,
+            process.parameters.size,
+        )
+        self.assertIsInstance(process.start_date_time, datetime)
+        with self.assertRaises(AttributeError):
+            process.parameters.not_a_field
+
+    def test_read_only_and_errors(self):
+        """Assignment and unknown attributes raise AttributeError"""
+        session = view(Session, self.session)
+        with self.assertRaises(AttributeError):
+            session.rig_id = "other"
+        with self.assertRaises(AttributeError):
+            session.not_a_field
+        self.assertIn("data_streams", dir(session))
+        self.assertIn("rig_id", repr(session))
+        self.assertIs(self.session, session.raw)
+        self.assertIs(view_class(Session), type(session))
+        self.assertTrue(issubclass(view_class(Session), ModelView))
+
+    def test_scalar_unions(self):
+        """Unions of scalar types are coerced with a TypeAdapter"""
+        model_class = create_model(
+            "TempModel", value=(Union[int, str], ...), notes=(Optional[str], None), count=(Optional[int], None)
+        )
+        temp = view(model_class, {"value": 5, "notes": "some notes", "count": "3"})
+        self.assertEqual(5, temp.value)
+        self.assertEqual("some notes", temp.notes)
+        self.assertEqual(3, temp.count)
+
+    def test_union_fallbacks(self):
+        """Union members without a matching discriminator are matched on their fields"""
+        raw = dict(self.rig, mouse_platform={"name": "Running Disc", "radius": 15})
+        rig = view(Rig, raw)
+        self.assertIs(Disc, rig.mouse_platform.model_class)
+        raw = dict(self.rig, mouse_platform={"unexpected": 1})
+        self.assertEqual(raw["mouse_platform"], view(Rig, raw).mouse_platform.raw)
+        stream = view(Session, self.session).data_streams[0]
+        self.assertEqual(
+            datetime(2023, 4, 25, 2, 45, 59, tzinfo=timezone.utc).isoformat()[:10],
+            stream.stream_start_time.isoformat()[:10],
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()